@@ -2,13 +2,31 @@
 """
 Juno Package Manager (JPM)
 A simple package manager for Juno.
+
+Installing a package also installs everything it depends on. The full
+dependency graph is resolved against the `dependencies` version
+constraints in each package.json and written to juno.lock in the current
+directory. `jpm install` with no package name installs exactly what the
+lock records, without resolving again.
+
+Package files are kept once each in a content-addressed store, named by
+the SHA-256 of their contents, so identical files are shared across
+packages and versions. Installing a package hard-links (or reflinks)
+its files from the store into the packages directory instead of copying
+them. Store files are read-only, since a hard-linked install shares them.
 """
 
 import os
+import re
 import sys
 import json
+import time
+import errno
+import stat
 import shutil
+import hashlib
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import zipfile
 import tempfile
 from pathlib import Path
@@ -17,6 +35,22 @@ from pathlib import Path
 JPM_VERSION = "1.0.0"
 PACKAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "packages")
 USER_PACKAGES_DIR = os.path.join(os.path.expanduser("~"), ".juno", "packages")
+LOCK_FILE = "juno.lock"
+LOCK_VERSION = 1
+PROJECT_FILE = "package.json"
+
+# Build artifacts that are neither copied on install nor part of a package's hash
+IGNORED_NAMES = ("__pycache__", "__junocache__")
+
+# The content-addressed store; point JUNO_STORE at a shared directory to
+# share one store between users
+STORE_DIR = os.environ.get("JUNO_STORE") or os.path.join(os.path.expanduser("~"), ".juno", "store")
+
+# How installed files are made from store files; "auto" tries each in turn
+LINK_MODES = ("auto", "hardlink", "reflink", "copy")
+
+# Linux ioctl that makes a file share another's blocks copy-on-write
+FICLONE = 0x40049409
 
 def ensure_dirs():
     """Ensure package directories exist."""
@@ -54,41 +88,605 @@ def list_packages():
                     except:
                         print(f"  {pkg} (unknown version) [user] - Could not read package info")
 
-def install_package(package_name):
-    """Install a package."""
-    ensure_dirs()
-    
-    # Check if package exists in built-in packages
+class ResolutionError(Exception):
+    """Raised when dependencies cannot be resolved or a lock cannot be installed."""
+
+def read_package_info(pkg_dir):
+    """Return a package's package.json contents, or {} if it has none."""
+    pkg_json = os.path.join(pkg_dir, "package.json")
+    if not os.path.exists(pkg_json):
+        return {}
+    try:
+        with open(pkg_json, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        raise ResolutionError(f"Could not read {pkg_json}: {str(e)}")
+
+def parse_version(text):
+    """
+    Parse a version such as "1.2.3" into a tuple of three ints. Missing
+    parts count as 0, and pre-release or build suffixes are ignored.
+    """
+    core = str(text).strip().lstrip("vV").split("-")[0].split("+")[0]
+    try:
+        parts = [int(part) for part in core.split(".")] if core else []
+    except ValueError:
+        raise ResolutionError(f"Invalid version '{text}'")
+    return tuple((parts + [0, 0, 0])[:3])
+
+# One comparison in a constraint, e.g. ">=1.2", "^2.0.0" or "1.x"
+CONSTRAINT_TERM = re.compile(r"^(>=|<=|>|<|=|\^|~)?\s*v?([0-9xX*]+(?:\.[0-9xX*]+){0,2})(?:[-+].*)?$")
+
+def _matches_term(version, term):
+    """Return True if a version tuple satisfies one comparison."""
+    m = CONSTRAINT_TERM.match(term)
+    if m is None:
+        raise ResolutionError(f"Invalid version constraint '{term}'")
+    op, text = m.group(1) or "", m.group(2)
+    given = []
+    for part in text.split("."):
+        if part in ("x", "X", "*"):
+            break
+        given.append(int(part))
+    bound = tuple((given + [0, 0, 0])[:3])
+
+    if op == ">=":
+        return version >= bound
+    if op == "<=":
+        return version <= bound
+    if op == ">":
+        return version > bound
+    if op == "<":
+        return version < bound
+    if op == "^":
+        # Changes that leave the first non-zero part alone are compatible
+        for index, part in enumerate(bound):
+            if part != 0 or index == len(given) - 1:
+                break
+        upper = bound[:index] + (bound[index] + 1,) + (0,) * (2 - index)
+        return bound <= version < upper
+    if op == "~":
+        # Patch changes if a minor version is given, else minor changes
+        index = 1 if len(given) >= 2 else 0
+        upper = bound[:index] + (bound[index] + 1,) + (0,) * (2 - index)
+        return bound <= version < upper
+    # A bare or "=" version must match every part it gives
+    return version[:len(given)] == tuple(given)
+
+def satisfies(version, constraint):
+    """
+    Return True if a version satisfies a constraint.
+
+    Constraints follow npm: "1.2.3", ">=1.0 <2.0", "^1.2", "~1.2.0", "1.x",
+    and alternatives joined with "||". An empty constraint, "*" or
+    "latest" allows any version.
+    """
+    version = parse_version(version)
+    constraint = (constraint or "").strip()
+    if constraint in ("", "*", "latest"):
+        return True
+    for alternative in constraint.split("||"):
+        terms = re.findall(r"(?:>=|<=|>|<|=|\^|~)?\s*[^\s<>=^~]+", alternative)
+        if terms and all(_matches_term(version, term.replace(" ", "")) for term in terms):
+            return True
+    return False
+
+def available_versions(package_name):
+    """
+    Return the versions of a package that can be installed, newest first,
+    as (version, directory, package info) tuples.
+    """
     pkg_dir = os.path.join(PACKAGES_DIR, package_name)
-    if os.path.exists(pkg_dir) and os.path.isdir(pkg_dir):
-        # Copy package to user packages
-        user_pkg_dir = os.path.join(USER_PACKAGES_DIR, package_name)
-        if os.path.exists(user_pkg_dir):
-            print(f"Package '{package_name}' is already installed. Use 'jpm update {package_name}' to update.")
+    if not os.path.isdir(pkg_dir):
+        return []
+    info = read_package_info(pkg_dir)
+    return [(str(info.get("version", "0.0.0")), pkg_dir, info)]
+
+def installed_version(package_name):
+    """Return the version of an installed package, or None if it is not installed."""
+    user_pkg_dir = os.path.join(USER_PACKAGES_DIR, package_name)
+    if not os.path.isdir(user_pkg_dir):
+        return None
+    try:
+        return str(read_package_info(user_pkg_dir).get("version", "0.0.0"))
+    except ResolutionError:
+        return "0.0.0"
+
+def scan_package(directory):
+    """
+    Hash a package's files.
+
+    Returns:
+        tuple: (tree hash, manifest). The tree hash is a SHA-256 over the
+            relative paths and contents of every file. The manifest maps
+            "files" to {relative path: SHA-256 of the file} and "dirs" to
+            the relative paths of empty directories.
+    """
+    digest = hashlib.sha256()
+    files = {}
+    empty_dirs = []
+    for root, dirs, names in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if d not in IGNORED_NAMES)
+        if not dirs and not names and root != directory:
+            empty_dirs.append(os.path.relpath(root, directory).replace(os.sep, "/"))
+        for file in sorted(names):
+            path = os.path.join(root, file)
+            relative = os.path.relpath(path, directory).replace(os.sep, "/")
+            digest.update(relative.encode("utf-8") + b"\0")
+            file_digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(hashlib.sha256(chunk).digest())
+                    file_digest.update(chunk)
+            digest.update(b"\0")
+            files[relative] = file_digest.hexdigest()
+    return "sha256-" + digest.hexdigest(), {"files": files, "dirs": empty_dirs}
+
+def tree_hash(directory):
+    """Return a SHA-256 over the relative paths and contents of every file in a package."""
+    return scan_package(directory)[0]
+
+def resolve_dependencies(requirements, locked=None):
+    """
+    Resolve the full dependency graph of a set of requirements.
+
+    Every package gets the newest available version that satisfies all
+    the constraints placed on it, preferring the version in `locked` if
+    that still fits.
+
+    Args:
+        requirements (dict): Package name -> version constraint
+        locked (dict): The "packages" of an existing lock, or None
+
+    Returns:
+        dict: Package name -> lock entry, ordered so each package comes
+            after its dependencies
+
+    Raises:
+        ResolutionError: If a package is missing or its constraints conflict
+    """
+    locked = locked or {}
+    # Package name -> [(constraint, required by)]
+    constraints = {}
+    chosen = {}
+    pending = [(name, requirements[name], "the project") for name in sorted(requirements)]
+    while pending:
+        name, constraint, required_by = pending.pop(0)
+        constraints.setdefault(name, []).append((constraint, required_by))
+        wanted = ", ".join(f"'{c or '*'}' by {by}" for c, by in constraints[name])
+        if name in chosen:
+            if not satisfies(chosen[name][0], constraint):
+                raise ResolutionError(f"Conflicting requirements for '{name}': {wanted}; "
+                                      f"version {chosen[name][0]} was chosen")
+            continue
+
+        candidates = [candidate for candidate in available_versions(name)
+                      if all(satisfies(candidate[0], c) for c, _ in constraints[name])]
+        if not candidates:
+            if not available_versions(name):
+                raise ResolutionError(f"Package '{name}' not found (required by {required_by})")
+            found = ", ".join(version for version, _, _ in available_versions(name))
+            raise ResolutionError(f"No version of '{name}' satisfies {wanted} (available: {found})")
+        preferred = locked.get(name, {}).get("version")
+        candidates.sort(key=lambda candidate: (candidate[0] == preferred, parse_version(candidate[0])),
+                        reverse=True)
+        chosen[name] = candidates[0]
+
+        dependencies = candidates[0][2].get("dependencies") or {}
+        pending.extend((dep, dependencies[dep], f"{name} {candidates[0][0]}") for dep in sorted(dependencies))
+
+    # Order dependencies before their dependents (cycles are broken arbitrarily)
+    ordered = {}
+    visiting = set()
+
+    def visit(name):
+        if name in ordered or name in visiting:
             return
-        
-        # Copy package files
-        shutil.copytree(pkg_dir, user_pkg_dir)
-        print(f"Package '{package_name}' installed successfully.")
-    else:
-        print(f"Package '{package_name}' not found.")
+        visiting.add(name)
+        version, pkg_dir, info = chosen[name]
+        dependencies = info.get("dependencies") or {}
+        for dep in sorted(dependencies):
+            visit(dep)
+        ordered[name] = {
+            "version": version,
+            "integrity": tree_hash(pkg_dir),
+            "dependencies": {dep: dependencies[dep] for dep in sorted(dependencies)},
+        }
+
+    for name in sorted(chosen):
+        visit(name)
+    return ordered
+
+def read_lock(path=LOCK_FILE):
+    """Return the contents of a lock file, or None if there is none."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r') as f:
+            lock = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ResolutionError(f"Could not read {path}: {str(e)}")
+    if lock.get("lockfileVersion") != LOCK_VERSION:
+        raise ResolutionError(f"{path} has an unsupported lockfileVersion; delete it and run 'jpm lock'")
+    return lock
+
+def write_lock(requirements, packages, path=LOCK_FILE):
+    """Write a lock file recording the requirements and the packages resolved for them."""
+    lock = {
+        "lockfileVersion": LOCK_VERSION,
+        "dependencies": {name: requirements[name] for name in sorted(requirements)},
+        "packages": packages,
+    }
+    with open(path, 'w') as f:
+        json.dump(lock, f, indent=2)
+        f.write("\n")
+    return lock
+
+def project_requirements(lock=None):
+    """Return the requirements of the current project: its lock's, else its package.json's."""
+    if lock is not None:
+        return dict(lock.get("dependencies") or {})
+    if os.path.exists(PROJECT_FILE):
+        return dict(read_package_info(".").get("dependencies") or {})
+    return {}
+
+def parse_requirement(spec):
+    """Split "name@constraint" into (name, constraint); the constraint defaults to "*"."""
+    name, _, constraint = spec.partition("@")
+    return name, constraint or "*"
+
+def lock_packages(specs=(), update=()):
+    """
+    Resolve the project's requirements, plus any "name@constraint" specs,
+    and write juno.lock.
+
+    Args:
+        specs (list): "name" or "name@constraint" requirements to add
+        update (list): Names of packages to resolve to the newest version
+            their constraints allow, rather than the version locked now;
+            a name the project does not require yet is added
+
+    Returns:
+        dict: The lock that was written
+    """
+    lock = read_lock()
+    requirements = project_requirements(lock)
+    for spec in specs:
+        name, constraint = parse_requirement(spec)
+        requirements[name] = constraint
+    locked = dict(lock["packages"]) if lock else {}
+    for name in update:
+        requirements.setdefault(name, "*")
+        locked.pop(name, None)
+    packages = resolve_dependencies(requirements, locked)
+    return write_lock(requirements, packages)
+
+def store_object_path(digest):
+    """Return where the store keeps the file with the given SHA-256."""
+    return os.path.join(STORE_DIR, "objects", digest[:2], digest[2:])
+
+def store_manifest_path(integrity):
+    """Return where the store keeps the manifest of a package with the given tree hash."""
+    return os.path.join(STORE_DIR, "manifests", integrity + ".json")
+
+def _write_atomically(path, write):
+    """Create `path` by calling `write(temp path)` and renaming, so readers never see a partial file."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    os.close(fd)
+    try:
+        write(temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+def load_store_manifest(integrity):
+    """Return the stored manifest of a package, or None unless it and all its files are in the store."""
+    try:
+        with open(store_manifest_path(integrity), 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not all(os.path.exists(store_object_path(digest)) for digest in manifest["files"].values()):
+        return None
+    return manifest
+
+def add_to_store(pkg_dir, integrity=None):
+    """
+    Put a package's files in the store, skipping files already there, and
+    record its manifest.
+
+    Args:
+        pkg_dir (str): The package directory
+        integrity (str): The tree hash the package must have, or None
+
+    Returns:
+        tuple: (tree hash, manifest); see scan_package
+    """
+    tree, manifest = scan_package(pkg_dir)
+    if integrity and tree != integrity:
+        raise ResolutionError(f"Package at '{pkg_dir}' does not match the integrity hash in {LOCK_FILE}")
+
+    def store_copy(source):
+        def write(temp_path):
+            shutil.copyfile(source, temp_path)
+            # Hard-linked installs share this file, so nothing may change it
+            os.chmod(temp_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+        return write
+
+    for relative, digest in manifest["files"].items():
+        if not os.path.exists(store_object_path(digest)):
+            source = os.path.join(pkg_dir, *relative.split("/"))
+            _write_atomically(store_object_path(digest), store_copy(source))
+
+    def write_manifest(temp_path):
+        with open(temp_path, 'w') as f:
+            json.dump(manifest, f)
+    _write_atomically(store_manifest_path(tree), write_manifest)
+    return tree, manifest
+
+def _reflink(source, target):
+    """Make `target` a copy-on-write clone of `source`; raises OSError where unsupported."""
+    try:
+        import fcntl
+    except ImportError:
+        raise OSError(errno.EOPNOTSUPP, "reflinks are not supported on this platform")
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            dst.close()
+            os.unlink(target)
+            raise
+
+def link_file(source, target, link_mode="auto"):
+    """
+    Create `target` from a store file.
+
+    Args:
+        source (str): The store file
+        target (str): The file to create
+        link_mode (str): One of LINK_MODES; "auto" tries a hard link, then
+            a reflink, then a copy
+
+    Returns:
+        str: "hardlink", "reflink" or "copy", whichever was made
+    """
+    if link_mode in ("auto", "hardlink"):
+        try:
+            os.link(source, target)
+            return "hardlink"
+        except OSError:
+            # e.g. a different filesystem, or linking another user's file
+            if link_mode == "hardlink":
+                raise
+    if link_mode in ("auto", "reflink"):
+        try:
+            _reflink(source, target)
+            return "reflink"
+        except OSError:
+            if link_mode == "reflink":
+                raise
+    shutil.copyfile(source, target)
+    return "copy"
+
+def _make_writable(function, path, exc_info):
+    """rmtree error handler: retry removing a read-only file (needed on Windows)."""
+    os.chmod(path, stat.S_IWRITE | stat.S_IREAD)
+    function(path)
+
+def remove_tree(path):
+    """Delete an installed package, including read-only files linked from the store."""
+    shutil.rmtree(path, onerror=_make_writable)
+
+def install_locked_package(name, entry, link_mode="auto"):
+    """
+    Install one package at exactly the version and contents a lock records,
+    linking its files from the store. A package whose files are not in the
+    store yet is added to it first. The caller checks first that this
+    version is not installed already.
+
+    Returns:
+        tuple: (files installed, bytes installed, files linked rather than copied)
+    """
+    version = entry["version"]
+    integrity = entry.get("integrity")
+    manifest = load_store_manifest(integrity) if integrity else None
+    if manifest is None:
+        for candidate_version, pkg_dir, _ in available_versions(name):
+            if candidate_version == version:
+                break
+        else:
+            found = ", ".join(v for v, _, _ in available_versions(name)) or "none"
+            raise ResolutionError(f"{LOCK_FILE} requires {name} {version}, which is not available (found: {found})")
+        _, manifest = add_to_store(pkg_dir, integrity)
+
+    user_pkg_dir = os.path.join(USER_PACKAGES_DIR, name)
+    if os.path.exists(user_pkg_dir):
+        remove_tree(user_pkg_dir)
+    os.makedirs(user_pkg_dir)
+    for relative in manifest["dirs"]:
+        os.makedirs(os.path.join(user_pkg_dir, *relative.split("/")), exist_ok=True)
+
+    files = size = linked = 0
+    try:
+        for relative, digest in manifest["files"].items():
+            target = os.path.join(user_pkg_dir, *relative.split("/"))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if link_file(store_object_path(digest), target, link_mode) != "copy":
+                linked += 1
+            files += 1
+            size += os.path.getsize(target)
+    except BaseException:
+        # Leave no half-installed package behind to look installed
+        remove_tree(user_pkg_dir)
+        raise
+    return files, size, linked
+
+def prune_store():
+    """
+    Delete store files no installed package links to, and the manifests
+    that needed them. Only hard links are visible in a file's link count,
+    so packages installed as reflinks or copies do not keep their files.
+
+    Returns:
+        tuple: (files removed, bytes freed)
+    """
+    removed = freed = 0
+    objects_dir = os.path.join(STORE_DIR, "objects")
+    for root, _, names in os.walk(objects_dir):
+        for file in names:
+            path = os.path.join(root, file)
+            info = os.stat(path)
+            if info.st_nlink == 1:
+                os.chmod(path, stat.S_IWRITE | stat.S_IREAD)
+                os.unlink(path)
+                removed += 1
+                freed += info.st_size
+
+    manifests_dir = os.path.join(STORE_DIR, "manifests")
+    if os.path.isdir(manifests_dir):
+        for file in os.listdir(manifests_dir):
+            if file.endswith(".json") and load_store_manifest(file[:-len(".json")]) is None:
+                os.unlink(os.path.join(manifests_dir, file))
+    return removed, freed
+
+def show_store(prune=False):
+    """Print where the store is and how much it holds, pruning it first if asked."""
+    if prune:
+        removed, freed = prune_store()
+        print(f"Removed {removed} unused file(s), freeing {freed / (1024 * 1024):.2f} MB.")
+    count = size = 0
+    for root, _, names in os.walk(os.path.join(STORE_DIR, "objects")):
+        for file in names:
+            count += 1
+            size += os.path.getsize(os.path.join(root, file))
+    print(f"Store: {STORE_DIR}")
+    print(f"  {count} file(s), {size / (1024 * 1024):.2f} MB")
+
+def install_from_lock(lock, jobs=None, link_mode="auto"):
+    """
+    Install every package a lock records that is not installed already.
+
+    Packages go to separate directories, so they are installed
+    concurrently on a thread pool; linking and copying files is I/O bound
+    and releases the GIL.
+
+    Args:
+        lock (dict): The lock to install
+        jobs (int): Packages installed at a time; None lets the pool decide
+        link_mode (str): How files are made from the store; see link_file
+
+    Returns:
+        bool: True if every package installed
+    """
+    ensure_dirs()
+    pending = {name: entry for name, entry in lock["packages"].items()
+               if installed_version(name) != entry["version"]}
+    up_to_date = len(lock["packages"]) - len(pending)
+
+    started = time.perf_counter()
+    files = size = linked = installed = 0
+    failed = False
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(install_locked_package, name, entry, link_mode): name
+                   for name, entry in pending.items()}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                package_files, package_size, package_linked = future.result()
+            except (ResolutionError, OSError, shutil.Error) as e:
+                print(f"Error: Could not install '{name}': {str(e)}")
+                failed = True
+                continue
+            print(f"Package '{name}' {pending[name]['version']} installed successfully.")
+            installed += 1
+            files += package_files
+            size += package_size
+            linked += package_linked
+    elapsed = time.perf_counter() - started
+
+    megabytes = size / (1024 * 1024)
+    rate = f", {megabytes / elapsed:.1f} MB/s" if installed and elapsed > 0 else ""
+    print(f"{installed} package(s) installed ({files} files, {linked} linked from the store, "
+          f"{megabytes:.2f} MB in {elapsed:.2f}s{rate}), "
+          f"{up_to_date} already up to date.")
+    return not failed
+
+def install_package(package_name=None, jobs=None, link_mode="auto", update=False):
+    """
+    Install a package and its dependencies, recording them in juno.lock.
+    With no package name, install what juno.lock records, resolving
+    (and writing the lock) first only if there is no lock yet.
+
+    Args:
+        package_name (str): "name" or "name@constraint", or None
+        jobs (int): Packages installed at a time; see install_from_lock
+        link_mode (str): How files are made from the store; see link_file
+        update (bool): Resolve the package to the newest version allowed,
+            even if it is installed or locked at an older one
+
+    Returns:
+        bool: True on success
+    """
+    try:
+        if package_name is None:
+            lock = read_lock()
+            if lock is None:
+                lock = lock_packages()
+                print(f"Resolved {len(lock['packages'])} package(s) into {LOCK_FILE}.")
+            return install_from_lock(lock, jobs, link_mode)
+
+        name, _ = parse_requirement(package_name)
+        if not available_versions(name):
+            print(f"Package '{name}' not found.")
+            return False
+        if update:
+            lock = lock_packages([package_name] if "@" in package_name else [], update=[name])
+            return install_from_lock(lock, jobs, link_mode)
+        if installed_version(name) is not None and "@" not in package_name:
+            print(f"Package '{name}' is already installed. Use 'jpm update {name}' to update.")
+            return True
+        lock = lock_packages([package_name])
+        return install_from_lock(lock, jobs, link_mode)
+    except ResolutionError as e:
+        print(f"Error: {str(e)}")
+        return False
 
 def uninstall_package(package_name):
     """Uninstall a package."""
     user_pkg_dir = os.path.join(USER_PACKAGES_DIR, package_name)
     if os.path.exists(user_pkg_dir) and os.path.isdir(user_pkg_dir):
-        shutil.rmtree(user_pkg_dir)
+        remove_tree(user_pkg_dir)
         print(f"Package '{package_name}' uninstalled successfully.")
     else:
         print(f"Package '{package_name}' is not installed.")
 
 def update_package(package_name):
-    """Update a package."""
-    # First uninstall
-    uninstall_package(package_name)
-    # Then install
-    install_package(package_name)
-    print(f"Package '{package_name}' updated successfully.")
+    """
+    Update a package to the newest version its constraints allow.
+
+    Args:
+        package_name (str): "name" or "name@constraint"
+
+    Returns:
+        bool: True on success
+    """
+    name, _ = parse_requirement(package_name)
+    before = installed_version(name)
+    if not install_package(package_name, update=True):
+        print(f"Package '{name}' was not updated.")
+        return False
+    after = installed_version(name)
+    if before is None:
+        print(f"Package '{name}' was not installed; installed version {after}.")
+    elif after == before:
+        print(f"Package '{name}' is already up to date ({after}).")
+    else:
+        print(f"Package '{name}' updated from {before} to {after}.")
+    return True
 
 def show_package_info(package_name):
     """Show package information."""
@@ -163,8 +761,23 @@ def main():
     list_parser = subparsers.add_parser("list", help="List available packages")
     
     # Install command
-    install_parser = subparsers.add_parser("install", help="Install a package")
-    install_parser.add_argument("package", help="Package name")
+    install_parser = subparsers.add_parser("install", help="Install a package and its dependencies")
+    install_parser.add_argument("package", nargs="?",
+                                help=f"Package name, optionally name@constraint; omit to install from {LOCK_FILE}")
+    install_parser.add_argument("-j", "--jobs", type=int, default=None, metavar="N",
+                                help="Install up to N packages at a time (default: chosen by the thread pool)")
+    install_parser.add_argument("--link", choices=LINK_MODES, default="auto",
+                                help="How to install files from the store (default: auto, which tries "
+                                     "a hard link, then a reflink, then a copy)")
+
+    # Store command
+    store_parser = subparsers.add_parser("store", help="Show the content-addressed package store")
+    store_parser.add_argument("--prune", action="store_true",
+                              help="Delete store files that no installed package links to")
+
+    # Lock command
+    lock_parser = subparsers.add_parser("lock", help=f"Resolve dependencies into {LOCK_FILE} without installing")
+    lock_parser.add_argument("packages", nargs="*", help="Packages to add, as name or name@constraint")
     
     # Uninstall command
     uninstall_parser = subparsers.add_parser("uninstall", help="Uninstall a package")
@@ -191,11 +804,25 @@ def main():
     if args.command == "list":
         list_packages()
     elif args.command == "install":
-        install_package(args.package)
+        if args.jobs is not None and args.jobs < 1:
+            print("Error: --jobs must be at least 1")
+            return 1
+        if not install_package(args.package, args.jobs, args.link):
+            return 1
+    elif args.command == "store":
+        show_store(args.prune)
+    elif args.command == "lock":
+        try:
+            lock = lock_packages(args.packages)
+        except ResolutionError as e:
+            print(f"Error: {str(e)}")
+            return 1
+        print(f"Resolved {len(lock['packages'])} package(s) into {LOCK_FILE}.")
     elif args.command == "uninstall":
         uninstall_package(args.package)
     elif args.command == "update":
-        update_package(args.package)
+        if not update_package(args.package):
+            return 1
     elif args.command == "info":
         show_package_info(args.package)
     elif args.command == "readme":
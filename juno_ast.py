@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Juno AST
+Node classes produced by the Juno parser.
+"""
+
+
+class Node:
+    """
+    Base class for all AST nodes.
+    Subclasses list their child fields in `fields`; every node also
+    records the source line it came from. Trailing fields that are not
+    passed to the constructor (such as annotations filled in by the
+    resolver) start out as None.
+    """
+
+    __slots__ = ("line",)
+    fields = ()
+
+    def __init__(self, *args, line=0):
+        for index, name in enumerate(self.fields):
+            setattr(self, name, args[index] if index < len(args) else None)
+        self.line = line
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.fields)
+        return f"{type(self).__name__}({values})"
+
+
+def iter_child_nodes(node):
+    """Yield the direct child nodes of `node`, including nodes held in lists."""
+    for name in node.fields:
+        value = getattr(node, name)
+        if isinstance(value, Node):
+            yield value
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, Node):
+                    yield item
+
+
+def walk(node):
+    """Yield `node` and all of its descendants."""
+    pending = [node]
+    while pending:
+        current = pending.pop()
+        yield current
+        pending.extend(iter_child_nodes(current))
+
+
+# Program structure
+
+class Program(Node):
+    """
+    A parsed source file. `methods` maps method names to MethodDecl nodes.
+    The resolver sets `global_names` (global variable names by slot) and
+    `frame_size` (the number of local slots top-level code needs).
+    """
+    __slots__ = fields = ("body", "methods", "global_names", "frame_size")
+
+
+class ImportDecl(Node):
+    """`import a.b.C;` - the dotted name is kept as a string."""
+    __slots__ = fields = ("name",)
+
+
+class ClassDecl(Node):
+    """`class Name { ... }` - members are VarDecl and MethodDecl nodes."""
+    __slots__ = fields = ("name", "members")
+
+
+class MethodDecl(Node):
+    """
+    A method declaration. `params` is a list of (type, name) pairs.
+    `frame_size` (the number of local slots, parameters first) is set by the
+    resolver.
+    """
+    __slots__ = fields = ("name", "params", "return_type", "body", "modifiers", "frame_size")
+
+
+# Statements
+
+class Block(Node):
+    __slots__ = fields = ("statements",)
+
+
+class VarDecl(Node):
+    """
+    `Type name = value;` - value is None for a bare declaration.
+    `is_global` and `slot` are set by the resolver.
+    """
+    __slots__ = fields = ("type", "name", "value", "is_global", "slot")
+
+
+class ExprStmt(Node):
+    __slots__ = fields = ("expr",)
+
+
+class Print(Node):
+    """`System.out.println(value)` or `System.out.print(value)`."""
+    __slots__ = fields = ("value", "newline")
+
+
+class If(Node):
+    __slots__ = fields = ("condition", "then", "orelse")
+
+
+class For(Node):
+    """`for (init; condition; update) body` - any part may be None."""
+    __slots__ = fields = ("init", "condition", "update", "body")
+
+
+class ForEach(Node):
+    """
+    `for (Type name : iterable) body` over the elements of an array. `var`
+    is a VarDecl without a value; the resolver sets `cast` to the type each
+    element must be converted to, if any.
+    """
+    __slots__ = fields = ("var", "iterable", "body", "cast")
+
+
+class While(Node):
+    __slots__ = fields = ("condition", "body")
+
+
+class Return(Node):
+    __slots__ = fields = ("value",)
+
+
+class Break(Node):
+    __slots__ = fields = ()
+
+
+class Continue(Node):
+    __slots__ = fields = ()
+
+
+# Expressions
+
+class Literal(Node):
+    __slots__ = fields = ("value",)
+
+
+class Name(Node):
+    """
+    A variable reference. The resolver sets `is_global`, `slot` (the
+    variable's index among the globals or in its frame's locals) and
+    `type`, the variable's declared type.
+    """
+    __slots__ = fields = ("name", "is_global", "slot", "type")
+
+
+class Assign(Node):
+    """
+    `target op value` where op is `=` or a compound operator like `+=`, and
+    target is a Name or an Index. For a compound assignment, the resolver
+    sets `cast` to the type the result must be converted to, if any.
+    """
+    __slots__ = fields = ("target", "op", "value", "cast")
+
+
+class IncDec(Node):
+    """
+    `x++`, `x--`, `++x` or `--x`; target is a Name or an Index. The
+    resolver sets `wrap` to "int" or "long" if the result must wrap
+    around on overflow.
+    """
+    __slots__ = fields = ("target", "op", "prefix", "wrap")
+
+
+class BinaryOp(Node):
+    """
+    `left op right`. The resolver sets `wrap` to "int" or "long" when the
+    operator is arithmetic on integers, whose result wraps around on
+    overflow.
+    """
+    __slots__ = fields = ("op", "left", "right", "wrap")
+
+
+class UnaryOp(Node):
+    """`op operand`; `wrap` is set as for BinaryOp."""
+    __slots__ = fields = ("op", "operand", "wrap")
+
+
+class Cast(Node):
+    """
+    `(type) operand` - a numeric conversion, written in the source or
+    inserted by the resolver where a declaration widens a value.
+    """
+    __slots__ = fields = ("type", "operand")
+
+
+class Conditional(Node):
+    """`condition ? then : orelse`."""
+    __slots__ = fields = ("condition", "then", "orelse")
+
+
+class Concat(Node):
+    """
+    A String built from `parts` by formatting each one and joining them;
+    produced by the optimizer from chains of `+`.
+    """
+    __slots__ = fields = ("parts",)
+
+
+class Index(Node):
+    """`target[index]` - an array element."""
+    __slots__ = fields = ("target", "index")
+
+
+class Length(Node):
+    """`target.length` - the length of an array."""
+    __slots__ = fields = ("target",)
+
+
+class NewArray(Node):
+    """`new type[length]` - `type` is the element type."""
+    __slots__ = fields = ("type", "length")
+
+
+class ArrayLiteral(Node):
+    """`{a, b, c}` or `new type[] {a, b, c}` - `type` is the element type."""
+    __slots__ = fields = ("type", "elements")
+
+
+class Call(Node):
+    """A call to a method declared in the program."""
+    __slots__ = fields = ("name", "args")
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Juno Batch Runner
+Runs many Juno programs across a pool of worker processes.
+
+    juno_standalone.py batch "tests/**/*.juno" --jobs 8
+
+Each script runs in quiet mode with its output captured. Its exit status
+is 0 if it ran to completion and 1 otherwise, as juno_standalone.py
+would exit. All workers read and write the same compiled-code cache:
+the __junocache__ beside each script, or one shared directory given
+with --cache-dir or JUNO_CACHE_DIR. A rerun of an unchanged corpus
+therefore skips parsing and compilation.
+"""
+
+import io
+import os
+import sys
+import glob
+import time
+import argparse
+import contextlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+from juno_standalone import Interpreter, ENGINES
+from juno_executor import DEFAULT_MAX_CALL_DEPTH
+from juno_cache import CodeCache, file_hash
+from juno_output import Output
+
+# Suffix of the files --output-dir writes each script's output to
+OUTPUT_SUFFIX = ".out"
+
+# The error recorded for a script named on the command line that does not exist
+MISSING_ERROR = "Error: File not found"
+
+# The error recorded for each script of the chunk a worker process died running
+WORKER_DIED_ERROR = "Error: A worker process died before the script finished"
+
+
+class ScriptResult:
+    """The outcome of running one script."""
+
+    __slots__ = ("path", "status", "seconds", "last_line")
+
+    def __init__(self, path, status, seconds, last_line):
+        self.path = path
+        self.status = status
+        self.seconds = seconds
+        # The final line of output, which holds the error when a script fails
+        self.last_line = last_line
+
+
+def find_scripts(patterns):
+    """
+    Expand glob patterns into a sorted list of files, without duplicates.
+    `**` matches any number of directories.
+
+    Returns:
+        tuple: (the files found, the patterns without wildcards that name
+            no file, in the order given)
+    """
+    scripts = set()
+    missing = []
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True)
+        if not matches and os.path.isfile(pattern):
+            matches = [pattern]
+        matches = [path for path in matches if os.path.isfile(path)]
+        if not matches and not glob.has_magic(pattern) and pattern not in missing:
+            missing.append(pattern)
+        scripts.update(matches)
+    return sorted(scripts), missing
+
+
+def run_script(path, options):
+    """
+    Run one script in a worker, capturing everything it prints.
+
+    Args:
+        path (str): The script to run
+        options (dict): Interpreter settings, plus "cache_dir" and
+            "output_dir"; see parse_arguments
+
+    Returns:
+        ScriptResult: How the script went
+    """
+    started = time.perf_counter()
+    captured = io.StringIO()
+    with contextlib.redirect_stdout(captured):
+        try:
+            interpreter = Interpreter(
+                optimize=options["optimize"],
+                quiet=True,
+                engine=options["engine"],
+                cache=None if options["no_cache"] else CodeCache(options["cache_dir"]),
+                max_loop_iterations=options["max_loop_iterations"],
+                max_call_depth=options["max_call_depth"],
+                output=Output(captured, line_buffered=False),
+            )
+            digest = None if options["no_cache"] else file_hash(path)
+            with open(path, 'r', encoding='utf-8', newline='') as source:
+                status = 0 if interpreter.execute(source, path, digest) else 1
+        except Exception as e:
+            print(f"Error: {str(e)}")
+            status = 1
+    seconds = time.perf_counter() - started
+
+    output = captured.getvalue()
+    if options["output_dir"]:
+        write_output(options["output_dir"], path, output)
+    lines = output.rstrip("\n").rsplit("\n", 1)
+    return ScriptResult(path, status, seconds, lines[-1])
+
+
+def run_chunk(paths, options):
+    """Run several scripts in one worker; returns their ScriptResults."""
+    return [run_script(path, options) for path in paths]
+
+
+def write_output(output_dir, path, output):
+    """Save a script's output under `output_dir`, mirroring the script's relative path."""
+    relative = os.path.relpath(os.path.abspath(path))
+    if relative.startswith(os.pardir):
+        # Outside the working directory: keep only the path below its drive or root
+        relative = os.path.splitdrive(os.path.abspath(path))[1].lstrip(os.sep)
+    target = os.path.join(output_dir, relative + OUTPUT_SUFFIX)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, 'w', encoding='utf-8', newline='') as f:
+        f.write(output)
+
+
+def run_batch(scripts, options, jobs, report=print):
+    """
+    Run scripts across a process pool.
+
+    Args:
+        scripts (list): The script paths
+        options (dict): Passed to run_script
+        jobs (int): The number of worker processes
+        report (callable): Called with each ScriptResult as it arrives,
+            in the order the scripts were given
+
+    Returns:
+        list: The ScriptResults, in the order the scripts were given. If
+            a worker process dies, the scripts of the chunk it was running
+            fail with WORKER_DIED_ERROR; the other scripts still run.
+    """
+    results = []
+    # Hand out scripts in chunks so thousands of tiny jobs don't cost a round trip each
+    chunksize = max(1, min(64, len(scripts) // (jobs * 4)))
+    chunks = [scripts[start:start + chunksize] for start in range(0, len(scripts), chunksize)]
+    chunk_results = [None] * len(chunks)
+    pending = deque(range(len(chunks)))
+    # One single-worker pool per job, each running one chunk at a time, so
+    # a dying worker breaks only its own pool and the chunk it was running
+    pools = [ProcessPoolExecutor(max_workers=1) for _ in range(min(jobs, len(chunks)))]
+    running = {}
+    reported = 0
+
+    def start(slot):
+        index = pending.popleft()
+        running[pools[slot].submit(run_chunk, chunks[index], options)] = (slot, index)
+
+    try:
+        for slot in range(len(pools)):
+            start(slot)
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                slot, index = running.pop(future)
+                try:
+                    chunk_results[index] = future.result()
+                except BrokenProcessPool:
+                    chunk_results[index] = [ScriptResult(path, 1, 0.0, WORKER_DIED_ERROR)
+                                            for path in chunks[index]]
+                    pools[slot].shutdown(wait=False)
+                    pools[slot] = ProcessPoolExecutor(max_workers=1)
+                if pending:
+                    start(slot)
+            # Report every chunk that no earlier, unfinished chunk holds back
+            while reported < len(chunks) and chunk_results[reported] is not None:
+                for result in chunk_results[reported]:
+                    results.append(result)
+                    report(result)
+                reported += 1
+    finally:
+        for pool in pools:
+            pool.shutdown()
+    return results
+
+
+def format_result(result):
+    """Render one ScriptResult as a status line."""
+    milliseconds = result.seconds * 1000
+    if result.status == 0:
+        return f"ok   {result.path} ({milliseconds:.0f} ms)"
+    return f"FAIL {result.path} ({milliseconds:.0f} ms): {result.last_line}"
+
+
+def format_summary(results, elapsed, jobs):
+    """Render the totals for a batch run."""
+    failed = [result for result in results if result.status != 0]
+    busy = sum(result.seconds for result in results)
+    lines = [
+        f"Ran {len(results)} script(s) in {elapsed:.2f}s with {jobs} job(s): "
+        f"{len(results) - len(failed)} passed, {len(failed)} failed",
+        f"Script time {busy:.2f}s, {busy / elapsed if elapsed else 0:.1f}x parallel speedup",
+    ]
+    if failed:
+        lines.append("Failures:")
+        lines.extend(f"  {result.path}: {result.last_line}" for result in failed)
+    return "\n".join(lines)
+
+
+def parse_arguments(argv=None):
+    """Parse the batch command line arguments."""
+    parser = argparse.ArgumentParser(
+        prog="juno batch",
+        description="Run many Juno programs in parallel and summarize the results"
+    )
+
+    parser.add_argument(
+        "patterns",
+        nargs="+",
+        metavar="glob",
+        help="Scripts to run; quote patterns such as 'tests/**/*.juno' to let "
+             "the batch runner expand them"
+    )
+
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        metavar="N",
+        help="Run N scripts at a time (default: the number of CPUs)"
+    )
+
+    parser.add_argument(
+        "-o", "--optimize",
+        action="store_true",
+        help="Enable optimizations"
+    )
+
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="tree",
+        help="Execution engine: tree (AST walker) or vm (bytecode VM)"
+    )
+
+    parser.add_argument(
+        "--max-loop-iterations",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Fail any loop that runs more than N iterations (default: no limit)"
+    )
+
+    parser.add_argument(
+        "--max-call-depth",
+        type=int,
+        default=DEFAULT_MAX_CALL_DEPTH,
+        metavar="N",
+        help=f"Fail once method calls nest deeper than N (default: {DEFAULT_MAX_CALL_DEPTH})"
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        metavar="DIR",
+        help="Share one compiled-code cache directory across all scripts "
+             "(default: $JUNO_CACHE_DIR, else __junocache__ beside each script)"
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't read or write the compiled-code cache"
+    )
+
+    parser.add_argument(
+        "--output-dir",
+        default=None,
+        metavar="DIR",
+        help="Save each script's output to DIR/<script path>.out"
+    )
+
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Print only the summary, not a line per script"
+    )
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Batch entry point; returns 0 if every script succeeded, else 1."""
+    args = parse_arguments(argv)
+    if args.jobs < 1:
+        print("Error: --jobs must be at least 1")
+        return 1
+
+    scripts, missing = find_scripts(args.patterns)
+    if not scripts and not missing:
+        print(f"Error: No files match {' '.join(args.patterns)}")
+        return 1
+
+    options = {
+        "optimize": args.optimize,
+        "engine": args.engine,
+        "max_loop_iterations": args.max_loop_iterations,
+        "max_call_depth": args.max_call_depth,
+        "cache_dir": args.cache_dir,
+        "no_cache": args.no_cache,
+        "output_dir": args.output_dir,
+    }
+    jobs = max(1, min(args.jobs, len(scripts)))
+    report = (lambda result: None) if args.quiet else (lambda result: print(format_result(result), flush=True))
+
+    started = time.perf_counter()
+    # Paths that name no file fail without running
+    results = [ScriptResult(path, 1, 0.0, MISSING_ERROR) for path in missing]
+    for result in results:
+        report(result)
+    if scripts:
+        results += run_batch(scripts, options, jobs, report)
+    elapsed = time.perf_counter() - started
+
+    print(format_summary(results, elapsed, jobs))
+    return 0 if all(result.status == 0 for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Juno Code Cache
+Stores parsed and compiled Juno programs on disk so that unchanged
+sources skip lexing, parsing and compilation on the next run.
+
+Cache files live in a `__junocache__` directory next to the source file,
+or in a shared directory when JUNO_CACHE_DIR is set. Each file records
+the SHA-256 of the source it was built from and the interpreter version;
+anything that does not match is treated as a miss and rebuilt.
+"""
+
+import os
+import mmap
+import pickle
+import struct
+import hashlib
+import tempfile
+
+CACHE_DIR_NAME = "__junocache__"
+CACHE_SUFFIX = ".junoc"
+
+# File layout: magic, format version, source hash, tag length, tag, payload.
+# Bump FORMAT_VERSION whenever the pickled AST or the bytecode changes shape.
+MAGIC = b"JUNC"
+FORMAT_VERSION = 11
+HEADER = struct.Struct(">4sB32sH")
+
+
+# Bytes read at a time when hashing a source file
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def source_hash(data):
+    """
+    Hash Juno source for cache validation.
+
+    Args:
+        data (bytes): The raw source file contents
+
+    Returns:
+        bytes: The SHA-256 digest
+    """
+    return hashlib.sha256(data).digest()
+
+
+def file_hash(path):
+    """
+    Hash a Juno source file for cache validation, reading it in chunks.
+
+    Args:
+        path (str): The source file
+
+    Returns:
+        bytes: The SHA-256 digest, the same as source_hash of its contents
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+class CodeCache:
+    """
+    An on-disk cache of parsed/compiled programs.
+    Entries are keyed by source hash and a tag naming the interpreter
+    version and the kind of payload stored.
+    """
+
+    def __init__(self, cache_dir=None):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir (str): Shared cache directory; defaults to JUNO_CACHE_DIR,
+                or a __junocache__ directory beside each source file
+        """
+        self.cache_dir = cache_dir or os.environ.get("JUNO_CACHE_DIR") or None
+
+    def path_for(self, filename, digest, tag):
+        """Return the cache file path for a source file."""
+        if self.cache_dir:
+            # A shared directory is content-addressed so copies of a script share one entry
+            return os.path.join(self.cache_dir, f"{digest.hex()}.{tag}{CACHE_SUFFIX}")
+        directory, base = os.path.split(os.path.abspath(filename))
+        stem = os.path.splitext(base)[0]
+        return os.path.join(directory, CACHE_DIR_NAME, f"{stem}.{tag}{CACHE_SUFFIX}")
+
+    def load(self, filename, digest, tag):
+        """
+        Load a cached payload.
+
+        Args:
+            filename (str): The source file name
+            digest (bytes): The SHA-256 of the current source
+            tag (str): The cache tag
+
+        Returns:
+            The cached payload, or None on a miss
+        """
+        path = self.path_for(filename, digest, tag)
+        try:
+            with open(path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    if len(mapped) < HEADER.size:
+                        return None
+                    magic, version, stored_digest, tag_length = HEADER.unpack_from(mapped, 0)
+                    if magic != MAGIC or version != FORMAT_VERSION or stored_digest != digest:
+                        return None
+                    offset = HEADER.size + tag_length
+                    if mapped[HEADER.size:offset] != tag.encode("utf-8"):
+                        return None
+                    with memoryview(mapped) as view:
+                        return pickle.loads(view[offset:])
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            # Missing, empty, truncated or stale cache files are all just misses
+            return None
+
+    def store(self, filename, digest, tag, payload):
+        """
+        Store a payload in the cache. Failures (e.g. a read-only directory)
+        are ignored; the cache is only an optimization.
+
+        Args:
+            filename (str): The source file name
+            digest (bytes): The SHA-256 of the source
+            tag (str): The cache tag
+            payload: The object to cache
+        """
+        path = self.path_for(filename, digest, tag)
+        tag_bytes = tag.encode("utf-8")
+        try:
+            data = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+            directory = os.path.dirname(path)
+            os.makedirs(directory, exist_ok=True)
+
+            # Write to a temporary file and rename so readers never see a partial entry
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(HEADER.pack(MAGIC, FORMAT_VERSION, digest, len(tag_bytes)))
+                    f.write(tag_bytes)
+                    f.write(data)
+                os.replace(temp_path, path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except (OSError, pickle.PicklingError, RecursionError):
+            pass
@@ -0,0 +1,1101 @@
+#!/usr/bin/env python3
+"""
+Juno Bytecode Compiler and VM
+Lowers a parsed Juno program to compact bytecode and runs it on a
+stack-based virtual machine.
+
+Each instruction is two integers in a flat list: an opcode and its
+argument (0 when unused). Constants are stored in a per-code-object pool
+and referenced by index; variables are referenced by the slot the
+resolver assigned them.
+"""
+
+from juno_errors import JunoError, JunoCompileError, JunoRuntimeError
+from juno_runtime import (format_value, binary_op, add, cast, wrap, new_array, make_array,
+                          load_index, store_index, array_length, check_iterable,
+                          ARRAY_CLASSES, INTEGRAL_RANGES)
+from juno_executor import DEFAULT_MAX_CALL_DEPTH, UNSET
+from juno_output import stdout_output
+import juno_ast as ast
+
+# Opcodes
+LOAD_CONST = 0
+LOAD_LOCAL = 1
+STORE_LOCAL = 2
+LOAD_GLOBAL = 3
+POP = 4
+DUP = 5
+BINARY_ADD = 6
+BINARY_SUB = 7
+BINARY_MUL = 8
+BINARY_DIV = 9
+BINARY_MOD = 10
+COMPARE_LT = 11
+COMPARE_LE = 12
+COMPARE_GT = 13
+COMPARE_GE = 14
+COMPARE_EQ = 15
+COMPARE_NE = 16
+UNARY_NOT = 17
+UNARY_NEG = 18
+JUMP = 19
+POP_JUMP_IF_FALSE = 20
+JUMP_IF_FALSE_OR_POP = 21
+JUMP_IF_TRUE_OR_POP = 22
+PRINT = 23
+CALL = 24
+RETURN_VALUE = 25
+RAISE_ERROR = 26
+LOOP_GUARD = 27
+STORE_GLOBAL = 28
+BUILD_STRING = 29
+PRINT_STRING = 30
+CAST = 31
+LOAD_INDEX = 32
+STORE_INDEX = 33
+ARRAY_LENGTH = 34
+NEW_ARRAY = 35
+BUILD_ARRAY = 36
+DUP_TWO = 37
+ROT_FOUR = 38
+GET_ITER = 39
+FOR_ITER = 40
+DECLARE_GLOBAL = 41
+POP_JUMP_IF_NOT_LT = 42
+POP_JUMP_IF_NOT_LE = 43
+POP_JUMP_IF_NOT_GT = 44
+POP_JUMP_IF_NOT_GE = 45
+INCREMENT_LOCAL = 46
+INCREMENT_GLOBAL = 47
+
+OPNAMES = {value: name for name, value in globals().items()
+           if name.isupper() and isinstance(value, int)}
+
+BINARY_OPCODES = {
+    "+": BINARY_ADD, "-": BINARY_SUB, "*": BINARY_MUL, "/": BINARY_DIV, "%": BINARY_MOD,
+    "<": COMPARE_LT, "<=": COMPARE_LE, ">": COMPARE_GT, ">=": COMPARE_GE,
+    "==": COMPARE_EQ, "!=": COMPARE_NE,
+}
+OPCODE_OPERATORS = {opcode: op for op, opcode in BINARY_OPCODES.items()}
+
+# A comparison whose result only decides a branch compiles to one of these
+COMPARE_JUMP_OPCODES = {
+    "<": POP_JUMP_IF_NOT_LT, "<=": POP_JUMP_IF_NOT_LE,
+    ">": POP_JUMP_IF_NOT_GT, ">=": POP_JUMP_IF_NOT_GE,
+}
+COMPARE_JUMP_OPERATORS = {opcode: op for op, opcode in COMPARE_JUMP_OPCODES.items()}
+
+# CAST's argument indexes this tuple
+CAST_TARGETS = ("int", "long", "float", "double")
+CAST_RANGES = tuple(INTEGRAL_RANGES.get(target) for target in CAST_TARGETS)
+
+# The argument of an arithmetic opcode or UNARY_NEG indexes this tuple:
+# a nonzero one names the type whose range an integer result wraps into
+WRAP_TARGETS = (None, "int", "long")
+WRAP_RANGES = (None,) + tuple(INTEGRAL_RANGES[target] for target in WRAP_TARGETS[1:])
+
+# CALL's argument packs the callee's method slot above the argument count;
+# Java also allows at most 255 parameters
+MAX_ARGUMENTS = 255
+CALL_SLOT_SHIFT = 8
+
+# INCREMENT_LOCAL and INCREMENT_GLOBAL pack the variable's slot above the
+# WRAP_TARGETS index of its type and a bit that is set to decrement
+INCREMENT_SLOT_SHIFT = 3
+
+
+def is_one(node):
+    """Return True if `node` is the int literal 1."""
+    return isinstance(node, ast.Literal) and type(node.value) is int and node.value == 1
+
+
+class CodeObject:
+    """Bytecode for one method or for the top-level program."""
+
+    __slots__ = ("name", "params", "code", "consts", "nlocals", "varnames", "lines")
+
+    def __init__(self, name, params=(), nlocals=0):
+        self.name = name
+        self.params = tuple(params)
+        self.code = []
+        self.consts = []
+        self.nlocals = nlocals
+        # Local slot -> a variable name stored in it, for disassembly
+        self.varnames = list(self.params) + [None] * (nlocals - len(self.params))
+        self.lines = []
+
+    def line_at(self, pc):
+        """Return the source line of the instruction at offset `pc`."""
+        index = pc // 2
+        if 0 <= index < len(self.lines):
+            return self.lines[index]
+        return None
+
+
+class CompiledProgram:
+    """
+    A compiled program: the top-level code plus a table of methods.
+    `methods` is indexed by method slot; `method_index` maps every method
+    name a call refers to onto its slot, and the slot of a method that is
+    not defined holds None. Calls go through the table, so replacing an
+    entry redirects every call site that refers to it.
+    """
+
+    __slots__ = ("main", "methods", "method_index", "global_names")
+
+    def __init__(self, main, methods, method_index, global_names):
+        self.main = main
+        self.methods = methods
+        self.global_names = global_names
+        self.method_index = method_index
+
+
+class Compiler:
+    """
+    The Juno bytecode compiler.
+    This class lowers a Program AST to CodeObjects.
+    """
+
+    def __init__(self, program, filename="<input>", loop_guards=False, report=None, method_index=None):
+        """
+        Initialize the compiler.
+
+        Args:
+            program (Program): The parsed program
+            filename (str): The name of the file being compiled
+            loop_guards (bool): Emit per-loop iteration counters so the VM
+                can enforce max_loop_iterations
+            report (OptimizationReport): Receives the peephole optimizations
+                made while compiling, or None
+            method_index (dict): Method slots assigned by earlier
+                compilations, such as of previous REPL inputs; new methods
+                are added to it
+        """
+        self.program = program
+        self.filename = filename
+        self.loop_guards = loop_guards
+        self.report = report
+        self.loop_count = 0
+        # One entry per enclosing loop: (break jump offsets, continue jump offsets)
+        self.loops = []
+        self.method_index = {} if method_index is None else method_index
+        for name in program.methods:
+            self.method_index.setdefault(name, len(self.method_index))
+        self.code = None
+        self.line = 0
+
+        self.statement_handlers = {
+            ast.VarDecl: self.compile_var_decl,
+            ast.ExprStmt: self.compile_expr_stmt,
+            ast.Print: self.compile_print,
+            ast.If: self.compile_if,
+            ast.For: self.compile_for,
+            ast.ForEach: self.compile_for_each,
+            ast.While: self.compile_while,
+            ast.Block: self.compile_block,
+            ast.Return: self.compile_return,
+            ast.Break: self.compile_break,
+            ast.Continue: self.compile_continue,
+            ast.MethodDecl: self.compile_nothing,
+            ast.ImportDecl: self.compile_nothing,
+            ast.ClassDecl: self.compile_class,
+        }
+        self.expression_handlers = {
+            ast.Literal: self.compile_literal,
+            ast.Name: self.compile_name,
+            ast.BinaryOp: self.compile_binary,
+            ast.UnaryOp: self.compile_unary,
+            ast.Assign: self.compile_assign,
+            ast.IncDec: self.compile_incdec,
+            ast.Conditional: self.compile_conditional,
+            ast.Cast: self.compile_cast,
+            ast.Concat: self.compile_concat,
+            ast.Index: self.compile_index,
+            ast.Length: self.compile_length,
+            ast.NewArray: self.compile_new_array,
+            ast.ArrayLiteral: self.compile_array_literal,
+            ast.Call: self.compile_call,
+        }
+
+    def compile(self):
+        """
+        Compile the program.
+
+        Returns:
+            CompiledProgram: The compiled program
+        """
+        program = self.program
+        main = self.compile_code("<main>", (), program.frame_size, program.body)
+        compiled = {}
+        for method in program.methods.values():
+            params = [name for _, name in method.params]
+            compiled[method.name] = self.compile_code(method.name, params, method.frame_size,
+                                                      method.body.statements)
+        # Methods that are called but not defined here keep an empty slot
+        methods = [None] * len(self.method_index)
+        for name, code_object in compiled.items():
+            methods[self.method_index[name]] = code_object
+        return CompiledProgram(main, methods, self.method_index, list(program.global_names))
+
+    def compile_code(self, name, params, nlocals, statements):
+        """Compile a list of statements into a new CodeObject."""
+        self.code = CodeObject(name, params, nlocals)
+        for statement in statements:
+            self.compile_statement(statement)
+        self.emit(LOAD_CONST, self.const(None))
+        self.emit(RETURN_VALUE)
+        return self.code
+
+    # Emission helpers
+
+    def emit(self, opcode, arg=0):
+        """Append an instruction and return its offset."""
+        code = self.code
+        offset = len(code.code)
+        code.code.append(opcode)
+        code.code.append(arg)
+        code.lines.append(self.line)
+        return offset
+
+    def patch(self, offset, target=None):
+        """Point the jump at `offset` to `target` (default: the next instruction)."""
+        self.code.code[offset + 1] = len(self.code.code) if target is None else target
+
+    def here(self):
+        return len(self.code.code)
+
+    def const(self, value):
+        """Return the constant pool index of `value`, adding it if needed."""
+        consts = self.code.consts
+        for index, existing in enumerate(consts):
+            if type(existing) is type(value) and existing == value:
+                return index
+        consts.append(value)
+        return len(consts) - 1
+
+    def new_local(self, name):
+        """Add a hidden local slot to the current code object and return it."""
+        code = self.code
+        code.varnames.append(name)
+        code.nlocals += 1
+        return code.nlocals - 1
+
+    def raise_error(self, message):
+        self.emit(RAISE_ERROR, self.const(message))
+
+    def emit_load(self, node):
+        """Load the variable a resolved Name (or VarDecl) refers to."""
+        if node.is_global:
+            self.emit(LOAD_GLOBAL, node.slot)
+        else:
+            self.code.varnames[node.slot] = node.name
+            self.emit(LOAD_LOCAL, node.slot)
+
+    def emit_store(self, node):
+        """Store the top of the stack into a resolved Name."""
+        if node.is_global:
+            self.emit(STORE_GLOBAL, node.slot)
+        else:
+            self.code.varnames[node.slot] = node.name
+            self.emit(STORE_LOCAL, node.slot)
+
+    def emit_jump_if_false(self, condition):
+        """Compile a branch condition; returns the jump taken when it is false, to patch."""
+        if isinstance(condition, ast.BinaryOp) and condition.op in COMPARE_JUMP_OPCODES:
+            # Peephole: COMPARE_LT; POP_JUMP_IF_FALSE becomes one POP_JUMP_IF_NOT_LT
+            self.compile_expression(condition.left)
+            self.compile_expression(condition.right)
+            if self.report is not None:
+                self.report.record("compare-jump", 1)
+            return self.emit(COMPARE_JUMP_OPCODES[condition.op])
+        self.compile_expression(condition)
+        return self.emit(POP_JUMP_IF_FALSE)
+
+    def emit_increment(self, target, op, wrap):
+        """
+        Peephole: add (op "+") or subtract 1 in place for a statement such as
+        `i++`, `i -= 1` or `i = i + 1` whose int or long target wraps to
+        `wrap`, instead of loading, adding and storing. Returns False, having
+        emitted nothing, if the statement has another form.
+        """
+        if not isinstance(target, ast.Name) or wrap not in ("int", "long"):
+            return False
+        arg = target.slot << INCREMENT_SLOT_SHIFT | WRAP_TARGETS.index(wrap) << 1 | (op == "-")
+        if target.is_global:
+            self.emit(INCREMENT_GLOBAL, arg)
+        else:
+            self.code.varnames[target.slot] = target.name
+            self.emit(INCREMENT_LOCAL, arg)
+        if self.report is not None:
+            self.report.record("increment", 3)
+        return True
+
+    def emit_declare(self, node):
+        """Store the top of the stack into the variable a VarDecl declares."""
+        if node.is_global:
+            # Unlike STORE_GLOBAL, this may set a global that is still unset
+            self.emit(DECLARE_GLOBAL, node.slot)
+        else:
+            self.emit_store(node)
+
+    # Statements
+
+    def compile_statement(self, node):
+        self.line = node.line
+        handler = self.statement_handlers.get(type(node))
+        if handler is None:
+            raise JunoCompileError(f"Cannot compile {type(node).__name__}", node.line, None, self.filename)
+        handler(node)
+
+    def compile_nothing(self, node):
+        pass
+
+    def compile_block(self, node):
+        for statement in node.statements:
+            self.compile_statement(statement)
+
+    def compile_class(self, node):
+        for member in node.members:
+            if isinstance(member, ast.VarDecl):
+                self.compile_statement(member)
+
+    def compile_var_decl(self, node):
+        if node.value is None:
+            self.emit(LOAD_CONST, self.const(None))
+        else:
+            self.compile_expression(node.value)
+        self.emit_declare(node)
+
+    def compile_expr_stmt(self, node):
+        expr = node.expr
+        if isinstance(expr, ast.Assign):
+            self.compile_assign(expr, discard=True)
+        elif isinstance(expr, ast.IncDec):
+            self.compile_incdec(expr, discard=True)
+        else:
+            self.compile_expression(expr)
+            self.emit(POP)
+
+    def compile_print(self, node):
+        newline = 1 if node.newline else 0
+        if isinstance(node.value, ast.Concat):
+            # Peephole: BUILD_STRING n; PRINT becomes one PRINT_STRING that
+            # formats the parts and writes them with the line ending in one go
+            for part in node.value.parts:
+                self.compile_expression(part)
+            self.emit(PRINT_STRING, len(node.value.parts) * 2 + newline)
+            if self.report is not None:
+                self.report.record("print-fusion", 1)
+            return
+        if node.value is None:
+            self.emit(LOAD_CONST, self.const(""))
+        else:
+            self.compile_expression(node.value)
+        self.emit(PRINT, newline)
+
+    def compile_if(self, node):
+        jump_else = self.emit_jump_if_false(node.condition)
+        self.compile_block(node.then)
+        if node.orelse is None:
+            self.patch(jump_else)
+        else:
+            jump_end = self.emit(JUMP)
+            self.patch(jump_else)
+            self.compile_block(node.orelse)
+            self.patch(jump_end)
+
+    def compile_for(self, node):
+        if node.init is not None:
+            self.compile_statement(node.init)
+
+        counter = self.emit_loop_counter()
+        loop_start = self.here()
+        jump_end = None
+        if node.condition is not None:
+            self.line = node.line
+            jump_end = self.emit_jump_if_false(node.condition)
+
+        if counter is not None:
+            self.emit(LOOP_GUARD, counter)
+        breaks, continues = self.compile_loop_body(node.body)
+
+        for offset in continues:
+            self.patch(offset)
+        if node.update is not None:
+            self.line = node.line
+            self.compile_expr_stmt(ast.ExprStmt(node.update, line=node.line))
+        self.emit(JUMP, loop_start)
+        if jump_end is not None:
+            self.patch(jump_end)
+        for offset in breaks:
+            self.patch(offset)
+
+    def compile_for_each(self, node):
+        # The array's iterator stays on the stack while the loop runs
+        self.compile_expression(node.iterable)
+        self.emit(GET_ITER)
+        counter = self.emit_loop_counter()
+        loop_start = self.here()
+        jump_end = self.emit(FOR_ITER)
+        if node.cast is not None:
+            self.emit(CAST, CAST_TARGETS.index(node.cast))
+        self.emit_declare(node.var)
+
+        if counter is not None:
+            self.emit(LOOP_GUARD, counter)
+        breaks, continues = self.compile_loop_body(node.body)
+
+        for offset in continues:
+            self.patch(offset, loop_start)
+        self.emit(JUMP, loop_start)
+        # A break leaves the iterator behind; running out of elements pops it
+        for offset in breaks:
+            self.patch(offset)
+        if breaks:
+            self.emit(POP)
+        self.patch(jump_end)
+
+    def compile_while(self, node):
+        counter = self.emit_loop_counter()
+        loop_start = self.here()
+        jump_end = self.emit_jump_if_false(node.condition)
+
+        if counter is not None:
+            self.emit(LOOP_GUARD, counter)
+        breaks, continues = self.compile_loop_body(node.body)
+
+        for offset in continues:
+            self.patch(offset, loop_start)
+        self.emit(JUMP, loop_start)
+        self.patch(jump_end)
+        for offset in breaks:
+            self.patch(offset)
+
+    def emit_loop_counter(self):
+        """With loop guards on, declare a hidden local counting this loop's iterations."""
+        if not self.loop_guards:
+            return None
+        counter = self.new_local(f"$loop{self.loop_count}")
+        self.loop_count += 1
+        self.emit(LOAD_CONST, self.const(0))
+        self.emit(STORE_LOCAL, counter)
+        return counter
+
+    def compile_loop_body(self, body):
+        """Compile a loop body; returns the break and continue jumps to patch."""
+        self.loops.append(([], []))
+        self.compile_block(body)
+        return self.loops.pop()
+
+    def compile_break(self, node):
+        self.loops[-1][0].append(self.emit(JUMP))
+
+    def compile_continue(self, node):
+        self.loops[-1][1].append(self.emit(JUMP))
+
+    def compile_return(self, node):
+        if node.value is None:
+            self.emit(LOAD_CONST, self.const(None))
+        else:
+            self.compile_expression(node.value)
+        self.emit(RETURN_VALUE)
+
+    # Expressions
+
+    def compile_expression(self, node):
+        handler = self.expression_handlers.get(type(node))
+        if handler is None:
+            raise JunoCompileError(f"Cannot compile {type(node).__name__}", node.line, None, self.filename)
+        handler(node)
+
+    def compile_literal(self, node):
+        self.emit(LOAD_CONST, self.const(node.value))
+
+    def compile_name(self, node):
+        self.emit_load(node)
+
+    def compile_binary(self, node):
+        op = node.op
+        self.compile_expression(node.left)
+        if op == "&&" or op == "||":
+            jump = self.emit(JUMP_IF_FALSE_OR_POP if op == "&&" else JUMP_IF_TRUE_OR_POP)
+            self.compile_expression(node.right)
+            self.patch(jump)
+            return
+        self.compile_expression(node.right)
+        self.emit(BINARY_OPCODES[op], WRAP_TARGETS.index(node.wrap))
+
+    def compile_unary(self, node):
+        self.compile_expression(node.operand)
+        if node.op == "!":
+            self.emit(UNARY_NOT)
+        else:
+            self.emit(UNARY_NEG, WRAP_TARGETS.index(node.wrap))
+
+    def compile_assign(self, node, discard=False):
+        target = node.target
+        if discard and is_one(node.value) and node.op in ("+=", "-="):
+            if self.emit_increment(target, node.op[0], node.cast):
+                return
+        value = node.value
+        if (discard and node.op == "=" and isinstance(value, ast.BinaryOp) and value.op in ("+", "-")
+                and isinstance(value.left, ast.Name) and isinstance(target, ast.Name)
+                and value.left.is_global == target.is_global and value.left.slot == target.slot
+                and is_one(value.right)):
+            if self.emit_increment(target, value.op, value.wrap):
+                return
+        if isinstance(target, ast.Index):
+            self.compile_expression(target.target)
+            self.compile_expression(target.index)
+            if node.op != "=":
+                self.emit(DUP_TWO)
+                self.emit(LOAD_INDEX)
+        elif node.op != "=":
+            self.emit_load(target)
+        self.compile_expression(node.value)
+        if node.op != "=":
+            self.emit(BINARY_OPCODES[node.op[:-1]])
+            if node.cast is not None:
+                self.emit(CAST, CAST_TARGETS.index(node.cast))
+        if isinstance(target, ast.Index):
+            self.emit(STORE_INDEX, 0 if discard else 1)
+            return
+        if not discard:
+            self.emit(DUP)
+        self.emit_store(target)
+
+    def compile_incdec(self, node, discard=False):
+        if isinstance(node.target, ast.Index):
+            self.compile_element_incdec(node, discard)
+            return
+        if discard and self.emit_increment(node.target, node.op[0], node.wrap):
+            return
+        self.emit_load(node.target)
+        if not discard and not node.prefix:
+            self.emit(DUP)
+        self.emit(LOAD_CONST, self.const(1))
+        self.emit(BINARY_ADD if node.op == "++" else BINARY_SUB, WRAP_TARGETS.index(node.wrap))
+        if not discard and node.prefix:
+            self.emit(DUP)
+        self.emit_store(node.target)
+
+    def compile_element_incdec(self, node, discard):
+        self.compile_expression(node.target.target)
+        self.compile_expression(node.target.index)
+        self.emit(DUP_TWO)
+        self.emit(LOAD_INDEX)
+        if not discard and not node.prefix:
+            # Keep the old value as the result, below the array and index
+            self.emit(DUP)
+            self.emit(ROT_FOUR)
+        self.emit(LOAD_CONST, self.const(1))
+        self.emit(BINARY_ADD if node.op == "++" else BINARY_SUB, WRAP_TARGETS.index(node.wrap))
+        self.emit(STORE_INDEX, 1 if not discard and node.prefix else 0)
+
+    def compile_conditional(self, node):
+        jump_else = self.emit_jump_if_false(node.condition)
+        self.compile_expression(node.then)
+        jump_end = self.emit(JUMP)
+        self.patch(jump_else)
+        self.compile_expression(node.orelse)
+        self.patch(jump_end)
+
+    def compile_cast(self, node):
+        self.compile_expression(node.operand)
+        self.emit(CAST, CAST_TARGETS.index(node.type))
+
+    def compile_concat(self, node):
+        for part in node.parts:
+            self.compile_expression(part)
+        self.emit(BUILD_STRING, len(node.parts))
+
+    def compile_index(self, node):
+        self.compile_expression(node.target)
+        self.compile_expression(node.index)
+        self.emit(LOAD_INDEX)
+
+    def compile_length(self, node):
+        self.compile_expression(node.target)
+        self.emit(ARRAY_LENGTH)
+
+    def compile_new_array(self, node):
+        self.compile_expression(node.length)
+        self.emit(NEW_ARRAY, self.const(node.type))
+
+    def compile_array_literal(self, node):
+        for element in node.elements:
+            self.compile_expression(element)
+        self.emit(LOAD_CONST, self.const(node.type))
+        self.emit(BUILD_ARRAY, len(node.elements))
+
+    def compile_call(self, node):
+        if len(node.args) > MAX_ARGUMENTS:
+            raise JunoCompileError(f"Too many arguments in call to '{node.name}'", node.line, None, self.filename)
+        # A method that is not defined (yet) gets an empty slot; the VM
+        # reports the error if the call runs while it is still empty
+        slot = self.method_index.setdefault(node.name, len(self.method_index))
+        for arg in node.args:
+            self.compile_expression(arg)
+        self.emit(CALL, slot << CALL_SLOT_SHIFT | len(node.args))
+
+
+def compile_program(program, filename="<input>", loop_guards=False, report=None, method_index=None):
+    """
+    Compile a parsed program to bytecode.
+
+    Args:
+        program (Program): The parsed program
+        filename (str): The name of the file being compiled
+        loop_guards (bool): Emit iteration counters for max_loop_iterations
+        report (OptimizationReport): Receives peephole optimizations, or None
+        method_index (dict): Method slots from earlier compilations, or None
+
+    Returns:
+        CompiledProgram: The compiled program
+    """
+    return Compiler(program, filename, loop_guards, report, method_index).compile()
+
+
+def disassemble(code_object, global_names=(), method_names=()):
+    """
+    Render a CodeObject as human-readable text.
+
+    Args:
+        code_object (CodeObject): The code to disassemble
+        global_names (list): Global variable names by slot
+        method_names (list): Method names by slot
+
+    Returns:
+        str: One line per instruction
+    """
+    lines = [f"Disassembly of {code_object.name}:"]
+    code = code_object.code
+    for pc in range(0, len(code), 2):
+        opcode, arg = code[pc], code[pc + 1]
+        text = f"  {pc:5d} {OPNAMES[opcode]:<22} {arg}"
+        if opcode == CAST:
+            text += f" ({CAST_TARGETS[arg]})"
+        elif (opcode in OPCODE_OPERATORS or opcode == UNARY_NEG) and arg:
+            text += f" (wraps to {WRAP_TARGETS[arg]})"
+        elif opcode == CALL:
+            slot, argc = arg >> CALL_SLOT_SHIFT, arg & MAX_ARGUMENTS
+            name = method_names[slot] if slot < len(method_names) else f"#{slot}"
+            text += f" ({name}, {argc} argument(s))"
+        elif opcode in (LOAD_CONST, RAISE_ERROR, NEW_ARRAY):
+            text += f" ({code_object.consts[arg]!r})"
+        elif opcode in (LOAD_LOCAL, STORE_LOCAL, LOOP_GUARD):
+            text += f" ({code_object.varnames[arg]})"
+        elif opcode in (LOAD_GLOBAL, STORE_GLOBAL, DECLARE_GLOBAL) and arg < len(global_names):
+            text += f" ({global_names[arg]})"
+        elif opcode in (INCREMENT_LOCAL, INCREMENT_GLOBAL):
+            slot = arg >> INCREMENT_SLOT_SHIFT
+            if opcode == INCREMENT_LOCAL:
+                name = code_object.varnames[slot]
+            else:
+                name = global_names[slot] if slot < len(global_names) else f"#{slot}"
+            text += f" ({name} {'-' if arg & 1 else '+'}= 1, wraps to {WRAP_TARGETS[arg >> 1 & 3]})"
+        lines.append(text)
+    return "\n".join(lines)
+
+
+class Frame:
+    """
+    A suspended caller on the VM's frame stack: its code object, the pc to
+    resume at, its locals and the height of the evaluation stack at the call.
+    """
+
+    __slots__ = ("code_object", "pc", "locals", "stack_base")
+
+    def __init__(self, code_object, pc, local_vars, stack_base):
+        self.code_object = code_object
+        self.pc = pc
+        self.locals = local_vars
+        self.stack_base = stack_base
+
+
+class VM:
+    """
+    The Juno virtual machine.
+    Calls push a frame onto an explicit frame stack, so deep Juno recursion
+    does not consume Python stack.
+    """
+
+    def __init__(self, compiled, filename="<input>", max_loop_iterations=None,
+                 max_call_depth=DEFAULT_MAX_CALL_DEPTH, output=None):
+        """
+        Initialize the VM.
+
+        Args:
+            compiled (CompiledProgram): The program to run
+            filename (str): The name of the file being executed
+            max_loop_iterations (int): Fail any single loop that runs more
+                iterations than this; only enforced for code compiled with
+                loop_guards
+            max_call_depth (int): Fail once method calls nest deeper than this
+            output (Output): Where printed text goes; defaults to the shared
+                buffered stdout
+        """
+        self.compiled = compiled
+        self.filename = filename
+        self.max_loop_iterations = max_loop_iterations
+        self.max_call_depth = max_call_depth
+        self.output = output or stdout_output()
+        self.globals = [UNSET] * len(compiled.global_names)
+
+    def run(self):
+        """Run the program's top-level code."""
+        code_object = self.compiled.main
+        try:
+            self._run(code_object)
+        except JunoError as e:
+            if e.filename is None:
+                e.filename = self.filename
+            raise
+
+    def extend(self, compiled):
+        """
+        Make `compiled`'s top-level code the code run() executes next,
+        keeping the globals and methods of the programs run so far. It must
+        have been compiled with their method_index, as the inputs of a REPL
+        session are.
+
+        Args:
+            compiled (CompiledProgram): The compiled program
+        """
+        current = self.compiled
+        current.main = compiled.main
+        current.global_names = compiled.global_names
+        current.method_index = compiled.method_index
+        methods = current.methods
+        methods += [None] * (len(compiled.methods) - len(methods))
+        for slot, code_object in enumerate(compiled.methods):
+            if code_object is not None:
+                methods[slot] = code_object
+        self.globals += [UNSET] * (len(compiled.global_names) - len(self.globals))
+
+    def call_error(self, arg):
+        """Return the error for a CALL whose method is missing or takes other arguments."""
+        slot, argc = arg >> CALL_SLOT_SHIFT, arg & MAX_ARGUMENTS
+        name = next(name for name, index in self.compiled.method_index.items() if index == slot)
+        callee = self.compiled.methods[slot]
+        if callee is None:
+            return JunoRuntimeError(f"Undefined method '{name}'")
+        return JunoRuntimeError(f"Method '{name}' expects {len(callee.params)} argument(s) but got {argc}")
+
+    def _run(self, code_object):
+        methods = self.compiled.methods
+        global_names = self.compiled.global_names
+        global_vars = self.globals
+        max_depth = self.max_call_depth
+        write = self.output.write
+        frames = []
+        stack = []
+        push = stack.append
+        pop = stack.pop
+
+        current = code_object
+        code = current.code
+        consts = current.consts
+        local_vars = [None] * current.nlocals
+        pc = 0
+
+        try:
+            while True:
+                opcode = code[pc]
+                arg = code[pc + 1]
+                pc += 2
+
+                # Ordered by how often each opcode runs in typical loops
+                if opcode == LOAD_CONST:
+                    push(consts[arg])
+                elif opcode == LOAD_LOCAL:
+                    push(local_vars[arg])
+                elif opcode == LOAD_GLOBAL:
+                    value = global_vars[arg]
+                    if value is UNSET:
+                        raise JunoRuntimeError(f"Variable '{global_names[arg]}' used before its declaration ran")
+                    push(value)
+                elif opcode == POP_JUMP_IF_NOT_LT:
+                    right = pop()
+                    left = pop()
+                    try:
+                        if not left < right:
+                            pc = arg
+                    except TypeError:
+                        binary_op("<", left, right)
+                elif opcode == JUMP:
+                    pc = arg
+                elif opcode == INCREMENT_LOCAL:
+                    slot = arg >> INCREMENT_SLOT_SHIFT
+                    value = local_vars[slot]
+                    try:
+                        value = value - 1 if arg & 1 else value + 1
+                    except TypeError:
+                        binary_op("-" if arg & 1 else "+", value, 1)
+                    low, high = WRAP_RANGES[arg >> 1 & 3]
+                    if not low <= value <= high:
+                        value = wrap(WRAP_TARGETS[arg >> 1 & 3], value)
+                    local_vars[slot] = value
+                elif opcode == INCREMENT_GLOBAL:
+                    slot = arg >> INCREMENT_SLOT_SHIFT
+                    value = global_vars[slot]
+                    if value is UNSET:
+                        raise JunoRuntimeError(f"Variable '{global_names[slot]}' used before its declaration ran")
+                    try:
+                        value = value - 1 if arg & 1 else value + 1
+                    except TypeError:
+                        binary_op("-" if arg & 1 else "+", value, 1)
+                    low, high = WRAP_RANGES[arg >> 1 & 3]
+                    if not low <= value <= high:
+                        value = wrap(WRAP_TARGETS[arg >> 1 & 3], value)
+                    global_vars[slot] = value
+                elif opcode == BINARY_ADD:
+                    right = pop()
+                    left = stack[-1]
+                    if type(left) is str or type(right) is str:
+                        stack[-1] = add(left, right)
+                    else:
+                        try:
+                            value = left + right
+                        except TypeError:
+                            value = binary_op("+", left, right)
+                        if arg:
+                            low, high = WRAP_RANGES[arg]
+                            if not low <= value <= high:
+                                value = wrap(WRAP_TARGETS[arg], value)
+                        stack[-1] = value
+                elif opcode == STORE_LOCAL:
+                    local_vars[arg] = pop()
+                elif opcode == STORE_GLOBAL:
+                    if global_vars[arg] is UNSET:
+                        raise JunoRuntimeError(f"Variable '{global_names[arg]}' used before its declaration ran")
+                    global_vars[arg] = pop()
+                elif opcode == POP_JUMP_IF_FALSE:
+                    if not pop():
+                        pc = arg
+                elif opcode == POP_JUMP_IF_NOT_GT:
+                    right = pop()
+                    left = pop()
+                    try:
+                        if not left > right:
+                            pc = arg
+                    except TypeError:
+                        binary_op(">", left, right)
+                elif opcode == POP_JUMP_IF_NOT_LE:
+                    right = pop()
+                    left = pop()
+                    try:
+                        if not left <= right:
+                            pc = arg
+                    except TypeError:
+                        binary_op("<=", left, right)
+                elif opcode == POP_JUMP_IF_NOT_GE:
+                    right = pop()
+                    left = pop()
+                    try:
+                        if not left >= right:
+                            pc = arg
+                    except TypeError:
+                        binary_op(">=", left, right)
+                elif opcode == BINARY_SUB:
+                    right = pop()
+                    try:
+                        value = stack[-1] - right
+                    except TypeError:
+                        value = binary_op("-", stack[-1], right)
+                    if arg:
+                        low, high = WRAP_RANGES[arg]
+                        if not low <= value <= high:
+                            value = wrap(WRAP_TARGETS[arg], value)
+                    stack[-1] = value
+                elif opcode == BINARY_MUL:
+                    right = pop()
+                    try:
+                        value = stack[-1] * right
+                    except TypeError:
+                        value = binary_op("*", stack[-1], right)
+                    if arg:
+                        low, high = WRAP_RANGES[arg]
+                        if not low <= value <= high:
+                            value = wrap(WRAP_TARGETS[arg], value)
+                    stack[-1] = value
+                elif opcode == BINARY_MOD:
+                    right = pop()
+                    left = stack[-1]
+                    # Floor and truncating remainders agree on non-negative ints
+                    if type(left) is int and type(right) is int and left >= 0 and right > 0:
+                        stack[-1] = left % right
+                    else:
+                        stack[-1] = binary_op("%", left, right)
+                elif opcode == LOAD_INDEX:
+                    index = pop()
+                    target = stack[-1]
+                    if (type(index) is int and 0 <= index and type(target) in ARRAY_CLASSES
+                            and index < len(target)):
+                        stack[-1] = target[index]
+                    else:
+                        stack[-1] = load_index(target, index)
+                elif opcode == CAST:
+                    value = stack[-1]
+                    if type(value) is int:
+                        if arg >= 2:
+                            stack[-1] = float(value)
+                        else:
+                            low, high = CAST_RANGES[arg]
+                            if not low <= value <= high:
+                                stack[-1] = wrap(CAST_TARGETS[arg], value)
+                    else:
+                        stack[-1] = cast(CAST_TARGETS[arg], value)
+                elif opcode == CALL:
+                    callee = methods[arg >> CALL_SLOT_SHIFT]
+                    argc = arg & MAX_ARGUMENTS
+                    if callee is None or len(callee.params) != argc:
+                        raise self.call_error(arg)
+                    if len(frames) >= max_depth:
+                        raise JunoRuntimeError(f"Stack overflow: more than {max_depth} nested calls")
+                    new_locals = [None] * callee.nlocals
+                    if argc:
+                        new_locals[:argc] = stack[-argc:]
+                        del stack[-argc:]
+                    frames.append(Frame(current, pc, local_vars, len(stack)))
+                    current = callee
+                    code = current.code
+                    consts = current.consts
+                    local_vars = new_locals
+                    pc = 0
+                elif opcode == RETURN_VALUE:
+                    if not frames:
+                        return
+                    # Leave only the return value above the caller's operands
+                    frame = frames.pop()
+                    value = pop()
+                    del stack[frame.stack_base:]
+                    push(value)
+                    current = frame.code_object
+                    pc = frame.pc
+                    local_vars = frame.locals
+                    code = current.code
+                    consts = current.consts
+                elif opcode == COMPARE_EQ:
+                    right = pop()
+                    stack[-1] = stack[-1] == right
+                elif opcode == COMPARE_NE:
+                    right = pop()
+                    stack[-1] = stack[-1] != right
+                elif opcode == COMPARE_LT:
+                    right = pop()
+                    try:
+                        stack[-1] = stack[-1] < right
+                    except TypeError:
+                        stack[-1] = binary_op("<", stack[-1], right)
+                elif opcode == COMPARE_GT:
+                    right = pop()
+                    try:
+                        stack[-1] = stack[-1] > right
+                    except TypeError:
+                        stack[-1] = binary_op(">", stack[-1], right)
+                elif opcode == COMPARE_LE:
+                    right = pop()
+                    try:
+                        stack[-1] = stack[-1] <= right
+                    except TypeError:
+                        stack[-1] = binary_op("<=", stack[-1], right)
+                elif opcode == COMPARE_GE:
+                    right = pop()
+                    try:
+                        stack[-1] = stack[-1] >= right
+                    except TypeError:
+                        stack[-1] = binary_op(">=", stack[-1], right)
+                elif opcode == BINARY_DIV:
+                    right = pop()
+                    left = stack[-1]
+                    if type(left) is int and type(right) is int and left >= 0 and right > 0:
+                        stack[-1] = left // right
+                    else:
+                        value = binary_op("/", left, right)
+                        if arg:
+                            low, high = WRAP_RANGES[arg]
+                            if not low <= value <= high:
+                                value = wrap(WRAP_TARGETS[arg], value)
+                        stack[-1] = value
+                elif opcode == STORE_INDEX:
+                    value = pop()
+                    index = pop()
+                    store_index(pop(), index, value)
+                    if arg:
+                        push(value)
+                elif opcode == PRINT_STRING:
+                    count = arg >> 1
+                    parts = [format_value(part) for part in stack[-count:]]
+                    del stack[-count:]
+                    if arg & 1:
+                        parts.append("\n")
+                    write("".join(parts))
+                elif opcode == PRINT:
+                    text = format_value(pop())
+                    write(text + "\n" if arg else text)
+                elif opcode == DUP:
+                    push(stack[-1])
+                elif opcode == POP:
+                    pop()
+                elif opcode == DECLARE_GLOBAL:
+                    global_vars[arg] = pop()
+                elif opcode == UNARY_NOT:
+                    stack[-1] = not stack[-1]
+                elif opcode == UNARY_NEG:
+                    value = stack[-1]
+                    if isinstance(value, bool) or not isinstance(value, (int, float)):
+                        raise JunoRuntimeError(f"Bad operand type for '-': {format_value(value)}")
+                    stack[-1] = wrap(WRAP_TARGETS[arg], -value) if arg else -value
+                elif opcode == JUMP_IF_FALSE_OR_POP:
+                    if stack[-1]:
+                        pop()
+                    else:
+                        pc = arg
+                elif opcode == JUMP_IF_TRUE_OR_POP:
+                    if stack[-1]:
+                        pc = arg
+                    else:
+                        pop()
+                elif opcode == LOOP_GUARD:
+                    count = local_vars[arg] + 1
+                    limit = self.max_loop_iterations
+                    if limit is not None and count > limit:
+                        raise JunoRuntimeError(f"Loop exceeded the limit of {limit} iterations")
+                    local_vars[arg] = count
+                elif opcode == BUILD_STRING:
+                    parts = stack[-arg:]
+                    del stack[-arg:]
+                    push("".join([format_value(part) for part in parts]))
+                elif opcode == FOR_ITER:
+                    try:
+                        push(next(stack[-1]))
+                    except StopIteration:
+                        pop()
+                        pc = arg
+                elif opcode == GET_ITER:
+                    check_iterable(stack[-1])
+                    stack[-1] = iter(stack[-1])
+                elif opcode == ARRAY_LENGTH:
+                    stack[-1] = array_length(stack[-1])
+                elif opcode == NEW_ARRAY:
+                    stack[-1] = new_array(consts[arg], stack[-1])
+                elif opcode == BUILD_ARRAY:
+                    element_type = pop()
+                    start = len(stack) - arg
+                    values = stack[start:]
+                    del stack[start:]
+                    push(make_array(element_type, values))
+                elif opcode == DUP_TWO:
+                    push(stack[-2])
+                    push(stack[-2])
+                elif opcode == ROT_FOUR:
+                    stack.insert(-3, pop())
+                elif opcode == RAISE_ERROR:
+                    raise JunoRuntimeError(consts[arg])
+                else:
+                    raise JunoRuntimeError(f"Unknown opcode {opcode}")
+        except JunoError as e:
+            if e.line is None:
+                e.line = current.line_at(pc - 2)
+            raise
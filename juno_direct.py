@@ -29,15 +29,12 @@ def main():
         return 1
     
     try:
-        # Read the file
-        with open(file_path, 'r', encoding='utf-8') as f:
-            source = f.read()
-        
         # Create an interpreter with quiet mode
         interpreter = Interpreter(quiet=True)
         
-        # Execute the file
-        result = interpreter.execute(source, file_path)
+        # Execute the file, which is streamed to the lexer
+        with open(file_path, 'r', encoding='utf-8', newline='') as source:
+            result = interpreter.execute(source, file_path)
         return 0 if result else 1
     
     except Exception as e:
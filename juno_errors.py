@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Juno Errors
+Exception types shared by the Juno lexer, parser and interpreter.
+"""
+
+
+class JunoError(Exception):
+    """Base class for all errors raised while processing Juno code."""
+
+    def __init__(self, message, line=None, column=None, filename=None):
+        """
+        Initialize the error.
+
+        Args:
+            message (str): The error message
+            line (int): The source line the error refers to (1-based)
+            column (int): The source column the error refers to (1-based)
+            filename (str): The name of the file being processed
+        """
+        super().__init__(message)
+        self.message = message
+        self.line = line
+        self.column = column
+        self.filename = filename
+
+    def __str__(self):
+        location = ""
+        if self.filename:
+            location = self.filename
+        if self.line is not None:
+            location += f":{self.line}" if location else f"line {self.line}"
+            if self.column is not None:
+                location += f":{self.column}"
+        return f"{location}: {self.message}" if location else self.message
+
+
+class JunoSyntaxError(JunoError):
+    """Raised when Juno source code cannot be tokenized or parsed."""
+
+    def __init__(self, message, line=None, column=None, filename=None, incomplete=False):
+        """
+        Initialize the error.
+
+        Args:
+            message (str): The error message
+            line (int): The source line the error refers to (1-based)
+            column (int): The source column the error refers to (1-based)
+            filename (str): The name of the file being processed
+            incomplete (bool): True if the source stops partway through a
+                construct (such as a block comment), so more input could
+                still make it valid
+        """
+        super().__init__(message, line, column, filename)
+        self.incomplete = incomplete
+
+
+class JunoRuntimeError(JunoError):
+    """Raised when a Juno program fails while it is running."""
+
+
+class JunoCompileError(JunoError):
+    """Raised when the bytecode compiler cannot lower a construct."""
@@ -0,0 +1,863 @@
+#!/usr/bin/env python3
+"""
+Juno Executor
+Runs a parsed Juno program by walking its AST.
+"""
+
+import sys
+from itertools import islice
+
+from juno_errors import JunoRuntimeError
+from juno_runtime import (format_value, type_name, binary_op, cast, wrap, new_array, make_array,
+                          load_index, store_index, array_length, check_iterable,
+                          ARRAY_CLASSES, BINARY_OPERATORS, INTEGRAL_RANGES)
+from juno_output import stdout_output
+import juno_ast as ast
+
+# Default limit on nested method calls
+DEFAULT_MAX_CALL_DEPTH = 10000
+
+# Upper bound on the Python frames one Juno call uses when walking the tree;
+# the Python recursion limit is raised to fit the configured call depth
+PYTHON_FRAMES_PER_CALL = 24
+
+# Pending control transfers recorded in Frame.jump
+BREAK = "break"
+CONTINUE = "continue"
+RETURN = "return"
+
+# Marks an expression whose value is not known until it runs
+NOT_CONSTANT = object()
+
+# The value of a global whose declaration has not run yet
+UNSET = object()
+
+# The range `++` and `--` keep a result in when it need not wrap around
+UNBOUNDED = (-float("inf"), float("inf"))
+
+
+def assigned_names(node, globals_only=False):
+    """
+    Return the names assigned (by `=`, compound assignment, `++` or `--`)
+    under `node`. Storing into an element, as in `a[i] = x`, counts as
+    assigning the array's name.
+    """
+    names = set()
+    for child in ast.walk(node):
+        if isinstance(child, (ast.Assign, ast.IncDec)):
+            target = child.target
+            while isinstance(target, ast.Index):
+                target = target.target
+            if isinstance(target, ast.Name) and (target.is_global or not globals_only):
+                names.add(target.name)
+    return names
+
+
+def contains_call(node):
+    """Return True if `node` contains a method call."""
+    return any(isinstance(child, ast.Call) for child in ast.walk(node))
+
+
+def is_number(value):
+    """Return True for int and double values (booleans are not numbers in Juno)."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class Frame:
+    """
+    The activation record of a method call, or of the top-level code.
+    `locals` is a list indexed by the slots the resolver assigned. `jump` is
+    set by break, continue and return: blocks stop as soon as it is set,
+    and the enclosing loop or call consumes it.
+    """
+
+    __slots__ = ("method", "locals", "jump", "return_value")
+
+    def __init__(self, method, local_vars):
+        self.method = method
+        self.locals = local_vars
+        self.jump = None
+        self.return_value = None
+
+
+class Executor:
+    """
+    The AST-walking executor.
+    Statements and expressions are dispatched on their node type; the
+    source text is never looked at again once it has been parsed. The
+    program must have been through the resolver, which decides statically
+    whether each variable is global or local.
+    """
+
+    def __init__(self, program, filename="<input>", max_loop_iterations=None,
+                 max_call_depth=DEFAULT_MAX_CALL_DEPTH, optimize=False, output=None):
+        """
+        Initialize the executor.
+
+        Args:
+            program (Program): The parsed program
+            filename (str): The name of the file being executed
+            max_loop_iterations (int): Fail any single loop that runs more
+                iterations than this; None means no limit
+            max_call_depth (int): Fail once method calls nest deeper than this
+            optimize (bool): Fold constant sub-expressions when compiling
+                expressions
+            output (Output): Where printed text goes; defaults to the shared
+                buffered stdout
+        """
+        self.program = program
+        self.filename = filename
+        self.methods = program.methods
+        self.max_loop_iterations = max_loop_iterations
+        self.max_call_depth = max_call_depth
+        self.optimize = optimize
+        self.output = output or stdout_output()
+        self.call_depth = 0
+        self.globals = [UNSET] * len(program.global_names)
+        # Bumped whenever the method table changes; call sites cache the
+        # method they last looked up together with this version
+        self.method_version = 0
+
+        # Loop analysis, done once per For node
+        self.loop_plans = {}
+        self.method_assigned = set()
+        for method in self.methods.values():
+            self.method_assigned.update(assigned_names(method.body, globals_only=True))
+
+        self.statement_handlers = {
+            ast.VarDecl: self.exec_var_decl,
+            ast.ExprStmt: self.exec_expr_stmt,
+            ast.Print: self.exec_print,
+            ast.If: self.exec_if,
+            ast.For: self.exec_for,
+            ast.ForEach: self.exec_for_each,
+            ast.While: self.exec_while,
+            ast.Block: self.exec_block,
+            ast.Return: self.exec_return,
+            ast.Break: self.exec_break,
+            ast.Continue: self.exec_continue,
+            ast.MethodDecl: self.exec_nothing,
+            ast.ImportDecl: self.exec_nothing,
+            ast.ClassDecl: self.exec_class,
+        }
+        self.closures = {}
+        self.expression_compilers = {
+            ast.Literal: self.compile_literal,
+            ast.Name: self.compile_name,
+            ast.BinaryOp: self.compile_binary,
+            ast.UnaryOp: self.compile_unary,
+            ast.Assign: self.compile_assign,
+            ast.IncDec: self.compile_incdec,
+            ast.Conditional: self.compile_conditional,
+            ast.Cast: self.compile_cast,
+            ast.Concat: self.compile_concat,
+            ast.Index: self.compile_index,
+            ast.Length: self.compile_length,
+            ast.NewArray: self.compile_new_array,
+            ast.ArrayLiteral: self.compile_array_literal,
+            ast.Call: self.compile_call,
+        }
+
+    def run(self):
+        """Execute the program's top-level statements in order."""
+        frame = Frame(None, [None] * self.program.frame_size)
+
+        # Juno calls recurse on the Python stack, so make room for the configured depth
+        old_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(old_limit, old_limit + self.max_call_depth * PYTHON_FRAMES_PER_CALL))
+        try:
+            for statement in self.program.body:
+                self.execute(statement, frame)
+                if frame.jump is RETURN:
+                    # A top-level return ends the program
+                    break
+        except RecursionError:
+            # Only deeply nested expressions get here; calls are limited in compile_call
+            raise JunoRuntimeError("Stack overflow: program nests too deeply",
+                                   None, None, self.filename) from None
+        finally:
+            sys.setrecursionlimit(old_limit)
+
+    def define_methods(self, methods):
+        """
+        Add or replace methods, e.g. as they are declared in the REPL. Call
+        sites look their method up again the next time they run.
+
+        Args:
+            methods (dict): Maps method names to resolved MethodDecl nodes
+        """
+        self.methods.update(methods)
+        for method in methods.values():
+            self.method_assigned.update(assigned_names(method.body, globals_only=True))
+        # Loop plans depend on which globals methods assign
+        self.loop_plans.clear()
+        self.method_version += 1
+
+    def extend(self, program):
+        """
+        Make `program` the one run() executes next, keeping the globals and
+        methods of the programs run so far. The program must have been
+        resolved against them, as the inputs of a REPL session are.
+
+        Args:
+            program (Program): The resolved program
+        """
+        self.program = program
+        self.globals += [UNSET] * (len(program.global_names) - len(self.globals))
+        if program.methods:
+            self.define_methods(program.methods)
+
+    def error(self, message, node):
+        """Raise a runtime error located at `node`."""
+        raise JunoRuntimeError(message, node.line, None, self.filename)
+
+    # Variables
+    #
+    # Locals live in the current frame's slot list and globals in
+    # self.globals, both indexed by the slot the resolver assigned. Block
+    # scoping was checked by the resolver, so a name that is out of scope
+    # can never be referenced.
+
+    def lookup(self, node, frame):
+        if not node.is_global:
+            return frame.locals[node.slot]
+        value = self.globals[node.slot]
+        if value is UNSET:
+            # A method can run before the top-level declaration it refers to
+            self.error(f"Variable '{node.name}' used before its declaration ran", node)
+        return value
+
+    def store(self, node, value, frame):
+        if not node.is_global:
+            frame.locals[node.slot] = value
+        elif self.globals[node.slot] is not UNSET:
+            self.globals[node.slot] = value
+        else:
+            self.error(f"Variable '{node.name}' used before its declaration ran", node)
+
+    def declare(self, node, value, frame):
+        if node.is_global:
+            self.globals[node.slot] = value
+        else:
+            frame.locals[node.slot] = value
+
+    # Statements
+
+    def execute(self, node, frame):
+        """Execute a statement node."""
+        self.statement_handlers[type(node)](node, frame)
+
+    def exec_nothing(self, node, frame):
+        pass
+
+    def exec_block(self, node, frame):
+        handlers = self.statement_handlers
+        for statement in node.statements:
+            handlers[type(statement)](statement, frame)
+            if frame.jump is not None:
+                return
+
+    def exec_class(self, node, frame):
+        # Fields behave like top-level variables; methods were hoisted by the parser
+        for member in node.members:
+            if isinstance(member, ast.VarDecl):
+                self.execute(member, frame)
+
+    def exec_var_decl(self, node, frame):
+        value = None if node.value is None else self.evaluate(node.value, frame)
+        self.declare(node, value, frame)
+
+    def exec_expr_stmt(self, node, frame):
+        self.evaluate(node.expr, frame)
+
+    def exec_print(self, node, frame):
+        text = "" if node.value is None else format_value(self.evaluate(node.value, frame))
+        self.output.write(text + "\n" if node.newline else text)
+
+    def exec_if(self, node, frame):
+        if self.evaluate(node.condition, frame):
+            self.exec_block(node.then, frame)
+        elif node.orelse is not None:
+            self.exec_block(node.orelse, frame)
+
+    def run_loop_body(self, body, frame):
+        """Run one iteration of a loop body; returns False if the loop must stop."""
+        self.exec_block(body, frame)
+        jump = frame.jump
+        if jump is None:
+            return True
+        if jump is RETURN:
+            return False
+        frame.jump = None
+        return jump is CONTINUE
+
+    def exec_for(self, node, frame):
+        if node.init is not None:
+            self.execute(node.init, frame)
+
+        plan = self.loop_plans.get(node)
+        if plan is None:
+            plan = self.loop_plans[node] = self.plan_loop(node)
+        if plan and self.exec_counted_for(node, plan, frame):
+            return
+
+        condition = node.condition
+        update = node.update
+        body = node.body
+        evaluate = self.evaluate
+        run_loop_body = self.run_loop_body
+        limit = self.max_loop_iterations
+        iterations = 0
+
+        while condition is None or evaluate(condition, frame):
+            if limit is not None:
+                iterations += 1
+                if iterations > limit:
+                    self.loop_limit_error(node)
+            if not run_loop_body(body, frame):
+                break
+            if update is not None:
+                evaluate(update, frame)
+
+    def exec_for_each(self, node, frame):
+        items = self.evaluate(node.iterable, frame)
+        try:
+            check_iterable(items)
+        except JunoRuntimeError as e:
+            self.error(e.message, node)
+
+        limit = self.max_loop_iterations
+        exceeded = limit is not None and len(items) > limit
+        if exceeded:
+            items = islice(items, limit)
+        if node.cast is not None:
+            # An int array read into a double variable
+            items = map(float, items)
+
+        body = node.body
+        run_loop_body = self.run_loop_body
+        local_vars = frame.locals
+        slot = node.var.slot
+        for value in items:
+            local_vars[slot] = value
+            if not run_loop_body(body, frame):
+                return
+        if exceeded:
+            self.loop_limit_error(node)
+
+    def exec_while(self, node, frame):
+        condition = node.condition
+        body = node.body
+        evaluate = self.evaluate
+        run_loop_body = self.run_loop_body
+        limit = self.max_loop_iterations
+        iterations = 0
+
+        while evaluate(condition, frame):
+            if limit is not None:
+                iterations += 1
+                if iterations > limit:
+                    self.loop_limit_error(node)
+            if not run_loop_body(body, frame):
+                break
+
+    def exec_break(self, node, frame):
+        frame.jump = BREAK
+
+    def exec_continue(self, node, frame):
+        frame.jump = CONTINUE
+
+    def loop_limit_error(self, node):
+        self.error(f"Loop exceeded the limit of {self.max_loop_iterations} iterations", node)
+
+    def plan_loop(self, node):
+        """
+        Recognize counting loops of the form
+        `for (i = start; i < bound; i++)` whose body never assigns `i` or
+        `bound`. Such loops run over a Python range with the loop variable
+        written once per iteration, instead of evaluating the condition and
+        update expressions every time round.
+
+        Returns:
+            tuple: (variable node, comparison, bound node, step), or False
+        """
+        init, condition, update = node.init, node.condition, node.update
+
+        if isinstance(init, ast.VarDecl) and init.value is not None:
+            var = init
+        elif (isinstance(init, ast.ExprStmt) and isinstance(init.expr, ast.Assign)
+                and init.expr.op == "=" and isinstance(init.expr.target, ast.Name)):
+            var = init.expr.target
+        else:
+            return False
+
+        if not (isinstance(condition, ast.BinaryOp) and condition.op in ("<", "<=", ">", ">=")
+                and isinstance(condition.left, ast.Name) and condition.left.name == var.name):
+            return False
+        bound = condition.right
+        if not (isinstance(bound, ast.Name)
+                or (isinstance(bound, ast.Literal) and type(bound.value) is int)):
+            return False
+
+        if not (isinstance(update, (ast.IncDec, ast.Assign)) and isinstance(update.target, ast.Name)
+                and update.target.name == var.name):
+            return False
+        if isinstance(update, ast.IncDec):
+            step = 1 if update.op == "++" else -1
+        elif (update.op in ("+=", "-=") and isinstance(update.value, ast.Literal)
+                and type(update.value.value) is int and update.value.value != 0):
+            step = update.value.value if update.op == "+=" else -update.value.value
+        else:
+            return False
+        if (step > 0) != (condition.op in ("<", "<=")):
+            return False
+
+        fixed = [var]
+        if isinstance(bound, ast.Name):
+            fixed.append(bound)
+        if {n.name for n in fixed} & assigned_names(node.body):
+            return False
+        # Methods called from the body can only reassign globals
+        fixed_globals = {n.name for n in fixed if n.is_global}
+        if contains_call(node.body) and fixed_globals & self.method_assigned:
+            return False
+
+        return var, condition.op, bound, step
+
+    def exec_counted_for(self, node, plan, frame):
+        """Run a loop recognized by plan_loop; returns False if it must run generically."""
+        var, op, bound, step = plan
+        start = self.lookup(var, frame)
+        stop = self.evaluate(bound, frame)
+        if type(start) is not int or type(stop) is not int:
+            return False
+
+        if op == "<=":
+            stop += 1
+        elif op == ">=":
+            stop -= 1
+        values = range(start, stop, step)
+        update = node.update
+        result_type = update.wrap if isinstance(update, ast.IncDec) else update.cast
+        if values and result_type is not None:
+            low, high = INTEGRAL_RANGES[result_type]
+            if not low <= values[-1] + step <= high:
+                # The loop variable wraps around on its last step, as it may in Java
+                return False
+
+        limit = self.max_loop_iterations
+        exceeded = limit is not None and len(values) > limit
+        if exceeded:
+            values = values[:limit]
+
+        body = node.body
+        run_loop_body = self.run_loop_body
+        slot = var.slot
+        target = self.globals if var.is_global else frame.locals
+        for value in values:
+            target[slot] = value
+            if not run_loop_body(body, frame):
+                # The loop variable keeps the value it had when the loop broke
+                return True
+
+        if exceeded:
+            self.loop_limit_error(node)
+        target[slot] = values[-1] + step if values else start
+        return True
+
+    def exec_return(self, node, frame):
+        frame.return_value = None if node.value is None else self.evaluate(node.value, frame)
+        frame.jump = RETURN
+
+    # Expressions
+    #
+    # Each expression node is compiled once, the first time it is evaluated,
+    # into a Python closure taking the current frame. Sub-expressions are
+    # compiled into the closures of their parents, so evaluating a tree of
+    # expressions makes direct calls instead of dispatching on node types.
+
+    def evaluate(self, node, frame):
+        """Evaluate an expression node and return its value."""
+        try:
+            closure = self.closures[node]
+        except KeyError:
+            closure = self.closures[node] = self.compile_expression(node)
+        return closure(frame)
+
+    def compile_expression(self, node):
+        """Compile an expression node into a closure taking a Frame."""
+        return self.compile(node)[0]
+
+    def compile(self, node):
+        """
+        Compile an expression node.
+
+        Returns:
+            tuple: (closure, constant), where constant is the node's folded
+                value, or NOT_CONSTANT
+        """
+        closure, constant = self.expression_compilers[type(node)](node)
+        if constant is not NOT_CONSTANT:
+            # Whatever the node was, it now always evaluates to one value
+            return (lambda frame: constant), constant
+        return closure, constant
+
+    def compile_literal(self, node):
+        return None, node.value
+
+    def compile_name(self, node):
+        slot = node.slot
+        if not node.is_global:
+            return (lambda frame: frame.locals[slot]), NOT_CONSTANT
+
+        global_vars = self.globals
+        lookup = self.lookup
+
+        def load_global(frame):
+            value = global_vars[slot]
+            if value is UNSET:
+                return lookup(node, frame)
+            return value
+
+        return load_global, NOT_CONSTANT
+
+    def compile_binary(self, node):
+        op = node.op
+        left, left_constant = self.compile(node.left)
+        right, right_constant = self.compile(node.right)
+
+        if op == "&&" or op == "||":
+            if self.optimize and left_constant is not NOT_CONSTANT:
+                # The left side decides whether the right side ever runs
+                if bool(left_constant) == (op == "||"):
+                    return None, bool(left_constant)
+                if right_constant is not NOT_CONSTANT:
+                    return None, bool(right_constant)
+                return (lambda frame: bool(right(frame))), NOT_CONSTANT
+            if op == "&&":
+                return (lambda frame: bool(left(frame)) and bool(right(frame))), NOT_CONSTANT
+            return (lambda frame: bool(left(frame)) or bool(right(frame))), NOT_CONSTANT
+
+        result_type = node.wrap
+        if self.optimize and left_constant is not NOT_CONSTANT and right_constant is not NOT_CONSTANT:
+            try:
+                result = binary_op(op, left_constant, right_constant)
+                return None, result if result_type is None else wrap(result_type, result)
+            except JunoRuntimeError:
+                # Leave the error to be raised if the expression actually runs
+                pass
+
+        operator = BINARY_OPERATORS[op]
+        error = self.error
+
+        def binary(frame):
+            left_value = left(frame)
+            right_value = right(frame)
+            try:
+                return operator(left_value, right_value)
+            except TypeError:
+                error(f"Bad operand types for '{op}': {type_name(left_value)} and {type_name(right_value)}", node)
+            except JunoRuntimeError as e:
+                error(e.message, node)
+
+        if result_type is None:
+            return binary, NOT_CONSTANT
+        low, high = INTEGRAL_RANGES[result_type]
+
+        def integral_binary(frame):
+            left_value = left(frame)
+            right_value = right(frame)
+            try:
+                result = operator(left_value, right_value)
+            except TypeError:
+                error(f"Bad operand types for '{op}': {type_name(left_value)} and {type_name(right_value)}", node)
+            except JunoRuntimeError as e:
+                error(e.message, node)
+            if low <= result <= high:
+                return result
+            return wrap(result_type, result)
+
+        return integral_binary, NOT_CONSTANT
+
+    def compile_unary(self, node):
+        operand, constant = self.compile(node.operand)
+        if node.op == "!":
+            if self.optimize and constant is not NOT_CONSTANT:
+                return None, not constant
+            return (lambda frame: not operand(frame)), NOT_CONSTANT
+
+        error = self.error
+
+        result_type = node.wrap
+
+        def negate(value):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                error(f"Bad operand type for '-': {format_value(value)}", node)
+            if result_type is not None:
+                # Only the most negative value overflows
+                return wrap(result_type, -value)
+            return -value
+
+        if self.optimize and constant is not NOT_CONSTANT and is_number(constant):
+            return None, negate(constant)
+        return (lambda frame: negate(operand(frame))), NOT_CONSTANT
+
+    def compile_assign(self, node):
+        target = node.target
+        if isinstance(target, ast.Index):
+            return self.compile_element_assign(node)
+        value, _ = self.compile(node.value)
+        store = self.store
+        if node.op == "=":
+            def assign(frame):
+                result = value(frame)
+                store(target, result, frame)
+                return result
+            return assign, NOT_CONSTANT
+
+        op = node.op[:-1]
+        target_type = node.cast
+        lookup = self.lookup
+        error = self.error
+
+        def compound_assign(frame):
+            # The right-hand side runs before the target is read, as in Java
+            right_value = value(frame)
+            try:
+                result = binary_op(op, lookup(target, frame), right_value)
+                if target_type is not None:
+                    result = cast(target_type, result)
+            except JunoRuntimeError as e:
+                error(e.message, node)
+            store(target, result, frame)
+            return result
+
+        return compound_assign, NOT_CONSTANT
+
+    def compile_element_assign(self, node):
+        array, _ = self.compile(node.target.target)
+        index, _ = self.compile(node.target.index)
+        value, _ = self.compile(node.value)
+        error = self.error
+
+        if node.op == "=":
+            def assign_element(frame):
+                target = array(frame)
+                position = index(frame)
+                result = value(frame)
+                try:
+                    store_index(target, position, result)
+                except JunoRuntimeError as e:
+                    error(e.message, node)
+                return result
+            return assign_element, NOT_CONSTANT
+
+        op = node.op[:-1]
+        target_type = node.cast
+
+        def compound_assign_element(frame):
+            # The element is read before the right-hand side runs, as in Java
+            target = array(frame)
+            position = index(frame)
+            try:
+                current = load_index(target, position)
+            except JunoRuntimeError as e:
+                error(e.message, node)
+            right_value = value(frame)
+            try:
+                result = binary_op(op, current, right_value)
+                if target_type is not None:
+                    result = cast(target_type, result)
+                store_index(target, position, result)
+            except JunoRuntimeError as e:
+                error(e.message, node)
+            return result
+
+        return compound_assign_element, NOT_CONSTANT
+
+    def compile_incdec(self, node):
+        target = node.target
+        if isinstance(target, ast.Index):
+            return self.compile_element_incdec(node)
+        delta = 1 if node.op == "++" else -1
+        prefix = node.prefix
+        result_type = node.wrap
+        low, high = INTEGRAL_RANGES.get(result_type, UNBOUNDED)
+        lookup = self.lookup
+        store = self.store
+        error = self.error
+
+        def incdec(frame):
+            old = lookup(target, frame)
+            if not is_number(old):
+                error(f"Bad operand type for '{node.op}': {format_value(old)}", node)
+            new = old + delta
+            if not low <= new <= high:
+                new = wrap(result_type, new)
+            store(target, new, frame)
+            return new if prefix else old
+
+        return incdec, NOT_CONSTANT
+
+    def compile_element_incdec(self, node):
+        array, _ = self.compile(node.target.target)
+        index, _ = self.compile(node.target.index)
+        delta = 1 if node.op == "++" else -1
+        prefix = node.prefix
+        result_type = node.wrap
+        low, high = INTEGRAL_RANGES.get(result_type, UNBOUNDED)
+        error = self.error
+
+        def incdec_element(frame):
+            target = array(frame)
+            position = index(frame)
+            try:
+                old = load_index(target, position)
+                if not is_number(old):
+                    error(f"Bad operand type for '{node.op}': {format_value(old)}", node)
+                new = old + delta
+                if not low <= new <= high:
+                    new = wrap(result_type, new)
+                store_index(target, position, new)
+            except JunoRuntimeError as e:
+                error(e.message, node)
+            return new if prefix else old
+
+        return incdec_element, NOT_CONSTANT
+
+    def compile_conditional(self, node):
+        condition, constant = self.compile(node.condition)
+        then, then_constant = self.compile(node.then)
+        orelse, orelse_constant = self.compile(node.orelse)
+        if self.optimize and constant is not NOT_CONSTANT:
+            if constant:
+                return then, then_constant
+            return orelse, orelse_constant
+        return (lambda frame: then(frame) if condition(frame) else orelse(frame)), NOT_CONSTANT
+
+    def compile_cast(self, node):
+        operand, constant = self.compile(node.operand)
+        target = node.type
+        if self.optimize and constant is not NOT_CONSTANT and is_number(constant):
+            return None, cast(target, constant)
+        error = self.error
+
+        def convert(value):
+            try:
+                return cast(target, value)
+            except JunoRuntimeError as e:
+                error(e.message, node)
+
+        if target in ("double", "float"):
+            # The common case: an int widened for a double variable
+            def to_float(frame):
+                value = operand(frame)
+                return float(value) if type(value) is int else convert(value)
+            return to_float, NOT_CONSTANT
+        return (lambda frame: convert(operand(frame))), NOT_CONSTANT
+
+    def compile_concat(self, node):
+        parts = [self.compile(part) for part in node.parts]
+        if self.optimize and all(constant is not NOT_CONSTANT for _, constant in parts):
+            return None, "".join(format_value(constant) for _, constant in parts)
+        closures = [closure for closure, _ in parts]
+        return (lambda frame: "".join([format_value(part(frame)) for part in closures])), NOT_CONSTANT
+
+    def compile_index(self, node):
+        array, _ = self.compile(node.target)
+        index, _ = self.compile(node.index)
+        error = self.error
+
+        def load_element(frame):
+            target = array(frame)
+            position = index(frame)
+            # Checked inline for the common case of a valid index into an array
+            if type(position) is int and position >= 0 and type(target) in ARRAY_CLASSES:
+                try:
+                    return target[position]
+                except IndexError:
+                    pass
+            try:
+                return load_index(target, position)
+            except JunoRuntimeError as e:
+                error(e.message, node)
+
+        return load_element, NOT_CONSTANT
+
+    def compile_length(self, node):
+        array, _ = self.compile(node.target)
+        error = self.error
+
+        def length(frame):
+            try:
+                return array_length(array(frame))
+            except JunoRuntimeError as e:
+                error(e.message, node)
+
+        return length, NOT_CONSTANT
+
+    def compile_new_array(self, node):
+        length, _ = self.compile(node.length)
+        element_type = node.type
+        error = self.error
+
+        def create(frame):
+            try:
+                return new_array(element_type, length(frame))
+            except JunoRuntimeError as e:
+                error(e.message, node)
+
+        return create, NOT_CONSTANT
+
+    def compile_array_literal(self, node):
+        # Arrays are mutable, so even an all-constant literal builds a new array every time
+        elements = [self.compile(element)[0] for element in node.elements]
+        element_type = node.type
+        error = self.error
+
+        def create(frame):
+            try:
+                return make_array(element_type, [element(frame) for element in elements])
+            except JunoRuntimeError as e:
+                error(e.message, node)
+
+        return create, NOT_CONSTANT
+
+    def compile_call(self, node):
+        name = node.name
+        args = [self.compile(arg)[0] for arg in node.args]
+        error = self.error
+        exec_block = self.exec_block
+
+        # Inline cache: the method this call site resolved to, valid while
+        # the method table is at cached_version
+        cached_version = -1
+        method = body = unused_slots = None
+
+        def call(frame):
+            nonlocal cached_version, method, body, unused_slots
+            # Arguments are evaluated in the caller's frame and fill the parameter slots
+            local_vars = [arg(frame) for arg in args]
+            if cached_version != self.method_version:
+                method = self.methods.get(name)
+                if method is None:
+                    error(f"Undefined method '{name}'", node)
+                if len(args) != len(method.params):
+                    error(f"Method '{name}' expects {len(method.params)} argument(s) but got {len(args)}", node)
+                body = method.body
+                unused_slots = [None] * (method.frame_size - len(args))
+                cached_version = self.method_version
+
+            local_vars += unused_slots
+
+            if self.call_depth >= self.max_call_depth:
+                error(f"Stack overflow: more than {self.max_call_depth} nested calls", node)
+            callee = Frame(method, local_vars)
+            self.call_depth += 1
+            try:
+                exec_block(body, callee)
+            finally:
+                self.call_depth -= 1
+            return callee.return_value
+
+        return call, NOT_CONSTANT
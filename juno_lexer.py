@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Juno Lexer
+This module turns Juno source code into a stream of tokens.
+
+Source can be given as a string or as a text stream. A stream is read in
+chunks as tokens are requested, and only complete lines are scanned, so
+the lexer holds roughly one chunk (or one very long line or block comment)
+of text at a time however large the file is.
+"""
+
+import re
+
+from juno_errors import JunoSyntaxError
+
+# Token kinds
+INT = "INT"
+FLOAT = "FLOAT"
+STRING = "STRING"
+IDENT = "IDENT"
+KEYWORD = "KEYWORD"
+OP = "OP"
+EOF = "EOF"
+
+KEYWORDS = frozenset([
+    "if", "else", "for", "while", "do", "return", "break", "continue",
+    "true", "false", "null", "new", "class", "import", "package",
+    "public", "private", "protected", "static", "final", "void",
+])
+
+# Java-style escape sequences inside string and char literals
+ESCAPES = {
+    "n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f",
+    "0": "\0", "\\": "\\", "'": "'", '"': '"',
+}
+
+TOKEN_PATTERN = re.compile(r"""
+    (?P<SPACE>[ \t\r\f]+)
+  | (?P<NEWLINE>\n)
+  | (?P<LINE_COMMENT>//[^\n]*)
+  | (?P<BLOCK_COMMENT>/\*.*?\*/)
+  | (?P<OPEN_COMMENT>/\*)
+  | (?P<FLOAT>(?:\d+\.\d*|\.\d+)(?:[eE][+-]?\d+)?[fFdD]?|\d+(?:[eE][+-]?\d+[fFdD]?|[fFdD]))
+  | (?P<INT>\d+[lL]?)
+  | (?P<STRING>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')
+  | (?P<IDENT>[A-Za-z_$][A-Za-z0-9_$]*)
+  | (?P<OP>\+\+|--|&&|\|\||==|!=|<=|>=|\+=|-=|\*=|/=|%=|[-+*/%=<>!&|^~?:;,.(){}\[\]@])
+""", re.VERBOSE | re.DOTALL)
+
+ESCAPE_PATTERN = re.compile(r"\\(.)")
+
+# Characters read from a text stream at a time
+CHUNK_SIZE = 64 * 1024
+
+
+class Token:
+    """A single lexical token."""
+
+    __slots__ = ("kind", "value", "line", "column")
+
+    def __init__(self, kind, value, line, column):
+        self.kind = kind
+        self.value = value
+        self.line = line
+        self.column = column
+
+    def __repr__(self):
+        return f"Token({self.kind}, {self.value!r}, {self.line}:{self.column})"
+
+
+def _unescape(text):
+    """Replace Java-style escape sequences in a literal body."""
+    if "\\" not in text:
+        return text
+    return ESCAPE_PATTERN.sub(lambda m: ESCAPES.get(m.group(1), m.group(1)), text)
+
+
+class Lexer:
+    """
+    The Juno lexer.
+    This class scans Juno source code and produces tokens.
+    """
+
+    def __init__(self, source, filename="<input>"):
+        """
+        Initialize the lexer.
+
+        Args:
+            source (str or file): The Juno source code, or a text stream to
+                read it from
+            filename (str): The name of the file being scanned
+        """
+        self.source = source
+        self.filename = filename
+
+    def tokens(self):
+        """
+        Scan the source code.
+
+        Yields:
+            Token: The next token; the last token is always EOF
+        """
+        if isinstance(self.source, str):
+            source = self.source
+            read = None
+        else:
+            source = ""
+            read = self.source.read
+        match = TOKEN_PATTERN.match
+        pos = 0
+        line = 1
+        # `source` holds the text from absolute offset `base` on; line_start is absolute
+        base = 0
+        line_start = 0
+        # Tokens never span lines (block comments aside), so only text up
+        # to the last newline read so far is scanned
+        end = len(source)
+
+        while True:
+            if pos >= end:
+                if read is None:
+                    break
+                chunk = read(CHUNK_SIZE)
+                # Drop the text already scanned
+                base += pos
+                source = source[pos:] + chunk
+                pos = 0
+                if chunk:
+                    end = source.rfind("\n") + 1
+                else:
+                    read = None
+                    end = len(source)
+                continue
+
+            m = match(source, pos, end)
+            if m is None:
+                if source[pos] in "\"'":
+                    message = "Unterminated string literal"
+                else:
+                    message = f"Unexpected character {source[pos]!r}"
+                raise JunoSyntaxError(message, line, base + pos - line_start + 1, self.filename)
+
+            kind = m.lastgroup
+            text = m.group()
+            column = base + pos - line_start + 1
+            pos = m.end()
+
+            if kind == "SPACE" or kind == "LINE_COMMENT":
+                continue
+            if kind == "NEWLINE":
+                line += 1
+                line_start = base + pos
+                continue
+            if kind == "BLOCK_COMMENT":
+                newlines = text.count("\n")
+                if newlines:
+                    line += newlines
+                    line_start = base + m.start() + text.rfind("\n") + 1
+                continue
+            if kind == "OPEN_COMMENT":
+                # A block comment with no `*/` in the text read so far
+                if read is not None:
+                    # It may end beyond that text: read more and scan it again
+                    pos = end = m.start()
+                    continue
+                raise JunoSyntaxError("Unterminated block comment", line, column, self.filename,
+                                      incomplete=True)
+
+            if kind == IDENT:
+                if text in KEYWORDS:
+                    kind = KEYWORD
+                yield Token(kind, text, line, column)
+            elif kind == OP:
+                yield Token(OP, text, line, column)
+            elif kind == INT:
+                yield Token(INT, int(text.rstrip("lL")), line, column)
+            elif kind == FLOAT:
+                yield Token(FLOAT, float(text.rstrip("fFdD")), line, column)
+            else:
+                yield Token(STRING, _unescape(text[1:-1]), line, column)
+
+        yield Token(EOF, None, line, base + pos - line_start + 1)
+
+
+def tokenize(source, filename="<input>"):
+    """
+    Tokenize Juno source code.
+
+    Args:
+        source (str): The Juno source code
+        filename (str): The name of the file being scanned
+
+    Returns:
+        list: The tokens, ending with an EOF token
+    """
+    return list(Lexer(source, filename).tokens())
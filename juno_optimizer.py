@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Juno Optimizer
+AST passes run on a resolved program when optimizations are enabled.
+
+The passes run in order:
+- constant-folding: operators and conditionals whose operands are all
+  literals are replaced by their value
+- dead-branches: `if` statements with a constant condition are replaced by
+  the branch that runs, and loops whose condition is constantly false are
+  removed
+- string-concat: chains of `+` that build a String become a single Concat
+  node, which formats every part and joins them once
+- hoist-strings: the loop-invariant leading parts of a Concat inside a loop
+  are built once, before the loop, into a hidden local
+
+Every pass records in an OptimizationReport how often it fired and roughly
+how many instructions it saves.
+"""
+
+from juno_errors import JunoRuntimeError
+from juno_runtime import binary_op, cast, wrap
+from juno_executor import assigned_names, contains_call
+from juno_types import KNOWN_TYPES
+import juno_ast as ast
+
+# Prefix of the hidden locals created by the hoisting pass; `$` cannot start
+# a Juno identifier, so they never clash with program variables
+HOISTED_PREFIX = "$hoist"
+
+
+class OptimizationReport:
+    """Counts, per pass, how often it fired and the instructions it saves."""
+
+    def __init__(self):
+        self.passes = {}
+
+    def record(self, name, saved=0):
+        fired, total = self.passes.get(name, (0, 0))
+        self.passes[name] = (fired + 1, total + saved)
+
+    def add_pass(self, name):
+        self.passes.setdefault(name, (0, 0))
+
+    def format(self):
+        """Render the report as text, one line per pass."""
+        lines = ["Optimization report:"]
+        total = 0
+        for name, (fired, saved) in self.passes.items():
+            total += saved
+            lines.append(f"  {name:<18} fired {fired:>4} time(s), ~{saved} instruction(s) saved")
+        lines.append(f"  {'total':<18} ~{total} instruction(s) saved")
+        return "\n".join(lines)
+
+
+def count_nodes(node):
+    """Return the number of nodes in the tree under `node`, a rough instruction count."""
+    return sum(1 for _ in ast.walk(node))
+
+
+def rewrite_children(node, rewrite):
+    """Replace every child node of `node` with `rewrite(child)`."""
+    for name in node.fields:
+        value = getattr(node, name)
+        if isinstance(value, ast.Node):
+            setattr(node, name, rewrite(value))
+        elif isinstance(value, list):
+            value[:] = [rewrite(item) if isinstance(item, ast.Node) else item for item in value]
+
+
+class Pass:
+    """
+    Base class for optimization passes.
+    Subclasses implement `visit`, which returns the node to put in place of
+    the one given; `visit_children` rewrites a node's children first.
+    """
+
+    name = None
+
+    def __init__(self, report):
+        self.report = report
+
+    def run(self, program):
+        self.report.add_pass(self.name)
+        rewrite_children(program, self.visit)
+        return program
+
+    def visit(self, node):
+        self.visit_children(node)
+        return node
+
+    def visit_children(self, node):
+        rewrite_children(node, self.visit)
+
+
+class ConstantFolding(Pass):
+    """Evaluate operators and conditionals with literal operands at compile time."""
+
+    name = "constant-folding"
+
+    def visit(self, node):
+        self.visit_children(node)
+        folded = self.fold(node)
+        if folded is node:
+            return node
+        self.report.record(self.name, count_nodes(node) - count_nodes(folded))
+        return folded
+
+    def fold(self, node):
+        if isinstance(node, ast.BinaryOp) and isinstance(node.left, ast.Literal):
+            left = node.left.value
+            if node.op == "&&" or node.op == "||":
+                # The left side decides whether the right side ever runs
+                if bool(left) == (node.op == "||"):
+                    return ast.Literal(bool(left), line=node.line)
+                if isinstance(node.right, ast.Literal):
+                    return ast.Literal(bool(node.right.value), line=node.line)
+                return node
+            if isinstance(node.right, ast.Literal):
+                try:
+                    value = binary_op(node.op, left, node.right.value)
+                except JunoRuntimeError:
+                    # Leave the error to be raised if the expression actually runs
+                    return node
+                if node.wrap is not None:
+                    value = wrap(node.wrap, value)
+                return ast.Literal(value, line=node.line)
+        elif isinstance(node, ast.UnaryOp) and isinstance(node.operand, ast.Literal):
+            value = node.operand.value
+            if node.op == "!":
+                return ast.Literal(not value, line=node.line)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return ast.Literal(-value if node.wrap is None else wrap(node.wrap, -value), line=node.line)
+        elif isinstance(node, ast.Cast) and isinstance(node.operand, ast.Literal):
+            value = node.operand.value
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return ast.Literal(cast(node.type, value), line=node.line)
+        elif isinstance(node, ast.Conditional) and isinstance(node.condition, ast.Literal):
+            return node.then if node.condition.value else node.orelse
+        return node
+
+
+class DeadBranches(Pass):
+    """Drop branches and loops whose constant condition means they never run."""
+
+    name = "dead-branches"
+
+    def visit(self, node):
+        self.visit_children(node)
+        if isinstance(node, ast.If) and isinstance(node.condition, ast.Literal):
+            taken = node.then if node.condition.value else node.orelse
+            dropped = node.orelse if node.condition.value else node.then
+            self.report.record(self.name, 2 + (count_nodes(dropped) if dropped else 0))
+            # A Block keeps the branch's declarations scoped as they were
+            return taken if taken is not None else ast.Block([], line=node.line)
+        if (isinstance(node, (ast.While, ast.For)) and isinstance(node.condition, ast.Literal)
+                and not node.condition.value):
+            self.report.record(self.name, count_nodes(node))
+            kept = [node.init] if isinstance(node, ast.For) and node.init is not None else []
+            return ast.Block(kept, line=node.line)
+        return node
+
+
+def is_string_expression(node):
+    """Return True if `node` always evaluates to a String."""
+    if isinstance(node, ast.Literal):
+        return isinstance(node.value, str)
+    if isinstance(node, ast.Concat):
+        return True
+    return (isinstance(node, ast.BinaryOp) and node.op == "+"
+            and (is_string_expression(node.left) or is_string_expression(node.right)))
+
+
+class StringConcat(Pass):
+    """Turn `a + b + c` chains that build a String into one Concat node."""
+
+    name = "string-concat"
+
+    def visit(self, node):
+        if isinstance(node, ast.BinaryOp) and node.op == "+" and is_string_expression(node):
+            parts = self.flatten(node)
+            self.report.record(self.name, len(parts) - 1)
+            return ast.Concat(parts, line=node.line)
+        self.visit_children(node)
+        return node
+
+    def flatten(self, node):
+        """Return the parts of a String-building `+` chain, left to right."""
+        if isinstance(node, ast.BinaryOp) and node.op == "+" and is_string_expression(node):
+            # Once either side is a String, `+` formats and joins both sides
+            return self.flatten(node.left) + self.flatten(node.right)
+        return [self.visit(node)]
+
+
+class HoistStrings(Pass):
+    """
+    Build the loop-invariant leading parts of a Concat once, before the loop.
+
+    A leading part is invariant if it is a literal, or a String or
+    primitive variable that the loop never declares or assigns. Arrays
+    never count, since their elements can change. Globals only count when
+    the loop makes no calls (a method could assign them) and the loop is
+    not inside a method (the global's declaration might not have run yet).
+    """
+
+    name = "hoist-strings"
+
+    def __init__(self, report):
+        super().__init__(report)
+        self.hoisted = 0
+        # The Program or MethodDecl whose frame gets the hidden locals
+        self.frame_owner = None
+        self.in_method = False
+        # One entry per loop being visited: (variant names, globals allowed, hoisted declarations)
+        self.loops = []
+
+    def run(self, program):
+        self.frame_owner = program
+        return super().run(program)
+
+    def visit(self, node):
+        if isinstance(node, ast.MethodDecl):
+            outer = self.frame_owner, self.in_method
+            self.frame_owner, self.in_method = node, True
+            self.visit_children(node)
+            self.frame_owner, self.in_method = outer
+            return node
+        if isinstance(node, (ast.For, ast.ForEach, ast.While)):
+            return self.visit_loop(node)
+        self.visit_children(node)
+        if isinstance(node, ast.Concat) and self.loops:
+            return self.hoist(node)
+        return node
+
+    def visit_loop(self, node):
+        variant = assigned_names(node)
+        variant.update(child.name for child in ast.walk(node) if isinstance(child, ast.VarDecl))
+        allow_globals = not self.in_method and not contains_call(node)
+        self.loops.append((variant, allow_globals, []))
+        self.visit_children(node)
+        _, _, declarations = self.loops.pop()
+        if not declarations:
+            return node
+        return ast.Block(declarations + [node], line=node.line)
+
+    def is_invariant(self, part):
+        variant, allow_globals, _ = self.loops[-1]
+        if isinstance(part, ast.Literal):
+            return True
+        return (isinstance(part, ast.Name) and part.type in KNOWN_TYPES and part.name not in variant
+                and (allow_globals or not part.is_global))
+
+    def hoist(self, node):
+        count = 0
+        while count < len(node.parts) and self.is_invariant(node.parts[count]):
+            count += 1
+        if count < 2 and count < len(node.parts):
+            # A single leading part is no cheaper to load from a hidden local
+            return node
+
+        name = f"{HOISTED_PREFIX}{self.hoisted}"
+        self.hoisted += 1
+        # A fresh slot past every slot the resolver assigned in this frame
+        slot = self.frame_owner.frame_size
+        self.frame_owner.frame_size += 1
+        prefix = ast.Concat(node.parts[:count], line=node.line)
+        self.loops[-1][2].append(ast.VarDecl("String", name, prefix, False, slot, line=node.line))
+        self.report.record(self.name, count)
+
+        hidden = ast.Name(name, False, slot, "String", line=node.line)
+        if count == len(node.parts):
+            return hidden
+        return ast.Concat([hidden] + node.parts[count:], line=node.line)
+
+
+PASSES = [ConstantFolding, DeadBranches, StringConcat, HoistStrings]
+
+
+def optimize(program, report=None):
+    """
+    Run the optimization passes over a resolved program.
+
+    Args:
+        program (Program): The resolved program; it is rewritten in place
+        report (OptimizationReport): Receives what each pass did, or None
+
+    Returns:
+        Program: The optimized program
+    """
+    report = report or OptimizationReport()
+    for optimization_pass in PASSES:
+        program = optimization_pass(report).run(program)
+    return program
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Juno Output
+Buffered writing of program output for the Juno execution engines.
+
+Text written by a Juno program is collected in memory and handed to the
+underlying stream in large blocks, instead of being flushed after every
+println. When the stream is a terminal the buffer is also flushed at the
+end of every line, so interactive output still appears as it is printed.
+Buffered text is flushed when the interpreter exits, and the interpreter
+flushes it before reporting an error so the two stay in order.
+"""
+
+import sys
+import atexit
+
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+
+class Output:
+    """
+    A write buffer in front of a text stream.
+    With a buffer size of 0 every write is flushed immediately.
+    """
+
+    def __init__(self, stream=None, buffer_size=DEFAULT_BUFFER_SIZE, line_buffered=None):
+        """
+        Initialize the buffer.
+
+        Args:
+            stream: The text stream to write to; None means whatever
+                sys.stdout is when the buffer is flushed
+            buffer_size (int): Flush once this many characters are pending
+            line_buffered (bool): Flush at the end of every line; None
+                means only when the stream is a terminal
+        """
+        self.stream = stream
+        self.buffer_size = buffer_size
+        if line_buffered is None:
+            target = stream if stream is not None else sys.stdout
+            try:
+                line_buffered = target.isatty()
+            except (AttributeError, ValueError):
+                line_buffered = False
+        self.line_buffered = line_buffered
+        self.pending = []
+        self.size = 0
+
+    def write(self, text):
+        """Queue `text` for output, flushing if the buffer policy says so."""
+        self.pending.append(text)
+        self.size += len(text)
+        if self.size >= self.buffer_size or (self.line_buffered and "\n" in text):
+            self.flush()
+
+    def flush(self):
+        """Write all pending text to the stream and flush the stream."""
+        stream = self.stream if self.stream is not None else sys.stdout
+        if self.pending:
+            text = "".join(self.pending)
+            self.pending.clear()
+            self.size = 0
+            stream.write(text)
+        stream.flush()
+
+
+_stdout = None
+
+
+def stdout_output():
+    """
+    Return the shared Output for sys.stdout, creating it on first use.
+    It is flushed automatically when the interpreter exits.
+    """
+    global _stdout
+    if _stdout is None:
+        _stdout = Output()
+        atexit.register(_stdout.flush)
+    return _stdout
+
+
+def configure_stdout(buffer_size=DEFAULT_BUFFER_SIZE, line_buffered=None):
+    """
+    Set the buffering of the shared stdout Output.
+
+    Args:
+        buffer_size (int): Flush once this many characters are pending;
+            0 flushes every write
+        line_buffered (bool): Flush at the end of every line; None means
+            only when stdout is a terminal
+
+    Returns:
+        Output: The shared stdout Output
+    """
+    output = stdout_output()
+    output.flush()
+    output.buffer_size = buffer_size
+    if line_buffered is not None:
+        output.line_buffered = line_buffered
+    return output
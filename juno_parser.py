@@ -0,0 +1,722 @@
+#!/usr/bin/env python3
+"""
+Juno Parser
+A recursive-descent parser that turns Juno tokens into an AST.
+"""
+
+from juno_errors import JunoSyntaxError
+from juno_lexer import Lexer, INT, FLOAT, STRING, IDENT, KEYWORD, OP, EOF
+from juno_types import CAST_TYPES
+import juno_ast as ast
+
+MODIFIERS = frozenset(["public", "private", "protected", "static", "final"])
+ASSIGN_OPS = frozenset(["=", "+=", "-=", "*=", "/=", "%="])
+
+# Binary operator precedence, lowest first
+BINARY_PRECEDENCE = [
+    ("||",),
+    ("&&",),
+    ("==", "!="),
+    ("<", "<=", ">", ">="),
+    ("+", "-"),
+    ("*", "/", "%"),
+]
+
+BRACKET_PAIRS = {"{": "}", "(": ")", "[": "]"}
+CLOSING_BRACKETS = frozenset(BRACKET_PAIRS.values())
+
+
+# Consumed tokens are dropped from the parser's buffer once this many pile up
+TRIM_THRESHOLD = 4096
+
+
+class Parser:
+    """
+    The Juno parser.
+    This class consumes tokens from the lexer and builds a Program node.
+
+    Tokens are pulled from the lexer only as far ahead as the parser looks,
+    and consumed tokens are dropped, so a large source file is never held
+    as a list of tokens. Brackets are paired as tokens arrive. Errors are
+    reported in the order a full scan before parsing would find them: a
+    lexical error anywhere in the input comes first, then an unbalanced
+    bracket (reported at the bracket itself), then a syntax error.
+    """
+
+    def __init__(self, tokens, filename="<input>", recover=False):
+        """
+        Initialize the parser.
+
+        Args:
+            tokens (iterable): The tokens to parse, ending with an EOF
+                token; usually a Lexer's token generator
+            filename (str): The name of the file being parsed
+            recover (bool): Collect syntax errors in method bodies in
+                `errors` and carry on with the next declaration, instead of
+                stopping at the first one
+        """
+        self.source_tokens = iter(tokens)
+        self.filename = filename
+        # Buffered tokens from the current position on, and the bracket
+        # nesting depth before each of them
+        self.tokens = []
+        self.depths = []
+        self.pos = 0
+        self.open_brackets = []
+        self.exhausted = False
+        # A lexical or bracket error; these end parsing even when recovering
+        self.fatal = None
+        self.methods = {}
+        self.recover = recover
+        self.errors = []
+
+    # Token helpers
+
+    def pull(self):
+        """Take the next token from the lexer and buffer it, pairing brackets."""
+        try:
+            token = next(self.source_tokens)
+        except JunoSyntaxError as e:
+            self.fatal = e
+            raise
+        self.tokens.append(token)
+        self.depths.append(len(self.open_brackets))
+        if token.kind == OP:
+            value = token.value
+            if value in BRACKET_PAIRS:
+                self.open_brackets.append(token)
+            elif value in CLOSING_BRACKETS:
+                self.close_bracket(token)
+        elif token.kind == EOF:
+            self.exhausted = True
+            if self.open_brackets:
+                opening = self.open_brackets[-1]
+                self.fail(JunoSyntaxError(f"Missing '{BRACKET_PAIRS[opening.value]}' to close '{opening.value}'",
+                                          opening.line, opening.column, self.filename))
+
+    def close_bracket(self, token):
+        value = token.value
+        if not self.open_brackets:
+            self.fail(JunoSyntaxError(f"Unexpected '{value}'", token.line, token.column, self.filename))
+        opening = self.open_brackets[-1]
+        expected = BRACKET_PAIRS[opening.value]
+        if value != expected:
+            self.fail(JunoSyntaxError(
+                f"Expected '{expected}' to close '{opening.value}' from line {opening.line} but found '{value}'",
+                token.line, token.column, self.filename,
+            ))
+        self.open_brackets.pop()
+
+    def fail(self, error):
+        """Raise a bracket error, unless the rest of the input has a lexical error."""
+        self.fatal = error
+        try:
+            for _ in self.source_tokens:
+                pass
+        except JunoSyntaxError as e:
+            self.fatal = e
+        raise self.fatal
+
+    def scan_rest(self):
+        """
+        Pull the rest of the input (without buffering it), so a lexical or
+        bracket error after a syntax error is reported in its place.
+        """
+        while not self.exhausted:
+            self.pull()
+            self.tokens.clear()
+            self.depths.clear()
+
+    def peek(self, offset=0):
+        """Return the token `offset` positions ahead without consuming it."""
+        try:
+            return self.tokens[self.pos + offset]
+        except IndexError:
+            return self.read_ahead(self.pos + offset)
+
+    def read_ahead(self, index):
+        """Pull tokens until the buffer holds `index`; past EOF, return EOF."""
+        tokens = self.tokens
+        while index >= len(tokens):
+            if self.exhausted:
+                return tokens[-1]
+            self.pull()
+        return tokens[index]
+
+    def advance(self):
+        """Consume and return the current token."""
+        token = self.peek()
+        if token.kind != EOF:
+            self.pos += 1
+            if self.pos >= TRIM_THRESHOLD:
+                del self.tokens[:self.pos], self.depths[:self.pos]
+                self.pos = 0
+        return token
+
+    def check(self, value, offset=0):
+        """Return True if the token at `offset` is the operator or keyword `value`."""
+        token = self.peek(offset)
+        return token.value == value and token.kind in (OP, KEYWORD)
+
+    def accept(self, value):
+        """Consume the current token if it is `value`; return whether it was."""
+        if self.check(value):
+            self.advance()
+            return True
+        return False
+
+    def expect(self, value):
+        """Consume the current token, which must be `value`."""
+        if not self.check(value):
+            self.error(f"Expected '{value}' but found {self.describe(self.peek())}")
+        return self.advance()
+
+    def expect_ident(self, what="identifier"):
+        """Consume an identifier token and return its name."""
+        token = self.peek()
+        if token.kind != IDENT:
+            self.error(f"Expected {what} but found {self.describe(token)}")
+        self.advance()
+        return token.value
+
+    def describe(self, token):
+        """Describe a token for error messages."""
+        if token.kind == EOF:
+            return "end of file"
+        if token.kind == STRING:
+            return "string literal"
+        return f"'{token.value}'"
+
+    def error(self, message, token=None):
+        """Raise a syntax error at `token` (default: the current token)."""
+        token = token or self.peek()
+        raise JunoSyntaxError(message, token.line, token.column, self.filename)
+
+    # Program structure
+
+    def parse_program(self):
+        """
+        Parse a complete source file.
+
+        Returns:
+            Program: The root node of the AST
+        """
+        body = []
+        try:
+            while self.peek().kind != EOF:
+                statement = self.parse_top_level()
+                if statement is not None:
+                    body.append(statement)
+        except JunoSyntaxError as e:
+            if e is not self.fatal:
+                self.scan_rest()
+            raise
+        return ast.Program(body, self.methods, line=1)
+
+    def parse_top_level(self):
+        """Parse a top-level statement, import, class or method declaration."""
+        token = self.peek()
+
+        if self.check("import") or self.check("package"):
+            self.advance()
+            name = self.parse_dotted_name()
+            self.accept_star()
+            self.expect(";")
+            if token.value == "package":
+                return None
+            return ast.ImportDecl(name, line=token.line)
+
+        return self.parse_member(allow_statements=True)
+
+    def accept_star(self):
+        """Accept a trailing `.*` on an import."""
+        if self.check(".") and self.check("*", 1):
+            self.advance()
+            self.advance()
+
+    def parse_member(self, allow_statements):
+        """
+        Parse a class or method declaration, a field, or (at top level) a statement.
+
+        Args:
+            allow_statements (bool): Whether plain statements are allowed here
+        """
+        token = self.peek()
+        modifiers = []
+        while self.peek().kind == KEYWORD and self.peek().value in MODIFIERS:
+            modifiers.append(self.advance().value)
+
+        if self.check("class"):
+            return self.parse_class(token)
+
+        if modifiers or self.is_declaration_start():
+            return_type = self.parse_type()
+            name_token = self.peek()
+            name = self.expect_ident("a name")
+            if self.check("("):
+                return self.parse_method(name, return_type, modifiers, name_token)
+            if return_type == "void":
+                self.error("Variables cannot have type 'void'", name_token)
+            declaration = self.parse_var_rest(return_type, name, name_token)
+            self.expect(";")
+            return declaration
+
+        if not allow_statements:
+            self.error(f"Expected a field or method declaration but found {self.describe(token)}")
+        return self.parse_statement()
+
+    def parse_class(self, token):
+        """Parse `class Name { members }`."""
+        self.expect("class")
+        name = self.expect_ident("a class name")
+        self.expect("{")
+        members = []
+        while not self.check("}"):
+            if self.peek().kind == EOF:
+                self.error(f"Missing '}}' to close class '{name}'", token)
+            if self.accept(";"):
+                continue
+            member = self.parse_member(allow_statements=False)
+            if member is not None:
+                members.append(member)
+        self.expect("}")
+        return ast.ClassDecl(name, members, line=token.line)
+
+    def parse_method(self, name, return_type, modifiers, token):
+        """Parse the parameter list and body of a method declaration."""
+        self.expect("(")
+        params = []
+        if not self.check(")"):
+            while True:
+                param_type = self.parse_type()
+                param_name = self.expect_ident("a parameter name")
+                params.append((param_type, param_name))
+                if not self.accept(","):
+                    break
+        self.expect(")")
+        recoverable = self.recover and self.check("{")
+        body_depth = self.depths[self.pos] if recoverable else None
+        try:
+            body = self.parse_block()
+        except JunoSyntaxError as e:
+            if not recoverable or e is self.fatal:
+                raise
+            # Skip straight past the body's closing brace and keep going
+            self.errors.append(e)
+            self.skip_block(body_depth)
+            return None
+
+        if name in self.methods:
+            self.error(f"Method '{name}' is already defined", token)
+        method = ast.MethodDecl(name, params, return_type, body, modifiers, line=token.line)
+        self.methods[name] = method
+        return method
+
+    def skip_block(self, depth):
+        """Consume tokens up to and including the `}` that ends a block opened at `depth`."""
+        while self.peek().kind != EOF:
+            closing = self.depths[self.pos] == depth + 1 and self.check("}")
+            self.advance()
+            if closing:
+                return
+
+    def is_declaration_start(self):
+        """Return True if the upcoming tokens look like `Type name`."""
+        token = self.peek()
+        if token.kind != IDENT and not self.check("void"):
+            return False
+        offset = 1
+        while self.check("[", offset) and self.check("]", offset + 1):
+            offset += 2
+        return self.peek(offset).kind == IDENT
+
+    def parse_type(self):
+        """Parse a type name such as `int`, `String` or `int[]`."""
+        if self.check("void"):
+            self.advance()
+            return "void"
+        type_name = self.expect_ident("a type")
+        while self.check("[") and self.check("]", 1):
+            self.advance()
+            self.advance()
+            type_name += "[]"
+        return type_name
+
+    def parse_dotted_name(self):
+        """Parse `a.b.c` and return it as a string."""
+        parts = [self.expect_ident()]
+        while self.check(".") and self.peek(1).kind == IDENT:
+            self.advance()
+            parts.append(self.advance().value)
+        return ".".join(parts)
+
+    # Statements
+
+    def parse_block(self):
+        """Parse `{ statements }`."""
+        token = self.expect("{")
+        statements = []
+        while not self.check("}"):
+            if self.peek().kind == EOF:
+                self.error("Missing '}' to close block", token)
+            statement = self.parse_statement()
+            if statement is not None:
+                statements.append(statement)
+        self.expect("}")
+        return ast.Block(statements, line=token.line)
+
+    def parse_statement(self):
+        """Parse a single statement; returns None for an empty statement."""
+        token = self.peek()
+
+        if token.kind == OP:
+            if token.value == "{":
+                return self.parse_block()
+            if token.value == ";":
+                self.advance()
+                return None
+        elif token.kind == KEYWORD:
+            keyword = token.value
+            if keyword == "if":
+                return self.parse_if()
+            if keyword == "for":
+                return self.parse_for()
+            if keyword == "while":
+                self.advance()
+                condition = self.parse_expression()
+                return ast.While(condition, self.parse_body(), line=token.line)
+            if keyword == "break" or keyword == "continue":
+                self.advance()
+                self.expect(";")
+                node_class = ast.Break if keyword == "break" else ast.Continue
+                return node_class(line=token.line)
+            if keyword == "return":
+                self.advance()
+                value = None if self.check(";") else self.parse_expression()
+                self.expect(";")
+                return ast.Return(value, line=token.line)
+            if keyword in MODIFIERS or keyword in ("class", "void"):
+                self.error("Declarations are only allowed at the top level or inside a class")
+        elif token.kind == IDENT:
+            if self.is_print_call():
+                return self.parse_print()
+            if self.is_declaration_start():
+                var_type = self.parse_type()
+                name_token = self.peek()
+                name = self.expect_ident("a variable name")
+                if self.check("("):
+                    self.error("Methods can only be declared at the top level or inside a class", name_token)
+                declaration = self.parse_var_rest(var_type, name, name_token)
+                self.expect(";")
+                return declaration
+
+        expr = self.parse_expression()
+        self.expect(";")
+        return ast.ExprStmt(expr, line=token.line)
+
+    def parse_var_rest(self, var_type, name, token):
+        """Parse the optional initializer of a variable declaration."""
+        value = None
+        if self.accept("="):
+            if self.check("{"):
+                value = self.parse_array_initializer(var_type)
+            else:
+                value = self.parse_expression()
+        return ast.VarDecl(var_type, name, value, line=token.line)
+
+    def parse_array_initializer(self, array_type):
+        """Parse `{a, b, c}` as the value of an `array_type` array."""
+        token = self.expect("{")
+        if not array_type.endswith("[]"):
+            self.error(f"Array initializer used for a variable of type '{array_type}'", token)
+        element_type = array_type[:-2]
+        elements = []
+        while not self.check("}"):
+            if self.check("{"):
+                elements.append(self.parse_array_initializer(element_type))
+            else:
+                elements.append(self.parse_expression())
+            if not self.accept(","):
+                break
+        self.expect("}")
+        return ast.ArrayLiteral(element_type, elements, line=token.line)
+
+    def is_print_call(self):
+        """Return True if the upcoming tokens are `System.out.println(` or `System.out.print(`."""
+        return (self.peek().value == "System" and self.check(".", 1)
+                and self.peek(2).value == "out" and self.check(".", 3)
+                and self.peek(4).value in ("println", "print") and self.check("(", 5))
+
+    def parse_print(self):
+        """Parse `System.out.println(expr);`."""
+        token = self.peek()
+        for _ in range(4):
+            self.advance()
+        newline = self.advance().value == "println"
+        self.expect("(")
+        value = None if self.check(")") else self.parse_expression()
+        self.expect(")")
+        self.expect(";")
+        return ast.Print(value, newline, line=token.line)
+
+    def parse_if(self):
+        """Parse `if (condition) statement [else statement]`."""
+        token = self.expect("if")
+        condition = self.parse_expression()
+        then = self.parse_body()
+        orelse = None
+        if self.accept("else"):
+            orelse = self.parse_body()
+        return ast.If(condition, then, orelse, line=token.line)
+
+    def parse_for(self):
+        """Parse `for (init; condition; update) statement` or `for (Type name : array) statement`."""
+        token = self.expect("for")
+        self.expect("(")
+
+        init = None
+        if not self.check(";"):
+            if self.is_declaration_start():
+                var_type = self.parse_type()
+                name_token = self.peek()
+                name = self.expect_ident("a variable name")
+                if self.accept(":"):
+                    var = ast.VarDecl(var_type, name, line=name_token.line)
+                    iterable = self.parse_expression()
+                    self.expect(")")
+                    return ast.ForEach(var, iterable, self.parse_body(), line=token.line)
+                init = self.parse_var_rest(var_type, name, name_token)
+            else:
+                init = ast.ExprStmt(self.parse_expression(), line=token.line)
+        self.expect(";")
+
+        condition = None if self.check(";") else self.parse_expression()
+        self.expect(";")
+
+        update = None if self.check(")") else self.parse_expression()
+        self.expect(")")
+
+        body = self.parse_body()
+        return ast.For(init, condition, update, body, line=token.line)
+
+    def parse_body(self):
+        """Parse the body of a control-flow statement as a Block."""
+        token = self.peek()
+        statement = self.parse_statement()
+        if isinstance(statement, ast.Block):
+            return statement
+        statements = [] if statement is None else [statement]
+        return ast.Block(statements, line=token.line)
+
+    # Expressions
+
+    def parse_expression(self):
+        """Parse an expression, including assignments."""
+        return self.parse_assignment()
+
+    def parse_assignment(self):
+        """Parse `target = value` and compound assignments (right associative)."""
+        target = self.parse_conditional()
+        token = self.peek()
+        if token.kind == OP and token.value in ASSIGN_OPS:
+            if not isinstance(target, (ast.Name, ast.Index)):
+                self.error("Invalid assignment target", token)
+            self.advance()
+            value = self.parse_assignment()
+            return ast.Assign(target, token.value, value, line=token.line)
+        return target
+
+    def parse_conditional(self):
+        """Parse `condition ? then : orelse`."""
+        condition = self.parse_binary(0)
+        if self.check("?"):
+            token = self.advance()
+            then = self.parse_expression()
+            self.expect(":")
+            orelse = self.parse_conditional()
+            return ast.Conditional(condition, then, orelse, line=token.line)
+        return condition
+
+    def parse_binary(self, level):
+        """Parse a left-associative binary expression at precedence `level`."""
+        if level == len(BINARY_PRECEDENCE):
+            return self.parse_unary()
+        operators = BINARY_PRECEDENCE[level]
+        left = self.parse_binary(level + 1)
+        while self.peek().kind == OP and self.peek().value in operators:
+            token = self.advance()
+            right = self.parse_binary(level + 1)
+            left = ast.BinaryOp(token.value, left, right, line=token.line)
+        return left
+
+    def parse_unary(self):
+        """Parse prefix operators and casts."""
+        token = self.peek()
+        if self.is_cast():
+            self.advance()
+            cast_type = self.advance().value
+            self.advance()
+            return ast.Cast(cast_type, self.parse_unary(), line=token.line)
+        if token.kind == OP:
+            if token.value == "-" and self.peek(1).kind == INT:
+                # A negative literal, so -2147483648 is an int, as in Java
+                self.advance()
+                return ast.Literal(-self.advance().value, line=token.line)
+            if token.value in ("!", "-", "+"):
+                self.advance()
+                operand = self.parse_unary()
+                if token.value == "+":
+                    return operand
+                return ast.UnaryOp(token.value, operand, line=token.line)
+            if token.value in ("++", "--"):
+                self.advance()
+                target = self.parse_unary()
+                if not isinstance(target, (ast.Name, ast.Index)):
+                    self.error(f"Invalid operand for '{token.value}'", token)
+                return ast.IncDec(target, token.value, True, line=token.line)
+        return self.parse_postfix()
+
+    def is_cast(self):
+        """Return True if the upcoming tokens are a cast like `(int)`."""
+        return (self.check("(") and self.peek(1).kind == IDENT
+                and self.peek(1).value in CAST_TYPES and self.check(")", 2))
+
+    def parse_postfix(self):
+        """Parse indexing, `.length` and postfix `++` and `--`."""
+        expr = self.parse_primary()
+        while True:
+            token = self.peek()
+            if self.accept("["):
+                index = self.parse_expression()
+                self.expect("]")
+                expr = ast.Index(expr, index, line=token.line)
+            elif self.accept("."):
+                member = self.expect_ident("a member name")
+                if member != "length":
+                    self.error(f"Unsupported member access '.{member}'", token)
+                expr = ast.Length(expr, line=token.line)
+            else:
+                break
+        while self.peek().kind == OP and self.peek().value in ("++", "--"):
+            token = self.advance()
+            if not isinstance(expr, (ast.Name, ast.Index)):
+                self.error(f"Invalid operand for '{token.value}'", token)
+            expr = ast.IncDec(expr, token.value, False, line=token.line)
+        return expr
+
+    def parse_primary(self):
+        """Parse literals, names, calls and parenthesized expressions."""
+        token = self.peek()
+        kind = token.kind
+
+        if kind == INT or kind == FLOAT or kind == STRING:
+            self.advance()
+            return ast.Literal(token.value, line=token.line)
+
+        if kind == KEYWORD:
+            if token.value in ("true", "false"):
+                self.advance()
+                return ast.Literal(token.value == "true", line=token.line)
+            if token.value == "null":
+                self.advance()
+                return ast.Literal(None, line=token.line)
+            if token.value == "new":
+                return self.parse_new()
+
+        if kind == IDENT:
+            if self.is_qualified_call():
+                name = self.parse_dotted_name()
+                return ast.Call(name, self.parse_arguments(), line=token.line)
+            self.advance()
+            return ast.Name(token.value, line=token.line)
+
+        if self.accept("("):
+            expr = self.parse_expression()
+            self.expect(")")
+            return expr
+
+        self.error(f"Unexpected {self.describe(token)}")
+
+    def is_qualified_call(self):
+        """Return True if the upcoming tokens are a call such as `f(` or `Math.max(`."""
+        offset = 1
+        while self.check(".", offset) and self.peek(offset + 1).kind == IDENT:
+            offset += 2
+        return self.check("(", offset)
+
+    def parse_new(self):
+        """Parse `new type[length]` or `new type[] {a, b, c}`."""
+        token = self.expect("new")
+        element_type = self.expect_ident("a type")
+        if not self.check("["):
+            self.error(f"Cannot create objects of type '{element_type}'; only arrays are supported", token)
+        if self.check("]", 1):
+            array_type = element_type
+            while self.check("[") and self.check("]", 1):
+                self.advance()
+                self.advance()
+                array_type += "[]"
+            if not self.check("{"):
+                self.error("Expected an array size or initializer")
+            return self.parse_array_initializer(array_type)
+        self.expect("[")
+        length = self.parse_expression()
+        self.expect("]")
+        # `new int[n][]` makes n null int[] elements
+        while self.check("[") and self.check("]", 1):
+            self.advance()
+            self.advance()
+            element_type += "[]"
+        if self.check("["):
+            self.error("Only the first dimension of a new array can be given a size")
+        return ast.NewArray(element_type, length, line=token.line)
+
+    def parse_arguments(self):
+        """Parse a parenthesized, comma-separated argument list."""
+        self.expect("(")
+        args = []
+        if not self.check(")"):
+            while True:
+                args.append(self.parse_expression())
+                if not self.accept(","):
+                    break
+        self.expect(")")
+        return args
+
+
+def parse(source, filename="<input>"):
+    """
+    Parse Juno source code.
+
+    Args:
+        source (str or file): The Juno source code, or a text stream to read it from
+        filename (str): The name of the file being parsed
+
+    Returns:
+        Program: The root node of the AST
+    """
+    return Parser(Lexer(source, filename).tokens(), filename).parse_program()
+
+
+def check(source, filename="<input>"):
+    """
+    Parse Juno source code, collecting every syntax error that can be
+    reported rather than stopping at the first one.
+
+    Args:
+        source (str or file): The Juno source code, or a text stream to read it from
+        filename (str): The name of the file being parsed
+
+    Returns:
+        tuple: (Program, list of JunoSyntaxError); the program is None if
+            parsing could not continue
+    """
+    parser = Parser(Lexer(source, filename).tokens(), filename, recover=True)
+    try:
+        program = parser.parse_program()
+    except JunoSyntaxError as e:
+        if e is parser.fatal:
+            # Lexical and bracket errors are reported on their own
+            return None, [e]
+        return None, parser.errors + [e]
+    return program, parser.errors
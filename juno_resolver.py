@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+Juno Resolver
+Checks variable scoping in a parsed program and records, on every Name
+and VarDecl node, whether it refers to a global or a local variable and
+the numbered slot that variable is stored in.
+
+Scoping follows Java:
+- Declarations at the outermost top level and class fields are globals,
+  visible to all methods and to top-level code that follows them.
+- Every block (including a for loop header) opens a new local scope that
+  ends with the block.
+- A local may not redeclare a variable that is still in scope in the same
+  method, but method locals and parameters may shadow globals.
+
+Globals are numbered in declaration order. Locals are numbered per frame
+(top-level code, or one method call), parameters first; a slot is reused
+once the block that declared its variable has ended.
+
+The resolver also applies the static type rules in juno_types: values
+stored into a declared variable, passed as an argument or returned from a
+method are checked against the declared type, and widened with a Cast node
+where needed (so a `double` never holds an int).
+"""
+
+from juno_errors import JunoSyntaxError
+from juno_types import (literal_type, binary_type, conversion, is_numeric, promote,
+                        is_array, array_of, element_type, DEFAULT_VALUES, NULL_TYPE,
+                        INTEGRAL_TYPES, binary_operand_error, unary_operand_error)
+import juno_ast as ast
+
+
+class Resolver:
+    """
+    The Juno resolver.
+    This class walks a Program once, before it runs, so the engines never
+    need to search scopes at runtime.
+    """
+
+    def __init__(self, program, filename="<input>", known_globals=None, known_methods=None,
+                 unset_globals=()):
+        """
+        Initialize the resolver.
+
+        Args:
+            program (Program): The parsed program
+            filename (str): The name of the file being resolved
+            known_globals (dict): Globals declared before this program
+                runs, such as by earlier inputs in a REPL session; new
+                globals are added to it, numbered after the existing ones
+            known_methods (dict): Methods defined before this program
+                runs, which its calls may refer to; the program's own
+                methods replace them
+            unset_globals (iterable): Names in known_globals whose
+                declaration never ran, such as one whose initializer
+                failed; the program may declare them again, in their
+                existing slots
+        """
+        self.program = program
+        self.filename = filename
+        # Global name -> (slot, declared type)
+        self.globals = {} if known_globals is None else known_globals
+        # Method name -> MethodDecl, for checking calls
+        self.methods = dict(known_methods or {})
+        self.methods.update(program.methods)
+        self.unset_globals = set(unset_globals)
+        # One dict of local name -> (slot, declared type) per open block
+        self.scopes = []
+        self.next_slot = 0
+        self.frame_size = 0
+        self.loop_depth = 0
+        self.in_method = False
+        self.method = None
+
+        self.statement_handlers = {
+            ast.VarDecl: self.resolve_var_decl,
+            ast.ExprStmt: self.resolve_expr_stmt,
+            ast.Print: self.resolve_print,
+            ast.If: self.resolve_if,
+            ast.For: self.resolve_for,
+            ast.ForEach: self.resolve_for_each,
+            ast.While: self.resolve_while,
+            ast.Block: self.resolve_block,
+            ast.Return: self.resolve_return,
+            ast.Break: self.resolve_jump,
+            ast.Continue: self.resolve_jump,
+            ast.MethodDecl: self.resolve_nothing,
+            ast.ImportDecl: self.resolve_nothing,
+            ast.ClassDecl: self.resolve_class,
+        }
+        self.expression_handlers = {
+            ast.Literal: self.type_literal,
+            ast.Name: self.type_name,
+            ast.BinaryOp: self.type_binary,
+            ast.UnaryOp: self.type_unary,
+            ast.Assign: self.type_assign,
+            ast.IncDec: self.type_incdec,
+            ast.Conditional: self.type_conditional,
+            ast.Cast: self.type_cast,
+            ast.Index: self.type_index,
+            ast.Length: self.type_length,
+            ast.NewArray: self.type_new_array,
+            ast.ArrayLiteral: self.type_array_literal,
+            ast.Call: self.type_call,
+        }
+
+    def error(self, message, node):
+        raise JunoSyntaxError(message, node.line, None, self.filename)
+
+    def resolve(self):
+        """
+        Resolve the whole program.
+
+        Returns:
+            Program: The same program, annotated in place
+        """
+        # Top-level code runs in a main frame whose outermost scope holds globals
+        self.scopes = [{}]
+        self.next_slot = self.frame_size = 0
+        for statement in self.program.body:
+            self.resolve_statement(statement)
+        self.program.global_names = list(self.globals)
+        self.program.frame_size = self.frame_size
+
+        # Methods can see every global, wherever it is declared
+        self.in_method = True
+        for method in self.program.methods.values():
+            self.resolve_method(method)
+        return self.program
+
+    def resolve_method(self, method):
+        params = {}
+        for param_type, name in method.params:
+            if name in params:
+                self.error(f"Duplicate parameter '{name}' in method '{method.name}'", method)
+            params[name] = (len(params), param_type)
+        self.scopes = [params]
+        self.next_slot = self.frame_size = len(params)
+        self.method = method
+        self.resolve_block(method.body)
+        self.method = None
+        method.frame_size = self.frame_size
+
+    # Scopes
+
+    def at_global_level(self):
+        return not self.in_method and len(self.scopes) == 1
+
+    def declare_global(self, node):
+        name = node.name
+        if name in self.unset_globals:
+            self.unset_globals.discard(name)
+            node.slot = self.globals[name][0]
+        elif name in self.globals:
+            self.error(f"Variable '{name}' is already defined", node)
+        else:
+            node.slot = len(self.globals)
+        node.is_global = True
+        self.globals[name] = (node.slot, node.type)
+
+    def declare(self, node):
+        name = node.name
+        if self.at_global_level():
+            self.declare_global(node)
+            return
+
+        defined = any(name in scope for scope in self.scopes)
+        if not self.in_method:
+            defined = defined or name in self.globals
+        if defined:
+            self.error(f"Variable '{name}' is already defined", node)
+        node.is_global = False
+        node.slot = self.next_slot
+        self.scopes[-1][name] = (node.slot, node.type)
+        self.next_slot += 1
+        self.frame_size = max(self.frame_size, self.next_slot)
+
+    def open_scope(self):
+        self.scopes.append({})
+        return self.next_slot
+
+    def close_scope(self, first_slot):
+        # The block's variables are gone, so their slots can be reused
+        self.scopes.pop()
+        self.next_slot = first_slot
+
+    def resolve_name(self, node):
+        """Resolve a Name and return the declared type of its variable."""
+        name = node.name
+        if not self.at_global_level():
+            for scope in reversed(self.scopes):
+                if name in scope:
+                    node.is_global = False
+                    node.slot, node.type = scope[name]
+                    return node.type
+        if name not in self.globals:
+            self.error(f"Undefined variable '{name}'", node)
+        node.is_global = True
+        node.slot, node.type = self.globals[name]
+        return node.type
+
+    # Statements
+
+    def resolve_statement(self, node):
+        self.statement_handlers[type(node)](node)
+
+    def resolve_nothing(self, node):
+        pass
+
+    def resolve_block(self, node):
+        first_slot = self.open_scope()
+        for statement in node.statements:
+            self.resolve_statement(statement)
+        self.close_scope(first_slot)
+
+    def resolve_class(self, node):
+        for member in node.members:
+            if isinstance(member, ast.VarDecl):
+                self.resolve_initializer(member)
+                self.declare_global(member)
+
+    def resolve_var_decl(self, node):
+        # The initializer is resolved first: `int x = x;` does not see the new x
+        self.resolve_initializer(node)
+        self.declare(node)
+
+    def resolve_initializer(self, node):
+        if node.value is None:
+            if node.type in DEFAULT_VALUES:
+                node.value = ast.Literal(DEFAULT_VALUES[node.type], line=node.line)
+            return
+        node.value = self.coerce(node.value, self.resolve_expression(node.value), node.type, node)
+
+    def resolve_expr_stmt(self, node):
+        self.resolve_expression(node.expr)
+
+    def resolve_print(self, node):
+        if node.value is not None:
+            self.resolve_expression(node.value)
+
+    def resolve_return(self, node):
+        if node.value is not None:
+            value_type = self.resolve_expression(node.value)
+            if self.method is not None:
+                node.value = self.coerce(node.value, value_type, self.method.return_type, node)
+
+    def resolve_if(self, node):
+        self.resolve_expression(node.condition)
+        self.resolve_block(node.then)
+        if node.orelse is not None:
+            self.resolve_block(node.orelse)
+
+    def resolve_for(self, node):
+        # Variables declared in the loop header are scoped to the loop
+        first_slot = self.open_scope()
+        if node.init is not None:
+            self.resolve_statement(node.init)
+        if node.condition is not None:
+            self.resolve_expression(node.condition)
+        if node.update is not None:
+            self.resolve_expression(node.update)
+        self.resolve_loop_body(node.body)
+        self.close_scope(first_slot)
+
+    def resolve_for_each(self, node):
+        # The array is evaluated before the loop variable comes into scope
+        iterable = self.resolve_expression(node.iterable)
+        if iterable is not None and not is_array(iterable):
+            self.error(f"for-each not applicable to expression type {iterable}", node)
+        first_slot = self.open_scope()
+        node.cast, message = conversion(element_type(iterable), node.var.type)
+        if message is not None:
+            self.error(message, node)
+        self.declare(node.var)
+        self.resolve_loop_body(node.body)
+        self.close_scope(first_slot)
+
+    def resolve_while(self, node):
+        self.resolve_expression(node.condition)
+        self.resolve_loop_body(node.body)
+
+    def resolve_loop_body(self, body):
+        self.loop_depth += 1
+        self.resolve_block(body)
+        self.loop_depth -= 1
+
+    def resolve_jump(self, node):
+        if not self.loop_depth:
+            keyword = "break" if isinstance(node, ast.Break) else "continue"
+            self.error(f"'{keyword}' outside of a loop", node)
+
+    # Expressions
+    #
+    # Each handler resolves the names in an expression and returns its
+    # static type, or None when the type is not known.
+
+    def resolve_expression(self, node):
+        return self.expression_handlers[type(node)](node)
+
+    def coerce(self, node, value_type, target_type, context):
+        """Return `node` converted for storing in a `target_type` variable."""
+        cast, message = conversion(value_type, target_type)
+        if message is not None:
+            self.error(message, context)
+        if cast is None:
+            return node
+        if isinstance(node, ast.Literal):
+            return ast.Literal(float(node.value), line=node.line)
+        return ast.Cast(cast, node, line=node.line)
+
+    def type_literal(self, node):
+        return literal_type(node.value)
+
+    def type_name(self, node):
+        return self.resolve_name(node)
+
+    def type_binary(self, node):
+        left = self.resolve_expression(node.left)
+        right = self.resolve_expression(node.right)
+        message = binary_operand_error(node.op, left, right)
+        if message is not None:
+            self.error(message, node)
+        result = binary_type(node.op, left, right)
+        if result in INTEGRAL_TYPES:
+            node.wrap = result
+        return result
+
+    def type_unary(self, node):
+        operand = self.resolve_expression(node.operand)
+        message = unary_operand_error(node.op, operand)
+        if message is not None:
+            self.error(message, node)
+        if node.op == "!":
+            return "boolean"
+        if operand in INTEGRAL_TYPES:
+            node.wrap = operand
+        return operand if is_numeric(operand) else None
+
+    def type_assign(self, node):
+        target_type = self.resolve_expression(node.target)
+        value_type = self.resolve_expression(node.value)
+        if node.op == "=":
+            node.value = self.coerce(node.value, value_type, target_type, node)
+            return target_type
+
+        message = binary_operand_error(node.op[:-1], target_type, value_type)
+        if message is not None:
+            self.error(message, node)
+        result_type = binary_type(node.op[:-1], target_type, value_type)
+        cast, message = conversion(result_type, target_type)
+        if is_numeric(result_type) and target_type in INTEGRAL_TYPES:
+            # `x op= v` is `x = (type) (x op v)`: the result may narrow, and
+            # integer results wrap around on overflow
+            node.cast = target_type
+        elif message is not None and is_numeric(result_type) and is_numeric(target_type):
+            node.cast = target_type
+        elif message is not None:
+            self.error(message, node)
+        return target_type
+
+    def type_incdec(self, node):
+        target_type = self.resolve_expression(node.target)
+        message = unary_operand_error(node.op, target_type)
+        if message is not None:
+            self.error(message, node)
+        if target_type in INTEGRAL_TYPES:
+            node.wrap = target_type
+        return target_type
+
+    def type_conditional(self, node):
+        self.resolve_expression(node.condition)
+        then = self.resolve_expression(node.then)
+        orelse = self.resolve_expression(node.orelse)
+        if then == orelse:
+            return then
+        if is_numeric(then) and is_numeric(orelse):
+            # Both branches are promoted to a common numeric type
+            result = promote(then, orelse)
+            node.then = self.coerce(node.then, then, result, node)
+            node.orelse = self.coerce(node.orelse, orelse, result, node)
+            return result
+        if NULL_TYPE in (then, orelse) and "String" in (then, orelse):
+            return "String"
+        return None
+
+    def type_cast(self, node):
+        operand = self.resolve_expression(node.operand)
+        if operand is not None and not is_numeric(operand):
+            self.error(f"incompatible types: {operand} cannot be converted to {node.type}", node)
+        return node.type
+
+    def check_int(self, node, context):
+        """Resolve an array index or size, which must be an int."""
+        _, message = conversion(self.resolve_expression(node), "int")
+        if message is not None:
+            self.error(message, context)
+
+    def type_index(self, node):
+        array_type = self.resolve_expression(node.target)
+        self.check_int(node.index, node)
+        if array_type is not None and not is_array(array_type):
+            self.error(f"array required, but {array_type} found", node)
+        return element_type(array_type)
+
+    def type_length(self, node):
+        array_type = self.resolve_expression(node.target)
+        if array_type is not None and not is_array(array_type):
+            self.error(f"array required, but {array_type} found", node)
+        return "int"
+
+    def type_new_array(self, node):
+        self.check_int(node.length, node)
+        return array_of(node.type)
+
+    def type_array_literal(self, node):
+        for index, element in enumerate(node.elements):
+            node.elements[index] = self.coerce(element, self.resolve_expression(element), node.type, node)
+        return array_of(node.type)
+
+    def type_call(self, node):
+        method = self.methods.get(node.name)
+        arg_types = [self.resolve_expression(arg) for arg in node.args]
+        if method is None or len(method.params) != len(node.args):
+            # Reported when the call runs
+            return None
+        for index, ((param_type, _), arg_type) in enumerate(zip(method.params, arg_types)):
+            node.args[index] = self.coerce(node.args[index], arg_type, param_type, node)
+        return None if method.return_type == "void" else method.return_type
+
+
+def resolve(program, filename="<input>"):
+    """
+    Resolve variable scoping in a parsed program.
+
+    Args:
+        program (Program): The parsed program
+        filename (str): The name of the file being resolved
+
+    Returns:
+        Program: The same program, annotated in place
+    """
+    return Resolver(program, filename).resolve()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Juno Runtime
+Value formatting and operator semantics shared by the Juno execution engines.
+"""
+
+import math
+from array import array
+
+from juno_errors import JunoRuntimeError
+
+
+def format_value(value):
+    """
+    Convert a Juno value to the text Java would print for it.
+
+    Args:
+        value: The value to format
+
+    Returns:
+        str: The printed representation
+    """
+    if value is None:
+        return "null"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, float):
+        if math.isnan(value):
+            return "NaN"
+        if math.isinf(value):
+            return "Infinity" if value > 0 else "-Infinity"
+    if isinstance(value, ARRAY_CLASSES):
+        return "[" + ", ".join([format_value(item) for item in value]) + "]"
+    return str(value)
+
+
+def type_name(value):
+    """Return the Juno type name of a runtime value for error messages."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "double"
+    if isinstance(value, str):
+        return "String"
+    if isinstance(value, ARRAY_CLASSES):
+        return "array"
+    return type(value).__name__
+
+
+def add(left, right):
+    """`+`: string concatenation if either side is a String, else numeric addition."""
+    if isinstance(left, str) or isinstance(right, str):
+        return format_value(left) + format_value(right)
+    return left + right
+
+
+def divide(left, right):
+    """`/`: truncating division for integers, IEEE division for doubles."""
+    if isinstance(left, int) and isinstance(right, int):
+        if right == 0:
+            raise JunoRuntimeError("/ by zero")
+        quotient = abs(left) // abs(right)
+        return quotient if (left < 0) == (right < 0) else -quotient
+    if right == 0:
+        if left == 0 or left != left:
+            return math.nan
+        return math.copysign(math.inf, left) * math.copysign(1.0, right)
+    return left / right
+
+
+def remainder(left, right):
+    """`%`: the result takes the sign of the dividend, as in Java."""
+    if isinstance(left, int) and isinstance(right, int):
+        if right == 0:
+            raise JunoRuntimeError("/ by zero")
+        result = abs(left) % abs(right)
+        return -result if left < 0 else result
+    if right == 0:
+        return math.nan
+    return math.fmod(left, right)
+
+
+# The values Java's integral types can hold
+INTEGRAL_RANGES = {"int": (-2**31, 2**31 - 1), "long": (-2**63, 2**63 - 1)}
+
+
+def cast(target, value):
+    """
+    Convert a number to a numeric type, as a Java cast does.
+
+    Args:
+        target (str): "int", "long", "float" or "double"
+        value: The value to convert
+
+    Returns:
+        The converted value
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise JunoRuntimeError(f"Cannot cast {type_name(value)} to {target}")
+    if target not in INTEGRAL_RANGES:
+        return float(value)
+    low, high = INTEGRAL_RANGES[target]
+    if isinstance(value, float):
+        # Doubles truncate toward zero and saturate; NaN becomes 0
+        if value != value:
+            return 0
+        if math.isinf(value):
+            return high if value > 0 else low
+        return max(low, min(high, int(value)))
+    return wrap(target, value)
+
+
+def wrap(target, value):
+    """
+    Wrap an integer into the range of "int" or "long", as Java integer
+    arithmetic does on overflow.
+    """
+    low, high = INTEGRAL_RANGES[target]
+    if low <= value <= high:
+        return value
+    # Integers wrap around, keeping the low bits
+    span = high - low + 1
+    return (value - low) % span + low
+
+
+# Arrays
+#
+# Arrays of numbers are stored in typed buffers, eight bytes per element,
+# rather than as lists of Python objects; every other element type is
+# stored in a list. Indexes are checked explicitly, since Python would
+# accept negative ones.
+
+ARRAY_CLASSES = (array, list)
+
+# array.array typecodes for the numeric element types
+ARRAY_TYPECODES = {"int": "q", "long": "q", "float": "d", "double": "d"}
+
+# The initial value of list elements; other element types start as null
+LIST_DEFAULTS = {"boolean": False}
+
+
+def new_array(element_type, length):
+    """
+    Create an array of `length` default values, as `new type[length]` does.
+
+    Args:
+        element_type (str): The declared element type, e.g. "int" or "String"
+        length (int): The number of elements
+    """
+    if type(length) is not int:
+        raise JunoRuntimeError(f"Array size must be an int, not {type_name(length)}")
+    if length < 0:
+        raise JunoRuntimeError(f"Negative array size: {length}")
+    typecode = ARRAY_TYPECODES.get(element_type)
+    if typecode is not None:
+        # Both typecodes are eight bytes wide, and all-zero bytes are 0 and 0.0
+        return array(typecode, bytes(8 * length))
+    return [LIST_DEFAULTS.get(element_type)] * length
+
+
+def make_array(element_type, values):
+    """Create an array holding `values`, as an array initializer does."""
+    typecode = ARRAY_TYPECODES.get(element_type)
+    if typecode is None:
+        return list(values)
+    try:
+        return array(typecode, values)
+    except (OverflowError, TypeError) as e:
+        raise JunoRuntimeError(f"Cannot store value in {element_type} array: {e}") from None
+
+
+def check_index(target, index):
+    """Raise the error Java would for `target[index]`, if there is one."""
+    if not isinstance(target, ARRAY_CLASSES):
+        if target is None:
+            raise JunoRuntimeError("Cannot index a null array")
+        raise JunoRuntimeError(f"Cannot index {type_name(target)}")
+    if type(index) is not int:
+        raise JunoRuntimeError(f"Array index must be an int, not {type_name(index)}")
+    if not 0 <= index < len(target):
+        raise JunoRuntimeError(f"Index {index} out of bounds for length {len(target)}")
+
+
+def load_index(target, index):
+    """`target[index]`."""
+    check_index(target, index)
+    return target[index]
+
+
+def store_index(target, index, value):
+    """`target[index] = value`."""
+    check_index(target, index)
+    try:
+        target[index] = value
+    except (OverflowError, TypeError) as e:
+        raise JunoRuntimeError(f"Cannot store {format_value(value)} in array: {e}") from None
+
+
+def check_iterable(target):
+    """Raise the error Java would for `for (... : target)`, if there is one."""
+    if not isinstance(target, ARRAY_CLASSES):
+        if target is None:
+            raise JunoRuntimeError("Cannot iterate over a null array")
+        raise JunoRuntimeError(f"Cannot iterate over {type_name(target)}")
+
+
+def array_length(target):
+    """`target.length`."""
+    if not isinstance(target, ARRAY_CLASSES):
+        if target is None:
+            raise JunoRuntimeError("Cannot read the length of a null array")
+        raise JunoRuntimeError(f"Cannot read the length of {type_name(target)}")
+    return len(target)
+
+
+BINARY_OPERATORS = {
+    "+": add,
+    "-": lambda left, right: left - right,
+    "*": lambda left, right: left * right,
+    "/": divide,
+    "%": remainder,
+    "<": lambda left, right: left < right,
+    "<=": lambda left, right: left <= right,
+    ">": lambda left, right: left > right,
+    ">=": lambda left, right: left >= right,
+    "==": lambda left, right: left == right,
+    "!=": lambda left, right: left != right,
+}
+
+
+def binary_op(op, left, right):
+    """
+    Apply a binary operator to two values.
+
+    Args:
+        op (str): The operator, e.g. "+" or "<="
+        left: The left operand
+        right: The right operand
+
+    Returns:
+        The result of the operation
+    """
+    try:
+        return BINARY_OPERATORS[op](left, right)
+    except TypeError:
+        raise JunoRuntimeError(
+            f"Bad operand types for '{op}': {type_name(left)} and {type_name(right)}"
+        ) from None
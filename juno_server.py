@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Juno Server
+Runs Juno programs in a long-lived process, so each run skips starting
+Python and importing the interpreter.
+
+`juno_standalone.py --server` starts the server, which listens on a Unix
+socket. Running this module as a script is the client: it takes the same
+arguments as juno_standalone.py, and it hands them to the server along
+with its working directory, environment, stdin, stdout and stderr. The
+server forks a child for each run. The child inherits the server's
+imported, warmed-up interpreter. It runs the arguments as
+juno_standalone.py would, reading and writing the client's own file
+descriptors, and reports the exit status back. If no server is running,
+the client runs the program itself.
+
+Needs a platform with Unix sockets and fork (Linux, macOS).
+"""
+
+import os
+import sys
+import json
+import errno
+import signal
+import socket
+import struct
+
+# The socket to listen on or connect to, unless JUNO_SOCKET names another
+DEFAULT_SOCKET = os.path.join(os.path.expanduser("~"), ".juno", "server.sock")
+
+# Prefix of a request: the length of the JSON that follows it
+REQUEST_HEADER = struct.Struct(">I")
+
+# The client's stdin, stdout and stderr, in the order they are sent
+STANDARD_FDS = (0, 1, 2)
+
+# Exit status of a client interrupted with Ctrl-C, as a shell reports it
+INTERRUPTED_STATUS = 130
+
+
+def socket_path(path=None):
+    """Return the server socket path: `path`, else JUNO_SOCKET, else the default."""
+    return path or os.environ.get("JUNO_SOCKET") or DEFAULT_SOCKET
+
+
+def supported():
+    """Return True if this platform can run the server."""
+    return hasattr(socket, "AF_UNIX") and hasattr(os, "fork") and hasattr(socket, "send_fds")
+
+
+def _read_exactly(conn, size):
+    """Read `size` bytes from a socket, or fewer if it closes first."""
+    data = b""
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def _send_message(conn, **message):
+    conn.sendall(json.dumps(message).encode("utf-8") + b"\n")
+
+
+# Server
+
+def serve(path=None, run=None):
+    """
+    Listen for runs until interrupted.
+
+    Args:
+        path (str): The socket to listen on; see socket_path
+        run (callable): Runs one program from a list of command line
+            arguments and returns its exit status; defaults to
+            juno_standalone.main
+
+    Returns:
+        int: The server's exit status
+    """
+    if not supported():
+        print("Error: server mode needs Unix sockets and fork, which this platform lacks")
+        return 1
+    if run is None:
+        from juno_standalone import main as run
+
+    path = socket_path(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if os.path.exists(path):
+        probe = _connect(path)
+        if probe is not None:
+            probe.close()
+            print(f"Error: a Juno server is already listening on {path}")
+            return 1
+        # Left behind by a server that did not shut down cleanly
+        os.unlink(path)
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    os.chmod(path, 0o600)
+    listener.listen(socket.SOMAXCONN)
+    # Children are never waited for; let the system reap them
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"Juno server listening on {path}", flush=True)
+
+    try:
+        while True:
+            try:
+                conn, _ = listener.accept()
+            except InterruptedError:
+                continue
+            try:
+                pid = os.fork()
+            except OSError:
+                conn.close()
+                continue
+            if pid == 0:
+                # The child must never return into the accept loop
+                status = 1
+                try:
+                    listener.close()
+                    status = _handle(conn, run)
+                finally:
+                    os._exit(status)
+            conn.close()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        listener.close()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+    return 0
+
+
+def _handle(conn, run):
+    """Serve one client in a forked child; return the child's exit status."""
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    try:
+        header, fds, _, _ = socket.recv_fds(conn, REQUEST_HEADER.size, len(STANDARD_FDS))
+        if len(header) < REQUEST_HEADER.size or len(fds) != len(STANDARD_FDS):
+            return 1
+        (length,) = REQUEST_HEADER.unpack(header)
+        request = json.loads(_read_exactly(conn, length).decode("utf-8"))
+
+        _attach_streams(fds)
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        sys.argv = request["argv"]
+        _send_message(conn, pid=os.getpid())
+    except (OSError, ValueError, KeyError):
+        return 1
+
+    try:
+        status = run(request["argv"][1:])
+    except SystemExit as e:
+        status = e.code
+    except KeyboardInterrupt:
+        status = INTERRUPTED_STATUS
+    except BaseException:
+        import traceback
+        traceback.print_exc()
+        status = 1
+    if status is None:
+        status = 0
+    elif not isinstance(status, int):
+        print(status, file=sys.stderr)
+        status = 1
+
+    # Nothing runs at exit in a forked child, so flush by hand
+    from juno_output import stdout_output
+    try:
+        stdout_output().flush()
+        sys.stdout.flush()
+        sys.stderr.flush()
+    except OSError:
+        pass
+    try:
+        _send_message(conn, status=status)
+    except OSError:
+        pass
+    return 0
+
+
+def _attach_streams(fds):
+    """Make the client's file descriptors this process's stdin, stdout and stderr."""
+    for target, fd in zip(STANDARD_FDS, fds):
+        os.dup2(fd, target)
+        os.close(fd)
+    # New stream objects, so buffering follows the client's terminal
+    sys.stdin = open(0, "r", encoding="utf-8", closefd=False)
+    sys.stdout = open(1, "w", buffering=1 if os.isatty(1) else -1, encoding="utf-8", closefd=False)
+    sys.stderr = open(2, "w", buffering=1, encoding="utf-8", closefd=False)
+
+
+# Client
+
+def _connect(path):
+    """Return a socket connected to the server at `path`, or None if none is listening."""
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(path)
+    except OSError as e:
+        conn.close()
+        if e.errno in (errno.ENOENT, errno.ECONNREFUSED):
+            return None
+        raise
+    return conn
+
+
+def submit(argv, path=None):
+    """
+    Run a program on the server, forwarding this process's standard streams.
+
+    Args:
+        argv (list): The juno_standalone.py command line arguments
+        path (str): The server socket; see socket_path
+
+    Returns:
+        int: The program's exit status, or None if no server is listening
+    """
+    if not supported():
+        return None
+    conn = _connect(socket_path(path))
+    if conn is None:
+        return None
+
+    with conn:
+        request = json.dumps({
+            "argv": ["juno_standalone.py"] + list(argv),
+            "cwd": os.getcwd(),
+            "env": dict(os.environ),
+        }).encode("utf-8")
+        sys.stdout.flush()
+        sys.stderr.flush()
+        socket.send_fds(conn, [REQUEST_HEADER.pack(len(request))], list(STANDARD_FDS))
+        conn.sendall(request)
+
+        replies = conn.makefile("r", encoding="utf-8")
+        pid = None
+        try:
+            for line in replies:
+                reply = json.loads(line)
+                if "pid" in reply:
+                    pid = reply["pid"]
+                elif "status" in reply:
+                    return reply["status"]
+        except KeyboardInterrupt:
+            # Interrupt the run too, rather than leave it writing to this terminal
+            if pid is not None:
+                try:
+                    os.kill(pid, signal.SIGINT)
+                except OSError:
+                    pass
+            return INTERRUPTED_STATUS
+    # The server's child died without reporting a status
+    return 1
+
+
+def main():
+    """Client entry point: run on the server, or in this process if none is listening."""
+    status = submit(sys.argv[1:])
+    if status is not None:
+        return status
+    from juno_standalone import main as run
+    return run(sys.argv[1:])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
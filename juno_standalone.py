@@ -11,28 +11,63 @@ import traceback
 import importlib.util
 from pathlib import Path
 
+from juno_errors import JunoSyntaxError, JunoCompileError
+from juno_lexer import Lexer, OP
+from juno_parser import parse, check, BRACKET_PAIRS, CLOSING_BRACKETS
+from juno_resolver import resolve, Resolver
+from juno_executor import Executor, DEFAULT_MAX_CALL_DEPTH, UNSET
+from juno_compiler import compile_program, disassemble, CompiledProgram, VM
+from juno_cache import CodeCache, file_hash
+from juno_optimizer import optimize, OptimizationReport
+from juno_output import stdout_output, configure_stdout, DEFAULT_BUFFER_SIZE
+import juno_ast as ast
+
 VERSION = "2.0.1"
 
+# Execution engines: "tree" walks the AST, "vm" runs compiled bytecode
+ENGINES = ("tree", "vm")
+
 class Interpreter:
     """
     The Juno interpreter.
     This class is responsible for parsing and executing Juno code.
     """
     
-    def __init__(self, debug=False, optimize=False, load_stdlib=True, quiet=False):
+    def __init__(self, debug=False, optimize=False, load_stdlib=True, quiet=False, engine="tree",
+                 cache=None, max_loop_iterations=None, max_call_depth=DEFAULT_MAX_CALL_DEPTH,
+                 optimize_report=False, output=None):
         """
         Initialize the interpreter.
 
         Args:
             debug (bool): Enable debug mode
-            optimize (bool): Enable optimizations
+            optimize (bool): Run the optimization passes (see juno_optimizer)
             load_stdlib (bool): Load the standard library
             quiet (bool): Quiet mode - show only program output
+            engine (str): Execution engine, "tree" or "vm"
+            cache (CodeCache): On-disk cache for parsed/compiled code, or None
+            max_loop_iterations (int): Fail any loop that runs more iterations
+                than this; None means loops are unbounded
+            max_call_depth (int): Fail once method calls nest deeper than this
+            optimize_report (bool): Print which optimization passes fired
+                and the instructions they saved
+            output (Output): Where program output goes; defaults to the
+                shared buffered stdout
         """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of: {', '.join(ENGINES)}")
+
         self.debug = debug
         self.optimize = optimize
         self.load_stdlib = load_stdlib
         self.quiet = quiet
+        self.engine = engine
+        self.cache = cache
+        self.max_loop_iterations = max_loop_iterations
+        self.max_call_depth = max_call_depth
+        self.optimize_report = optimize and optimize_report
+        self.report = None
+        self.output = output or stdout_output()
 
         # Initialize the interpreter
         self._initialize()
@@ -46,6 +81,7 @@ class Interpreter:
             print(f"Optimize: {self.optimize}")
             print(f"Load stdlib: {self.load_stdlib}")
             print(f"Quiet mode: {self.quiet}")
+            print(f"Engine: {self.engine}")
 
         # Load the standard library if requested
         if self.load_stdlib:
@@ -57,990 +93,285 @@ class Interpreter:
         if self.debug and not self.quiet:
             print("Loading Juno standard library...")
     
+    def parse(self, source, filename="<input>"):
+        """
+        Parse Juno code into an AST, resolve its variable scoping and, if
+        enabled, optimize it.
+
+        Args:
+            source (str or file): The Juno source code, or a text stream to read it from
+            filename (str): The name of the file being parsed
+
+        Returns:
+            Program: The root node of the AST
+        """
+        return self._optimize(resolve(parse(source, filename), filename))
+
+    def _optimize(self, program):
+        """Run the optimization passes over a resolved program, if enabled."""
+        if self.optimize:
+            self.report = OptimizationReport()
+            program = optimize(program, self.report)
+        return program
+
+    def compile(self, source, filename="<input>"):
+        """
+        Compile Juno code to bytecode for the VM engine.
+
+        Args:
+            source (str or file): The Juno source code, or a text stream to read it from
+            filename (str): The name of the file being compiled
+
+        Returns:
+            CompiledProgram: The compiled program
+        """
+        return self._lower(self.parse(source, filename), filename)
+
+    def _lower(self, program, filename, method_index=None):
+        """Compile a parsed program, printing its disassembly in debug mode."""
+        compiled = compile_program(program, filename, self.max_loop_iterations is not None, self.report,
+                                   method_index)
+        if self.debug and not self.quiet:
+            method_names = list(compiled.method_index)
+            print(disassemble(compiled.main, compiled.global_names, method_names))
+            for code_object in compiled.methods:
+                if code_object is not None:
+                    print(disassemble(code_object, compiled.global_names, method_names))
+        return compiled
+
+    def cache_tag(self):
+        """Return the code cache tag for this interpreter's version and engine."""
+        tag = f"juno-{VERSION}-{self.engine}"
+        if self.engine == "vm" and self.max_loop_iterations is not None:
+            # Loop guards are compiled into the bytecode
+            tag += "-guarded"
+        if self.optimize:
+            tag += "-opt"
+        return tag
+
+    def load(self, source, filename="<input>", digest=None):
+        """
+        Prepare Juno code for execution.
+
+        The source is parsed and, for the "vm" engine, compiled. When a
+        source digest is given and a code cache is configured, a valid
+        cached result is returned instead and new results are stored.
+
+        Args:
+            source (str or file): The Juno source code, or a text stream to read it from
+            filename (str): The name of the file being loaded
+            digest (bytes): SHA-256 of the source file, enabling the cache
+
+        Returns:
+            Program or CompiledProgram: What the selected engine will run
+        """
+        use_cache = digest is not None and self.cache is not None
+        # A report needs the passes to actually run, so it bypasses cached entries
+        if use_cache and not self.optimize_report:
+            payload = self.cache.load(filename, digest, self.cache_tag())
+            if payload is not None:
+                if self.debug and not self.quiet:
+                    print(f"Loaded {filename} from the code cache")
+                return payload
+
+        payload = self.parse(source, filename)
+        if self.engine == "vm":
+            try:
+                payload = self._lower(payload, filename)
+            except JunoCompileError as e:
+                if self.debug and not self.quiet:
+                    print(f"Falling back to the tree engine: {e}")
+
+        if self.optimize_report:
+            print(self.report.format(), file=sys.stderr, flush=True)
+        if use_cache:
+            self.cache.store(filename, digest, self.cache_tag(), payload)
+        return payload
+
     def check_syntax(self, source, filename="<input>"):
         """
         Check the syntax of Juno code without executing it.
 
         Args:
-            source (str): The Juno source code
+            source (str or file): The Juno source code, or a text stream to read it from
             filename (str): The name of the file being checked
 
         Returns:
             bool: True if the syntax is valid, False otherwise
         """
-        # This is a placeholder for the actual syntax checking
         if self.debug and not self.quiet:
             print(f"Checking syntax of {filename}...")
 
-        # For now, just return True (syntax is valid)
-        return True
+        program, errors = check(source, filename)
+        if program is not None and not errors:
+            try:
+                resolve(program, filename)
+            except JunoSyntaxError as e:
+                errors.append(e)
+            else:
+                if self.debug and not self.quiet:
+                    print(f"Methods: {', '.join(program.methods) or '(none)'}")
+
+        for error in errors:
+            # Always show errors, even in quiet mode
+            print(f"Syntax error: {error}", flush=True)
+        return not errors
     
-    def execute(self, source, filename="<input>"):
+    def execute(self, source, filename="<input>", digest=None):
         """
         Execute Juno code.
 
+        The source is parsed once into an AST. With the "vm" engine the AST
+        is compiled to bytecode and run on the VM; the tree-walking executor
+        is used otherwise, and as a fallback for anything the compiler
+        cannot lower.
+
         Args:
-            source (str): The Juno source code
+            source (str or file): The Juno source code, or a text stream to read it from
             filename (str): The name of the file being executed
+            digest (bytes): SHA-256 of the source file, enabling the code cache
 
         Returns:
             bool: True if execution was successful, False otherwise
         """
-        # Removed execution message to keep output clean
-
         try:
-            # For now, skip the JIT compiler and use the direct interpreter
-            # This ensures we properly handle Java-style syntax
+            payload = self.load(source, filename, digest)
 
-            # Uncomment this section when the JIT compiler is fully compatible with Java syntax
-            """
-            # Import the JIT compiler if available
-            try:
-                # Check if the JIT compiler module exists
-                jit_spec = importlib.util.find_spec("juno.compiler.jit")
-                interpreter_spec = importlib.util.find_spec("juno.interpreter_with_jit")
-
-                if jit_spec is not None and interpreter_spec is not None:
-                    # Import the modules
-                    jit_module = importlib.util.module_from_spec(jit_spec)
-                    interpreter_module = importlib.util.module_from_spec(interpreter_spec)
-
-                    jit_spec.loader.exec_module(jit_module)
-                    interpreter_spec.loader.exec_module(interpreter_module)
-
-                    # Use the JIT compiler
-                    JITCompiler = jit_module.JITCompiler
-                    JITInterpreter = interpreter_module.Interpreter
-
-                    jit_interpreter = JITInterpreter(debug=self.debug, optimize=self.optimize)
-
-                    try:
-                        result = jit_interpreter.execute(source, filename)
-
-                        if result:
-                            print("=" * 60)
-                            print("Execution completed successfully with JIT compilation")
-                            return True
-                        else:
-                            print("=" * 60)
-                            print("Execution failed with JIT compilation, falling back to interpreter")
-                    except Exception as e:
-                        print(f"Error: {str(e)}")
-                        if self.debug:
-                            traceback.print_exc()
-                        print("=" * 60)
-                        print("Execution failed with JIT compilation, falling back to interpreter")
-                else:
-                    # JIT compiler not available, fall back to interpreter
-                    pass
-            except Exception as e:
-                # Error importing JIT compiler, fall back to interpreter
-                if self.debug:
-                    print(f"Error importing JIT compiler: {str(e)}")
-                    traceback.print_exc()
-                print("JIT compiler not available, using standard interpreter")
-                pass
-            """
-
-            # Use the direct interpreter for now - no messages
-            pass
-
-            # Fall back to simple execution if JIT fails or is not available
-            # Simple line-by-line execution
-            local_vars = {}
-            local_methods = {}  # Store methods
-            lines = source.split('\n')
-
-            # First pass: identify methods
-            j = 0
-            while j < len(lines):
-                line = lines[j].strip()
-
-                # Identify method declarations
-                if any(keyword in line for keyword in ['public ', 'private ', 'protected ', 'static ']) and '(' in line and ')' in line:
-                    # This is a method declaration
-                    method_parts = line.split("(")
-                    method_name = method_parts[0].split(" ")[-1].strip()
-
-                    # Extract parameter list
-                    params_part = method_parts[1].split(")")[0].strip()
-                    params = []
-
-                    if params_part:
-                        # Process Java-style parameters (type name, type name, ...)
-                        param_pairs = params_part.split(",")
-                        for pair in param_pairs:
-                            param_parts = pair.strip().split(" ")
-                            param_name = param_parts[-1].strip()
-                            params.append(param_name)
-
-                    # Find the method body
-                    method_body_start = j
-                    method_body_end = j
-
-                    # Find the end of the method
-                    brace_count = 0
-                    if '{' in line:
-                        brace_count = 1
-                    else:
-                        # Look for opening brace on next line
-                        k = j
-                        while k < len(lines) and '{' not in lines[k]:
-                            k += 1
-                        if k < len(lines):
-                            brace_count = 1
-                            method_body_start = k + 1
-
-                    k = j
-                    while brace_count > 0 and k < len(lines):
-                        next_line = lines[k].strip()
-                        k += 1
-                        if '{' in next_line:
-                            brace_count += 1
-                        if '}' in next_line:
-                            brace_count -= 1
-                            if brace_count == 0:
-                                method_body_end = k - 1
-
-                    # Store method details
-                    local_methods[method_name] = {
-                        'params': params,
-                        'body_start': method_body_start,
-                        'body_end': method_body_end,
-                        'is_static': 'static' in line
-                    }
-
-                j += 1
-            i = 0
-            while i < len(lines):
-                line = lines[i].strip()
-                i += 1
-
-                # Skip empty lines and comments
-                if not line or line.startswith('//'):
-                    continue
-
-                # Handle variable declarations with Java-style types
-                if any(type_name in line for type_name in ["String", "int", "double", "boolean", "float", "long"]) and "=" in line:
-                    var_decl = line.strip()
-                    if '=' in var_decl:
-                        var_name_part, var_value = var_decl.split('=', 1)
-                        var_name = var_name_part.split()[-1].strip()  # Get the last part (variable name)
-                        var_value = var_value.strip()
-
-                        # Handle string literals
-                        if var_value.endswith(';'):
-                            var_value = var_value[:-1]  # Remove semicolon
-
-                        if var_value.startswith('"') and var_value.endswith('"'):
-                            local_vars[var_name] = var_value[1:-1]
-                        elif var_value.startswith("'") and var_value.endswith("'"):
-                            local_vars[var_name] = var_value[1:-1]
-                        # Handle numbers
-                        elif var_value.isdigit():
-                            local_vars[var_name] = int(var_value)
-                        elif var_value.replace('.', '', 1).isdigit():
-                            local_vars[var_name] = float(var_value)
-                        # Handle method calls
-                        elif "(" in var_value and ")" in var_value:
-                            method_name = var_value.split("(")[0].strip()
-                            args_str = var_value[var_value.find("(")+1:var_value.rfind(")")].strip()
-
-                            # Handle method calls like greet("Developer")
-                            if method_name in local_methods:
-                                # Process arguments
-                                args = []
-                                if args_str:
-                                    for arg in args_str.split(","):
-                                        arg = arg.strip()
-                                        if arg.startswith('"') and arg.endswith('"'):
-                                            args.append(arg[1:-1])
-                                        elif arg.startswith("'") and arg.endswith("'"):
-                                            args.append(arg[1:-1])
-                                        elif arg in local_vars:
-                                            args.append(local_vars[arg])
-                                        elif arg.isdigit():
-                                            args.append(int(arg))
-                                        else:
-                                            args.append(arg)
-
-                                # Get method details
-                                method_info = local_methods[method_name]
-
-                                # Create a local scope for the method
-                                method_local_vars = {}
-
-                                # Add parameters to the method's local scope
-                                for idx, param_name in enumerate(method_info['params']):
-                                    if idx < len(args):
-                                        method_local_vars[param_name] = args[idx]
-                                    else:
-                                        method_local_vars[param_name] = None  # Default value if not provided
-
-                                # Execute the method body (simplified)
-                                method_result = None
-
-                                # Find return statements in the method body
-                                for method_line_idx in range(method_info['body_start'], method_info['body_end']):
-                                    method_line = lines[method_line_idx].strip()
-
-                                    # Check for return statement
-                                    if method_line.startswith('return '):
-                                        return_expr = method_line[7:]  # Remove 'return '
-                                        if return_expr.endswith(';'):
-                                            return_expr = return_expr[:-1]  # Remove semicolon
-
-                                        # Handle string literals
-                                        if return_expr.startswith('"') and return_expr.endswith('"'):
-                                            method_result = return_expr[1:-1]
-                                        elif return_expr.startswith("'") and return_expr.endswith("'"):
-                                            method_result = return_expr[1:-1]
-                                        # Handle variables
-                                        elif return_expr in method_local_vars:
-                                            method_result = method_local_vars[return_expr]
-                                        # Handle string concatenation
-                                        elif '+' in return_expr and not return_expr.replace('+', '').strip().isdigit():
-                                            # Process string concatenation
-                                            parts = []
-                                            current_part = ""
-                                            in_string = False
-                                            string_delimiter = None
-
-                                            for char in return_expr:
-                                                if char in ['"', "'"]:
-                                                    if not in_string:
-                                                        in_string = True
-                                                        string_delimiter = char
-                                                    elif char == string_delimiter:
-                                                        in_string = False
-                                                        string_delimiter = None
-                                                    current_part += char
-                                                elif char == '+' and not in_string:
-                                                    parts.append(current_part.strip())
-                                                    current_part = ""
-                                                else:
-                                                    current_part += char
-
-                                            # Add the last part
-                                            if current_part:
-                                                parts.append(current_part.strip())
-
-                                            # Evaluate each part
-                                            result = ""
-                                            for part in parts:
-                                                if part.startswith('"') and part.endswith('"'):
-                                                    result += part[1:-1]
-                                                elif part.startswith("'") and part.endswith("'"):
-                                                    result += part[1:-1]
-                                                elif part in method_local_vars:
-                                                    result += str(method_local_vars[part])
-                                                elif part in local_vars:
-                                                    result += str(local_vars[part])
-                                                else:
-                                                    result += part
-
-                                            method_result = result
-                                        # Handle numeric expressions
-                                        elif '+' in return_expr and return_expr.replace('+', '').strip().isdigit():
-                                            # Simple addition
-                                            try:
-                                                method_result = eval(return_expr)
-                                            except:
-                                                method_result = return_expr
-                                        else:
-                                            method_result = return_expr
-
-                                        break  # Stop at the first return statement
-
-                                local_vars[var_name] = method_result
-                            else:
-                                local_vars[var_name] = f"Method call: {var_value}"
-                        # Handle arrays
-                        elif var_value.startswith('[') and var_value.endswith(']'):
-                            array_items = var_value[1:-1].split(',')
-                            local_vars[var_name] = [item.strip() for item in array_items]
-                        # Handle expressions
-                        else:
-                            local_vars[var_name] = var_value
-
-                # Handle System.out.println statements
-                elif "System.out.println" in line:
-                    # Extract content inside println()
-                    content_start = line.find("System.out.println(") + len("System.out.println(")
-                    content_end = line.rfind(")")
-                    content = line[content_start:content_end].strip()
-
-                    # Remove semicolon if present
-                    if content.endswith(";"):
-                        content = content[:-1]
-
-                    # Handle string literals
-                    if content.startswith('"') and content.endswith('"'):
-                        print(content[1:-1], flush=True)
-                    elif content.startswith("'") and content.endswith("'"):
-                        print(content[1:-1], flush=True)
-                    # Handle variables
-                    elif content in local_vars:
-                        print(local_vars[content], flush=True)
-                    # Handle method calls
-                    elif "(" in content and ")" in content:
-                        method_name = content.split("(")[0].strip()
-                        args_str = content[content.find("(")+1:content.rfind(")")].strip()
-
-                        # Process method call
-                        if method_name in local_methods:
-                            # Process arguments
-                            args = []
-                            if args_str:
-                                for arg in args_str.split(","):
-                                    arg = arg.strip()
-                                    if arg.startswith('"') and arg.endswith('"'):
-                                        args.append(arg[1:-1])
-                                    elif arg.startswith("'") and arg.endswith("'"):
-                                        args.append(arg[1:-1])
-                                    elif arg in local_vars:
-                                        args.append(local_vars[arg])
-                                    elif arg.isdigit():
-                                        args.append(int(arg))
-                                    else:
-                                        args.append(arg)
-
-                            # Execute method (simplified)
-                            method_result = f"Result of {method_name}({args_str})"
-                            print(method_result, flush=True)
-                        else:
-                            print(f"Method call: {content}", flush=True)
-                    # Handle expressions with variables and concatenation
-                    elif '+' in content:
-                        # Process each part of the expression
-                        parts = []
-                        current_part = ""
-                        in_string = False
-                        string_delimiter = None
-
-                        for char in content:
-                            if char in ['"', "'"]:
-                                if not in_string:
-                                    in_string = True
-                                    string_delimiter = char
-                                elif char == string_delimiter:
-                                    in_string = False
-                                    string_delimiter = None
-                                current_part += char
-                            elif char == '+' and not in_string:
-                                parts.append(current_part.strip())
-                                current_part = ""
-                            else:
-                                current_part += char
-
-                        # Add the last part
-                        if current_part:
-                            parts.append(current_part.strip())
-
-                        # Evaluate each part
-                        result = ""
-                        for part in parts:
-                            if part.startswith('"') and part.endswith('"'):
-                                result += part[1:-1]
-                            elif part.startswith("'") and part.endswith("'"):
-                                result += part[1:-1]
-                            elif part in local_vars:
-                                result += str(local_vars[part])
-                            elif part.startswith('(') and part.endswith(')'):
-                                # Handle expressions in parentheses
-                                expr = part[1:-1].strip()
-                                if expr in local_vars:
-                                    result += str(local_vars[expr])
-                                elif '+' in expr and expr.replace('+', '').strip().isdigit():
-                                    # Simple addition
-                                    try:
-                                        result += str(eval(expr))
-                                    except:
-                                        result += expr
-                                elif expr.count('+') == 1:
-                                    # Try to evaluate a simple expression with two variables
-                                    try:
-                                        left, right = expr.split('+')
-                                        left = left.strip()
-                                        right = right.strip()
-
-                                        if left in local_vars:
-                                            left = local_vars[left]
-                                        else:
-                                            try:
-                                                left = int(left)
-                                            except:
-                                                try:
-                                                    left = float(left)
-                                                except:
-                                                    pass
-
-                                        if right in local_vars:
-                                            right = local_vars[right]
-                                        else:
-                                            try:
-                                                right = int(right)
-                                            except:
-                                                try:
-                                                    right = float(right)
-                                                except:
-                                                    pass
-
-                                        result += str(left + right)
-                                    except:
-                                        result += expr
-                                else:
-                                    result += expr
-                            else:
-                                result += part
-
-                        print(result, flush=True)
-                    else:
-                        # For other expressions, just print the raw content
-                        print(f"{content}", flush=True)
-
-                # Handle Java-style method definitions
-                elif any(keyword in line for keyword in ['public ', 'private ', 'protected ', 'static ']) and '(' in line:
-                    # This is a method declaration
-                    method_decl = line.strip()
-
-                    # Extract method name and parameters
-                    method_parts = method_decl.split("(")
-                    method_name = method_parts[0].split(" ")[-1].strip()
-
-                    # Extract parameter list
-                    params_part = method_parts[1].split(")")[0].strip()
-                    params = []
-
-                    if params_part:
-                        # Process Java-style parameters (type name, type name, ...)
-                        param_pairs = params_part.split(",")
-                        for pair in param_pairs:
-                            param_parts = pair.strip().split(" ")
-                            param_name = param_parts[-1].strip()
-                            params.append(param_name)
-
-                    # Store method information
-                    method_body_start = i
-
-                    # Find the end of the method
-                    brace_count = 0
-                    if '{' in line:
-                        brace_count = 1
-                    while brace_count > 0 and i < len(lines):
-                        next_line = lines[i].strip()
-                        i += 1
-                        if '{' in next_line:
-                            brace_count += 1
-                        if '}' in next_line:
-                            brace_count -= 1
-
-                    method_body_end = i - 1
-
-                    # Store method in local_methods with more details
-                    local_methods[method_name] = {
-                        'params': params,
-                        'body_start': method_body_start,
-                        'body_end': method_body_end,
-                        'is_static': 'static' in method_decl
-                    }
-
-                # Handle Java-style if statements
-                elif line.startswith('if '):
-                    # Extract condition
-                    condition = line[3:].strip()
-                    if condition.startswith('(') and ')' in condition:
-                        condition = condition[1:condition.find(')')].strip()
-
-                    # Evaluate condition (improved)
-                    condition_true = False
-
-                    # Handle different comparison operators
-                    if '>' in condition and '=' not in condition:
-                        left, right = condition.split('>', 1)
-                        left = left.strip()
-                        right = right.strip()
-                        if left in local_vars:
-                            left = local_vars[left]
-                        else:
-                            try:
-                                left = int(left)
-                            except:
-                                try:
-                                    left = float(left)
-                                except:
-                                    pass
-                        if right in local_vars:
-                            right = local_vars[right]
-                        else:
-                            try:
-                                right = int(right)
-                            except:
-                                try:
-                                    right = float(right)
-                                except:
-                                    pass
-                        condition_true = left > right
-                    elif '>=' in condition:
-                        left, right = condition.split('>=', 1)
-                        left = left.strip()
-                        right = right.strip()
-                        if left in local_vars:
-                            left = local_vars[left]
-                        else:
-                            try:
-                                left = int(left)
-                            except:
-                                try:
-                                    left = float(left)
-                                except:
-                                    pass
-                        if right in local_vars:
-                            right = local_vars[right]
-                        else:
-                            try:
-                                right = int(right)
-                            except:
-                                try:
-                                    right = float(right)
-                                except:
-                                    pass
-                        condition_true = left >= right
-                    elif '<' in condition and '=' not in condition:
-                        left, right = condition.split('<', 1)
-                        left = left.strip()
-                        right = right.strip()
-                        if left in local_vars:
-                            left = local_vars[left]
-                        else:
-                            try:
-                                left = int(left)
-                            except:
-                                try:
-                                    left = float(left)
-                                except:
-                                    pass
-                        if right in local_vars:
-                            right = local_vars[right]
-                        else:
-                            try:
-                                right = int(right)
-                            except:
-                                try:
-                                    right = float(right)
-                                except:
-                                    pass
-                        condition_true = left < right
-                    elif '<=' in condition:
-                        left, right = condition.split('<=', 1)
-                        left = left.strip()
-                        right = right.strip()
-                        if left in local_vars:
-                            left = local_vars[left]
-                        else:
-                            try:
-                                left = int(left)
-                            except:
-                                try:
-                                    left = float(left)
-                                except:
-                                    pass
-                        if right in local_vars:
-                            right = local_vars[right]
-                        else:
-                            try:
-                                right = int(right)
-                            except:
-                                try:
-                                    right = float(right)
-                                except:
-                                    pass
-                        condition_true = left <= right
-                    elif '==' in condition:
-                        left, right = condition.split('==', 1)
-                        left = left.strip()
-                        right = right.strip()
-                        if left in local_vars:
-                            left = local_vars[left]
-                        else:
-                            try:
-                                left = int(left)
-                            except:
-                                try:
-                                    left = float(left)
-                                except:
-                                    if left.startswith('"') and left.endswith('"'):
-                                        left = left[1:-1]
-                                    elif left.startswith("'") and left.endswith("'"):
-                                        left = left[1:-1]
-                        if right in local_vars:
-                            right = local_vars[right]
-                        else:
-                            try:
-                                right = int(right)
-                            except:
-                                try:
-                                    right = float(right)
-                                except:
-                                    if right.startswith('"') and right.endswith('"'):
-                                        right = right[1:-1]
-                                    elif right.startswith("'") and right.endswith("'"):
-                                        right = right[1:-1]
-                        condition_true = left == right
-                    elif '!=' in condition:
-                        left, right = condition.split('!=', 1)
-                        left = left.strip()
-                        right = right.strip()
-                        if left in local_vars:
-                            left = local_vars[left]
-                        else:
-                            try:
-                                left = int(left)
-                            except:
-                                try:
-                                    left = float(left)
-                                except:
-                                    if left.startswith('"') and left.endswith('"'):
-                                        left = left[1:-1]
-                                    elif left.startswith("'") and left.endswith("'"):
-                                        left = left[1:-1]
-                        if right in local_vars:
-                            right = local_vars[right]
-                        else:
-                            try:
-                                right = int(right)
-                            except:
-                                try:
-                                    right = float(right)
-                                except:
-                                    if right.startswith('"') and right.endswith('"'):
-                                        right = right[1:-1]
-                                    elif right.startswith("'") and right.endswith("'"):
-                                        right = right[1:-1]
-                        condition_true = left != right
-
-                    # Find the if block and else block
-                    if_block_start = i
-                    if_block_end = i
-                    else_block_start = -1
-                    else_block_end = -1
-                    brace_count = 1
-                    while brace_count > 0 and i < len(lines):
-                        next_line = lines[i].strip()
-                        i += 1
-                        if '{' in next_line:
-                            brace_count += 1
-                        if '}' in next_line:
-                            brace_count -= 1
-                            if brace_count == 0:
-                                if_block_end = i - 1
-                                # Check for else
-                                if i < len(lines) and lines[i].strip().startswith('else'):
-                                    i += 1  # Skip else line
-                                    else_block_start = i
-                                    brace_count = 1
-                                    while brace_count > 0 and i < len(lines):
-                                        next_line = lines[i].strip()
-                                        i += 1
-                                        if '{' in next_line:
-                                            brace_count += 1
-                                        if '}' in next_line:
-                                            brace_count -= 1
-                                            if brace_count == 0:
-                                                else_block_end = i - 1
-
-                    # Execute the appropriate block
-                    if condition_true:
-                        # Execute if block
-                        pass
-                    elif else_block_start != -1:
-                        # Execute else block
-                        pass
-
-                # Handle Java-style for loops
-                elif line.startswith('for '):
-                    # Extract loop parameters
-                    for_stmt = line.strip()
-
-                    # Process the for loop
-                    if '(' in for_stmt and ')' in for_stmt:
-                        for_parts = for_stmt[for_stmt.find('(')+1:for_stmt.find(')')].split(';')
-                        if len(for_parts) == 3:
-                            # Standard for loop: for (init; condition; increment)
-                            init = for_parts[0].strip()
-                            condition = for_parts[1].strip()
-                            increment = for_parts[2].strip()
-
-                            # Extract variable name and initial value from init
-                            if ' ' in init:
-                                # Has type declaration: int i = 0
-                                var_parts = init.split(' ')
-                                var_type = var_parts[0].strip()
-                                var_assign = ' '.join(var_parts[1:]).strip()
-                                var_name = var_assign.split('=')[0].strip()
-                                initial_value = var_assign.split('=')[1].strip()
-                            else:
-                                # No type declaration: i = 0
-                                var_name = init.split('=')[0].strip()
-                                initial_value = init.split('=')[1].strip()
-
-                            # Initialize the loop variable
-                            try:
-                                if initial_value.isdigit():
-                                    local_vars[var_name] = int(initial_value)
-                                elif initial_value.replace('.', '', 1).isdigit():
-                                    local_vars[var_name] = float(initial_value)
-                                else:
-                                    local_vars[var_name] = initial_value
-                            except:
-                                local_vars[var_name] = 0
-
-                    # Find the for loop body
-                    brace_count = 0
-                    if '{' in line:
-                        brace_count = 1
-                        for_body_start = i
-                    else:
-                        for_body_start = i
-                        # Look for opening brace on next line
-                        if i < len(lines) and '{' in lines[i]:
-                            brace_count = 1
-                            i += 1
-
-                    for_body_end = i
-                    while brace_count > 0 and i < len(lines):
-                        next_line = lines[i].strip()
-                        i += 1
-                        if '{' in next_line:
-                            brace_count += 1
-                        if '}' in next_line:
-                            brace_count -= 1
-                            if brace_count == 0:
-                                for_body_end = i - 1
-
-                    # Actually execute the for loop (basic implementation)
-                    if len(for_parts) == 3:
-                        # Get loop components
-                        condition = for_parts[1].strip()
-                        increment = for_parts[2].strip()
-                        var_name = None
-
-                        # Extract variable name from init
-                        if ' ' in init:
-                            var_name = init.split(' ')[-1].split('=')[0].strip()
-                        else:
-                            var_name = init.split('=')[0].strip()
-
-                        # Store the current position to return to after loop execution
-                        original_position = i
-
-                        # Execute the loop (limited to 100 iterations for safety)
-                        max_iterations = 100
-                        iteration_count = 0
-
-                        while iteration_count < max_iterations:
-                            # Evaluate condition
-                            condition_true = False
-
-                            if '<' in condition:
-                                left, right = condition.split('<', 1)
-                                left = left.strip()
-                                right = right.strip()
-
-                                # Get left value (usually the loop variable)
-                                if left in local_vars:
-                                    left_val = local_vars[left]
-                                else:
-                                    try:
-                                        left_val = int(left)
-                                    except:
-                                        left_val = 0
-
-                                # Get right value
-                                if right in local_vars:
-                                    right_val = local_vars[right]
-                                else:
-                                    try:
-                                        right_val = int(right)
-                                    except:
-                                        right_val = 0
-
-                                condition_true = left_val < right_val
-                            elif '<=' in condition:
-                                left, right = condition.split('<=', 1)
-                                left = left.strip()
-                                right = right.strip()
-
-                                # Get left value (usually the loop variable)
-                                if left in local_vars:
-                                    left_val = local_vars[left]
-                                else:
-                                    try:
-                                        left_val = int(left)
-                                    except:
-                                        left_val = 0
-
-                                # Get right value
-                                if right in local_vars:
-                                    right_val = local_vars[right]
-                                else:
-                                    try:
-                                        right_val = int(right)
-                                    except:
-                                        right_val = 0
-
-                                condition_true = left_val <= right_val
-
-                            # Exit loop if condition is false
-                            if not condition_true:
-                                break
-
-                            # Execute loop body
-                            loop_i = for_body_start
-                            while loop_i < for_body_end:
-                                loop_line = lines[loop_i].strip()
-
-                                # Process loop body line (simplified)
-                                if "System.out.println" in loop_line:
-                                    # Extract content inside println()
-                                    content_start = loop_line.find("System.out.println(") + len("System.out.println(")
-                                    content_end = loop_line.rfind(")")
-                                    content = loop_line[content_start:content_end].strip()
-
-                                    # Remove semicolon if present
-                                    if content.endswith(";"):
-                                        content = content[:-1]
-
-                                    # Handle string literals
-                                    if content.startswith('"') and content.endswith('"'):
-                                        print(content[1:-1], flush=True)
-                                    elif content.startswith("'") and content.endswith("'"):
-                                        print(content[1:-1], flush=True)
-                                    # Handle variables
-                                    elif content in local_vars:
-                                        print(local_vars[content], flush=True)
-                                    # Handle expressions with variables and concatenation
-                                    elif '+' in content:
-                                        # Process each part of the expression
-                                        parts = []
-                                        current_part = ""
-                                        in_string = False
-                                        string_delimiter = None
-
-                                        for char in content:
-                                            if char in ['"', "'"]:
-                                                if not in_string:
-                                                    in_string = True
-                                                    string_delimiter = char
-                                                elif char == string_delimiter:
-                                                    in_string = False
-                                                    string_delimiter = None
-                                                current_part += char
-                                            elif char == '+' and not in_string:
-                                                parts.append(current_part.strip())
-                                                current_part = ""
-                                            else:
-                                                current_part += char
-
-                                        # Add the last part
-                                        if current_part:
-                                            parts.append(current_part.strip())
-
-                                        # Evaluate each part
-                                        result = ""
-                                        for part in parts:
-                                            if part.startswith('"') and part.endswith('"'):
-                                                result += part[1:-1]
-                                            elif part.startswith("'") and part.endswith("'"):
-                                                result += part[1:-1]
-                                            elif part in local_vars:
-                                                result += str(local_vars[part])
-                                            elif part.startswith('(') and part.endswith(')'):
-                                                # Handle expressions in parentheses
-                                                expr = part[1:-1].strip()
-                                                if expr in local_vars:
-                                                    result += str(local_vars[expr])
-                                                else:
-                                                    result += expr
-                                            else:
-                                                result += part
-
-                                        print(result, flush=True)
-
-                                loop_i += 1
-
-                            # Apply increment
-                            if var_name and var_name in local_vars:
-                                if increment.strip() == var_name + "++":
-                                    local_vars[var_name] += 1
-                                elif increment.strip() == "++" + var_name:
-                                    local_vars[var_name] += 1
-                                elif increment.strip() == var_name + "--":
-                                    local_vars[var_name] -= 1
-                                elif increment.strip() == "--" + var_name:
-                                    local_vars[var_name] -= 1
-                                elif "+=" in increment:
-                                    var, val = increment.split("+=", 1)
-                                    var = var.strip()
-                                    val = val.strip()
-                                    if var == var_name:
-                                        try:
-                                            local_vars[var_name] += int(val)
-                                        except:
-                                            try:
-                                                local_vars[var_name] += float(val)
-                                            except:
-                                                pass
-                                elif "=" in increment:
-                                    var, expr = increment.split("=", 1)
-                                    var = var.strip()
-                                    expr = expr.strip()
-                                    if var == var_name:
-                                        if "+" in expr:
-                                            try:
-                                                parts = expr.split("+")
-                                                if len(parts) == 2 and parts[0].strip() == var_name:
-                                                    val = parts[1].strip()
-                                                    try:
-                                                        local_vars[var_name] += int(val)
-                                                    except:
-                                                        try:
-                                                            local_vars[var_name] += float(val)
-                                                        except:
-                                                            pass
-                                            except:
-                                                pass
-
-                            iteration_count += 1
-
-                        # Restore position after loop execution
-                        i = original_position
-                    else:
-                        # Skip the for loop body if we couldn't parse it properly
-                        i = for_body_end
+            if isinstance(payload, CompiledProgram):
+                VM(payload, filename, self.max_loop_iterations, self.max_call_depth,
+                   self.output).run()
+            else:
+                Executor(payload, filename, self.max_loop_iterations, self.max_call_depth,
+                         self.optimize, self.output).run()
 
             # Ensure all output is flushed
-            sys.stdout.flush()
+            self.output.flush()
             return True
 
         except Exception as e:
-            # Ensure all output is flushed
+            self._report_error(e)
+            return False
+
+    def _report_error(self, error):
+        """Print an error that ended a program, after the output it produced."""
+        self.output.flush()
+
+        # Always show errors, even in quiet mode
+        print(f"Error: {str(error)}", flush=True)
+        if self.debug:
+            traceback.print_exc()
             sys.stdout.flush()
 
-            # Always show errors, even in quiet mode
-            print(f"Error: {str(e)}", flush=True)
-            if self.debug:
-                traceback.print_exc()
-                sys.stdout.flush()
+
+class Session:
+    """
+    The state of a REPL session, kept from one input to the next: the
+    globals and methods earlier inputs declared, and the engine holding
+    the globals' values.
+
+    Each input is parsed on its own and resolved against what came before,
+    so only the new code is resolved, optimized and compiled. Globals keep
+    their slots for the whole session and cannot be declared twice,
+    unless the declaration never ran because an error stopped the input
+    first; methods can be redefined, and existing call sites switch to the new
+    definition.
+    """
+
+    def __init__(self, interpreter, filename="<repl>"):
+        """
+        Initialize the session.
+
+        Args:
+            interpreter (Interpreter): Supplies the engine and its settings
+            filename (str): The name errors give for the session's input
+        """
+        self.interpreter = interpreter
+        self.filename = filename
+        # Global name -> (slot, declared type), as the resolver records them
+        self.globals = {}
+        # Method name -> MethodDecl
+        self.methods = {}
+        # Method name -> VM method slot
+        self.method_index = {}
+
+        limits = (interpreter.max_loop_iterations, interpreter.max_call_depth)
+        if interpreter.engine == "vm":
+            empty = CompiledProgram(None, [], self.method_index, [])
+            self.engine = VM(empty, filename, *limits, output=interpreter.output)
+        else:
+            empty = ast.Program([], {}, [], 0)
+            self.engine = Executor(empty, filename, *limits, optimize=interpreter.optimize,
+                                   output=interpreter.output)
+
+    def execute(self, source):
+        """
+        Run one input in the session.
+
+        Args:
+            source (str): The Juno code entered
+
+        Returns:
+            bool: True if it ran successfully, False otherwise
+        """
+        interpreter = self.interpreter
+        try:
+            program = parse(source, self.filename)
+            # Resolve against a copy, so an input with an error declares nothing
+            known_globals = dict(self.globals)
+            values = self.engine.globals
+            unset = [name for name, (slot, _) in known_globals.items() if values[slot] is UNSET]
+            Resolver(program, self.filename, known_globals, self.methods, unset).resolve()
+            program = interpreter._optimize(program)
+            if isinstance(self.engine, VM):
+                payload = interpreter._lower(program, self.filename, self.method_index)
+            else:
+                payload = program
+
+            self.globals = known_globals
+            self.methods.update(program.methods)
+            self.engine.extend(payload)
+            self.engine.run()
+            interpreter.output.flush()
+            return True
+
+        except Exception as e:
+            interpreter._report_error(e)
             return False
 
+
+def needs_more_input(source):
+    """
+    Return True if `source` stops partway through a block, so the REPL
+    should read more lines before running it.
+
+    A source is unfinished while it has brackets left open or a block
+    comment left unterminated. Any other error is left for the parser to
+    report once the source is run.
+    """
+    depth = 0
+    try:
+        for token in Lexer(source).tokens():
+            if token.kind != OP:
+                continue
+            if token.value in BRACKET_PAIRS:
+                depth += 1
+            elif token.value in CLOSING_BRACKETS:
+                depth -= 1
+                if depth < 0:
+                    return False
+    except JunoSyntaxError as e:
+        return e.incomplete
+    return depth > 0
+
+
 class REPL:
     """
     The Juno REPL (Read-Eval-Print Loop).
     This class provides an interactive shell for the Juno programming language.
     """
     
-    def __init__(self, debug=False, optimize=False, load_stdlib=True, quiet=False):
+    def __init__(self, debug=False, optimize=False, load_stdlib=True, quiet=False, engine="tree",
+                 max_call_depth=DEFAULT_MAX_CALL_DEPTH):
         """
         Initialize the REPL.
 
@@ -1049,14 +380,19 @@ class REPL:
             optimize (bool): Enable optimizations
             load_stdlib (bool): Load the standard library
             quiet (bool): Quiet mode - show only program output
+            engine (str): Execution engine, "tree" or "vm"
+            max_call_depth (int): Fail once method calls nest deeper than this
         """
         self.debug = debug
         self.optimize = optimize
         self.load_stdlib = load_stdlib
         self.quiet = quiet
+        self.engine = engine
 
-        # Create an interpreter
-        self.interpreter = Interpreter(debug, optimize, load_stdlib, quiet)
+        # Create an interpreter, and a session that keeps state between inputs
+        self.interpreter = Interpreter(debug, optimize, load_stdlib, quiet, engine,
+                                       max_call_depth=max_call_depth)
+        self.session = Session(self.interpreter)
     
     def _print_welcome(self):
         """Print the welcome message."""
@@ -1101,28 +437,42 @@ class REPL:
     def start(self):
         """Start the REPL."""
         self._print_welcome()
-        
+
+        # Lines of an input whose blocks are not yet closed
+        pending = []
         while True:
             try:
                 # Read
-                line = input("juno> ")
-                
-                # Handle empty lines
-                if not line.strip():
-                    continue
-                
-                # Handle special commands
-                if self._handle_command(line):
+                line = input("....> " if pending else "juno> ")
+
+                if not pending:
+                    # Handle empty lines
+                    if not line.strip():
+                        continue
+
+                    # Handle special commands
+                    if self._handle_command(line):
+                        continue
+
+                pending.append(line)
+                source = "\n".join(pending)
+                if needs_more_input(source):
                     continue
-                
+                pending = []
+
                 # Eval
-                result = self.interpreter.execute(line, "<repl>")
-                
+                result = self.session.execute(source)
+
                 # Print (handled by the interpreter for now)
-                
+
             except KeyboardInterrupt:
+                # Abandon the input being entered
+                pending = []
                 print("\nKeyboardInterrupt")
             except EOFError:
+                if pending:
+                    # Report what the unfinished input is missing
+                    self.session.execute("\n".join(pending))
                 print("\nExiting...")
                 break
             except Exception as e:
@@ -1130,11 +480,12 @@ class REPL:
                 if self.debug:
                     traceback.print_exc()
 
-def parse_arguments():
-    """Parse command line arguments."""
+def parse_arguments(argv=None):
+    """Parse command line arguments, from `argv` or else sys.argv."""
     parser = argparse.ArgumentParser(
         description="Juno Programming Language Interpreter",
-        epilog="If no file is specified, the REPL will start."
+        epilog="If no file is specified, the REPL will start. "
+               "Run 'batch --help' for running many files in parallel."
     )
 
     parser.add_argument(
@@ -1161,6 +512,12 @@ def parse_arguments():
         help="Enable optimizations"
     )
 
+    parser.add_argument(
+        "--optimize-report",
+        action="store_true",
+        help="Print which optimization passes fired to stderr (implies --optimize)"
+    )
+
     parser.add_argument(
         "--no-stdlib",
         action="store_true",
@@ -1179,7 +536,59 @@ def parse_arguments():
         help="Quiet mode - show only program output"
     )
 
-    return parser.parse_args()
+    parser.add_argument(
+        "--max-loop-iterations",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Fail any loop that runs more than N iterations (default: no limit)"
+    )
+
+    parser.add_argument(
+        "--max-call-depth",
+        type=int,
+        default=DEFAULT_MAX_CALL_DEPTH,
+        metavar="N",
+        help=f"Fail once method calls nest deeper than N (default: {DEFAULT_MAX_CALL_DEPTH})"
+    )
+
+    parser.add_argument(
+        "--buffer-size",
+        type=int,
+        default=DEFAULT_BUFFER_SIZE,
+        metavar="N",
+        help=f"Buffer up to N characters of program output (default: {DEFAULT_BUFFER_SIZE}; "
+             "0 flushes every write). Output to a terminal is also flushed at each line end."
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't read or write the compiled-code cache (__junocache__)"
+    )
+
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="tree",
+        help="Execution engine: tree (AST walker) or vm (bytecode VM)"
+    )
+
+    parser.add_argument(
+        "--server",
+        action="store_true",
+        help="Run as a server that keeps the interpreter loaded and runs programs "
+             "submitted with juno_server.py"
+    )
+
+    parser.add_argument(
+        "--socket",
+        default=None,
+        metavar="PATH",
+        help="Unix socket for --server (default: $JUNO_SOCKET or ~/.juno/server.sock)"
+    )
+
+    return parser.parse_args(argv)
 
 def show_version(quiet=False):
     """Display version information."""
@@ -1203,21 +612,27 @@ def run_file(filename, args):
         if not filename.endswith('.juno') and not args.quiet:
             print(f"Warning: File '{filename}' does not have a .juno extension.")
 
-        # Read the file
-        with open(filename, 'r', encoding='utf-8') as f:
-            source = f.read()
+        # The raw bytes are hashed to validate the code cache; the source
+        # itself is streamed to the lexer rather than read into memory
+        digest = None if args.no_cache else file_hash(filename)
 
         # Set up the interpreter
         juno_interpreter = Interpreter(
             debug=args.debug,
-            optimize=args.optimize,
+            optimize=args.optimize or args.optimize_report,
             load_stdlib=not args.no_stdlib,
-            quiet=args.quiet
+            quiet=args.quiet,
+            engine=args.engine,
+            cache=None if args.no_cache else CodeCache(),
+            max_loop_iterations=args.max_loop_iterations,
+            max_call_depth=args.max_call_depth,
+            optimize_report=args.optimize_report
         )
         
         # Check syntax only if requested
         if args.check:
-            result = juno_interpreter.check_syntax(source, filename)
+            with open(filename, 'r', encoding='utf-8', newline='') as source:
+                result = juno_interpreter.check_syntax(source, filename)
             if result:
                 if not args.quiet:
                     print(f"Syntax check passed: {filename}")
@@ -1228,7 +643,8 @@ def run_file(filename, args):
                 return 1
 
         # Execute the file
-        result = juno_interpreter.execute(source, filename)
+        with open(filename, 'r', encoding='utf-8', newline='') as source:
+            result = juno_interpreter.execute(source, filename, digest)
         return 0 if result else 1
 
     except Exception as e:
@@ -1246,7 +662,9 @@ def start_repl(args):
             debug=args.debug,
             optimize=args.optimize,
             load_stdlib=not args.no_stdlib,
-            quiet=args.quiet
+            quiet=args.quiet,
+            engine=args.engine,
+            max_call_depth=args.max_call_depth
         )
         
         # Start the REPL
@@ -1260,11 +678,23 @@ def start_repl(args):
             print(f"Error: {str(e)}")
         return 1
 
-def main():
-    """Main entry point."""
+def main(argv=None):
+    """Main entry point; `argv` defaults to the process's command line arguments."""
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv[:1] == ["batch"]:
+        from juno_batch import main as batch_main
+        return batch_main(argv[1:])
+
     # Parse command line arguments
-    args = parse_arguments()
-    
+    args = parse_arguments(argv)
+
+    if args.server:
+        from juno_server import serve
+        return serve(args.socket, main)
+
+    configure_stdout(args.buffer_size)
+
     # Show version and exit if requested
     if args.version:
         show_version(args.quiet)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Juno Types
+The static type rules the resolver applies to declarations.
+
+Juno values are plain Python objects: `int` and `long` are ints, `double`
+and `float` are floats, `boolean` is bool and `String` is str. The resolver
+works out the static type of expressions from literals and declarations
+and decides at compile time where a value must be converted (an int stored
+in a double variable becomes a float) and which assignments are errors,
+so the engines never have to inspect values to honor a declaration.
+
+Array types are written with a `[]` suffix, as in `int[]`; an array value
+can only be stored in a variable of exactly its type.
+
+A type the rules do not know about (such as a class name) is never checked.
+"""
+
+# Widening order of the numeric types; a float is stored as a double, and
+# float literals are not told apart from double ones
+NUMERIC_RANK = {"int": 0, "long": 1, "float": 2, "double": 2}
+FLOATING_TYPES = frozenset(["float", "double"])
+INTEGRAL_TYPES = frozenset(["int", "long"])
+
+# The range of int; an integer literal outside it is a long, since the
+# lexer drops the `L` suffix
+INT_MIN = -2**31
+INT_MAX = 2**31 - 1
+KNOWN_TYPES = frozenset(NUMERIC_RANK) | {"boolean", "String"}
+
+# Types that explicit casts like `(int) x` may name
+CAST_TYPES = frozenset(NUMERIC_RANK)
+
+# The value a declaration without an initializer starts with
+DEFAULT_VALUES = {"int": 0, "long": 0, "float": 0.0, "double": 0.0, "boolean": False}
+
+# The static type of `null`
+NULL_TYPE = "null"
+
+
+def literal_type(value):
+    """Return the static type of a literal value."""
+    if value is None:
+        return NULL_TYPE
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int):
+        return "int" if INT_MIN <= value <= INT_MAX else "long"
+    if isinstance(value, float):
+        return "double"
+    return "String"
+
+
+def is_numeric(type_name):
+    return type_name in NUMERIC_RANK
+
+
+def is_array(type_name):
+    return type_name is not None and type_name.endswith("[]")
+
+
+def array_of(element_type):
+    """Return the type of an array of `element_type`."""
+    return element_type + "[]"
+
+
+def element_type(array_type):
+    """Return the element type of an array type, or None if it is not an array."""
+    return array_type[:-2] if is_array(array_type) else None
+
+
+def promote(left, right):
+    """Return the type binary numeric promotion gives two numeric types."""
+    return left if NUMERIC_RANK[left] >= NUMERIC_RANK[right] else right
+
+
+def binary_type(op, left, right):
+    """
+    Return the static type of `left op right`, or None if it is not known.
+
+    Args:
+        op (str): The operator
+        left (str): The left operand's type, or None
+        right (str): The right operand's type, or None
+    """
+    if op in ("&&", "||", "<", "<=", ">", ">=", "==", "!="):
+        return "boolean"
+    if op == "+" and (left == "String" or right == "String"):
+        return "String"
+    if is_numeric(left) and is_numeric(right):
+        return promote(left, right)
+    return None
+
+
+def is_known(type_name):
+    """Return True if the type rules know which values `type_name` holds."""
+    return type_name in KNOWN_TYPES or type_name == NULL_TYPE or is_array(type_name)
+
+
+def binary_operand_error(op, left, right):
+    """
+    Return the error for applying a binary operator to operands of the
+    given types, or None if it is allowed. Operands of a type the rules do
+    not know about are not checked.
+    """
+    if not (is_known(left) and is_known(right)):
+        return None
+    if op in ("&&", "||"):
+        allowed = left == right == "boolean"
+    elif op in ("==", "!="):
+        # Numbers compare with numbers, booleans with booleans, and references with references
+        allowed = is_numeric(left) == is_numeric(right) and (left == "boolean") == (right == "boolean")
+    elif op == "+" and (left == "String" or right == "String"):
+        allowed = True
+    else:
+        allowed = is_numeric(left) and is_numeric(right)
+    if allowed:
+        return None
+    return f"bad operand types for binary operator '{op}': {left} and {right}"
+
+
+def unary_operand_error(op, operand):
+    """Return the error for applying `!`, `-`, `++` or `--` to an operand of the given type, or None."""
+    if not is_known(operand) or (operand == "boolean" if op == "!" else is_numeric(operand)):
+        return None
+    return f"bad operand type {operand} for unary operator '{op}'"
+
+
+def conversion(value_type, target_type):
+    """
+    Decide how a value of `value_type` is stored in a `target_type` variable.
+
+    Returns:
+        tuple: (cast, error) - cast is the type the value must be converted
+            to at run time, or None if it can be stored as it is; error is
+            a message if the assignment is not allowed
+    """
+    if value_type is None or value_type == target_type:
+        return None, None
+    if is_array(target_type):
+        if value_type == NULL_TYPE:
+            return None, None
+        return None, f"incompatible types: {value_type} cannot be converted to {target_type}"
+    if target_type not in KNOWN_TYPES:
+        return None, None
+    if value_type == NULL_TYPE:
+        if target_type == "String":
+            return None, None
+        return None, f"incompatible types: <null> cannot be converted to {target_type}"
+    if is_numeric(value_type) and is_numeric(target_type):
+        if NUMERIC_RANK[value_type] > NUMERIC_RANK[target_type]:
+            return None, f"incompatible types: possible lossy conversion from {value_type} to {target_type}"
+        if target_type in FLOATING_TYPES and value_type not in FLOATING_TYPES:
+            return "double", None
+        return None, None
+    return None, f"incompatible types: {value_type} cannot be converted to {target_type}"
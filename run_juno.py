@@ -6,7 +6,8 @@ This script directly executes Juno programs without showing any interpreter mess
 
 import os
 import sys
-import subprocess
+from juno_standalone import Interpreter
+from juno_cache import CodeCache, file_hash
 
 def main():
     """Main entry point."""
@@ -22,38 +23,13 @@ def main():
         print(f"Error: File '{file_path}' not found.")
         return 1
     
-    # Get the directory of this script
-    script_dir = os.path.dirname(os.path.abspath(__file__))
+    # Run the file in this process; quiet mode prints nothing but the
+    # program's output and errors, which go straight to stdout
+    interpreter = Interpreter(quiet=True, cache=CodeCache())
+    with open(file_path, 'r', encoding='utf-8', newline='') as source:
+        result = interpreter.execute(source, file_path, file_hash(file_path))
     
-    # Run the Juno interpreter
-    juno_standalone = os.path.join(script_dir, "juno_standalone.py")
-    
-    # Run the file with the standalone interpreter - completely silent mode
-    with open(os.devnull, 'w') as devnull:
-        # Capture and filter the output
-        process = subprocess.Popen(
-            [sys.executable, juno_standalone, file_path],
-            stdout=subprocess.PIPE,
-            stderr=devnull,
-            text=True,
-            bufsize=1,
-            universal_newlines=True
-        )
-
-        # Process the output line by line
-        for line in process.stdout:
-            # Skip lines that contain interpreter messages
-            if "Using direct interpreter" not in line and \
-               "Executing Juno file" not in line and \
-               "=" * 10 not in line and \
-               "Execution completed" not in line:
-                # Print the actual program output
-                print(line.rstrip())
-
-        # Wait for the process to complete
-        result = process.wait()
-    
-    return result.returncode
+    return 0 if result else 1
 
 if __name__ == "__main__":
     sys.exit(main())
\ No newline at end of file
@@ -10,6 +10,7 @@ import importlib.util
 
 # Import the package system
 from simple_juno_import import import_package
+from juno_output import stdout_output
 
 # Import GUI library if available
 try:
@@ -22,16 +23,19 @@ except ImportError:
     except ImportError:
         HAS_GUI = False
 
+def read_lines(file_path):
+    """Yield the stripped lines of a file, reading it one line at a time."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            yield line.strip()
+
 def execute_juno(file_path):
     """Execute a Juno file and show only the program output."""
     try:
-        # Read the file
-        with open(file_path, 'r', encoding='utf-8') as f:
-            source = f.read()
+        # Program output is buffered and flushed at exit or before an error
+        output = stdout_output()
 
-        # Process the file line by line
-        lines = source.split('\n')
-        i = 0
+        # Process the file line by line, without reading it all into memory
         local_vars = {}
         imported_packages = {}
 
@@ -40,10 +44,7 @@ def execute_juno(file_path):
             # Add GUI functions to local variables
             local_vars["GUI"] = juno_gui
         
-        while i < len(lines):
-            line = lines[i].strip()
-            i += 1
-            
+        for line in read_lines(file_path):
             # Skip empty lines and comments
             if not line or line.startswith('//'):
                 continue
@@ -105,8 +106,9 @@ def execute_juno(file_path):
                                 else:
                                     args.append(arg)
 
-                        # Call the method
+                        # Call the method, after any output it should follow
                         if hasattr(juno_gui, method_name):
+                            output.flush()
                             result = getattr(juno_gui, method_name)(*args)
                             local_vars[var_name] = result
                 else:
@@ -131,8 +133,9 @@ def execute_juno(file_path):
                                 else:
                                     args.append(arg)
 
-                        # Call the method
+                        # Call the method, after any output it should follow
                         if hasattr(juno_gui, method_name):
+                            output.flush()
                             getattr(juno_gui, method_name)(*args)
 
             # Handle System.out.println statements
@@ -148,12 +151,12 @@ def execute_juno(file_path):
                 
                 # Handle string literals
                 if content.startswith('"') and content.endswith('"'):
-                    print(content[1:-1], flush=True)
+                    output.write(f"{content[1:-1]}\n")
                 elif content.startswith("'") and content.endswith("'"):
-                    print(content[1:-1], flush=True)
+                    output.write(f"{content[1:-1]}\n")
                 # Handle variables
                 elif content in local_vars:
-                    print(local_vars[content], flush=True)
+                    output.write(f"{local_vars[content]}\n")
                 # Handle expressions with variables and concatenation
                 elif '+' in content:
                     # Process each part of the expression
@@ -198,18 +201,18 @@ def execute_juno(file_path):
                             elif '+' in expr and expr.replace('+', '').strip().isdigit():
                                 # Simple addition
                                 try:
-                                    result += str(eval(expr))
-                                except:
+                                    result += str(sum(int(term) for term in expr.split('+')))
+                                except ValueError:
                                     result += expr
                             else:
                                 result += expr
                         else:
                             result += part
                     
-                    print(result, flush=True)
+                    output.write(f"{result}\n")
                 else:
                     # For other expressions, just print the raw content
-                    print(f"{content}", flush=True)
+                    output.write(f"{content}\n")
             
             # Handle variable declarations with Java-style types
             elif any(type_name in line for type_name in ["String", "int", "double", "boolean", "float", "long"]) and "=" in line:
@@ -239,6 +242,7 @@ def execute_juno(file_path):
         return 0
     
     except Exception as e:
+        stdout_output().flush()
         print(f"Error: {str(e)}")
         return 1
 
@@ -2,50 +2,236 @@
 """
 Simple Juno Import System
 This module handles importing packages in the simple Juno interpreter.
+
+Imported modules are cached for the life of the process, keyed by file
+path and modification time, so importing a package again only re-runs
+the modules that changed. Which directory a package resolves to, and
+which modules it holds, is also recorded in an index file. Later runs
+then skip scanning the package directory until it changes.
+
+Modules are imported lazily: import_package returns a LazyModule for
+each one, and a module body runs only when something in it is first
+used, so a script that uses one class from a large package pays for
+just that module.
 """
 
 import os
 import sys
+import json
+import tempfile
 import importlib.util
 
+from juno_output import stdout_output
+
 # Constants
 PACKAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "packages")
 USER_PACKAGES_DIR = os.path.join(os.path.expanduser("~"), ".juno", "packages")
+IMPORT_INDEX_PATH = os.path.join(os.path.expanduser("~"), ".juno", "import_index.json")
+
+# Bump whenever the layout of the index file changes
+INDEX_VERSION = 1
+
+# Module path -> (mtime_ns, size, module)
+_module_cache = {}
+
+# Package name -> {"dir": ..., "mtime_ns": ..., "modules": [...]}, read from
+# IMPORT_INDEX_PATH on first use
+_index = None
+_index_dirty = False
+
+def _report(message):
+    """
+    Print a message through the program's output buffer, so it appears in
+    order with what the program has printed so far.
+    """
+    stdout_output().write(f"{message}\n")
+
+def _load_index():
+    """Return the package resolution index, reading it from disk on first use."""
+    global _index
+    if _index is None:
+        _index = {}
+        try:
+            with open(IMPORT_INDEX_PATH, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                _index = data["packages"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            # A missing or damaged index just means scanning again
+            pass
+    return _index
+
+def save_index():
+    """
+    Write the package resolution index to disk if it changed. Failures
+    are ignored; the index is only an optimization.
+    """
+    global _index_dirty
+    if not _index_dirty:
+        return
+    try:
+        directory = os.path.dirname(IMPORT_INDEX_PATH)
+        os.makedirs(directory, exist_ok=True)
+        # Write to a temporary file and rename so readers never see a partial index
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({"version": INDEX_VERSION, "packages": _index}, f)
+            os.replace(temp_path, IMPORT_INDEX_PATH)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        _index_dirty = False
+    except OSError:
+        pass
+
+def _mtime_ns(path):
+    """Return the modification time of `path`, or None if it does not exist."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+def resolve_package(package_name):
+    """
+    Find a package's directory and the Python modules in it.
+
+    Args:
+        package_name (str): The name of the package
+
+    Returns:
+        tuple: (package directory, list of module file names), or
+            (None, None) if the package does not exist
+    """
+    global _index_dirty
+    # Check user packages first
+    user_pkg_dir = os.path.join(USER_PACKAGES_DIR, package_name)
+    user_mtime = _mtime_ns(user_pkg_dir)
+    if user_mtime is not None:
+        pkg_dir, mtime = user_pkg_dir, user_mtime
+    else:
+        pkg_dir = os.path.join(PACKAGES_DIR, package_name)
+        mtime = _mtime_ns(pkg_dir)
+        if mtime is None:
+            return None, None
+
+    # Adding, removing or renaming a file changes the directory's mtime
+    entry = _load_index().get(package_name)
+    if entry is not None and entry.get("dir") == pkg_dir and entry.get("mtime_ns") == mtime:
+        return pkg_dir, entry["modules"]
+
+    files = sorted(file for file in os.listdir(pkg_dir) if file.endswith('.py'))
+    _index[package_name] = {"dir": pkg_dir, "mtime_ns": mtime, "modules": files}
+    _index_dirty = True
+    save_index()
+    return pkg_dir, files
+
+def load_module(module_name, module_path):
+    """
+    Run a module file, or return the module from an earlier run if the
+    file has not changed since.
 
-def import_package(package_name):
+    Raises:
+        Exception: Whatever running the module body raised
+    """
+    stat = os.stat(module_path)
+    cached = _module_cache.get(module_path)
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    # The module body may print directly; put buffered output before it
+    stdout_output().flush()
+    spec.loader.exec_module(module)
+    _module_cache[module_path] = (stat.st_mtime_ns, stat.st_size, module)
+    return module
+
+class LazyModule:
+    """
+    Stands in for a package module until it is used. The first attribute
+    lookup (or conversion to text) runs the module body; every later one
+    goes straight to the loaded module.
+
+    A module whose body fails is reported once, as an eager import would
+    report it, and then behaves as a module with no attributes: lookups
+    raise AttributeError, so hasattr() is simply False.
+    """
+
+    __slots__ = ("_name", "_path", "_module", "_error")
+
+    def __init__(self, name, path):
+        self._name = name
+        self._path = path
+        self._module = None
+        # The exception the module body raised, once it has failed
+        self._error = None
+
+    def _load(self):
+        """Return the real module, running its body on first use, or None if it failed."""
+        if self._module is None and self._error is None:
+            try:
+                self._module = load_module(self._name, self._path)
+            except Exception as e:
+                _report(f"Error importing module {self._name}: {str(e)}")
+                self._error = e
+        return self._module
+
+    def __getattr__(self, attribute):
+        module = self._load()
+        if module is None:
+            raise AttributeError(
+                f"module {self._name!r} has no attribute {attribute!r} (it failed to import)"
+            ) from self._error
+        return getattr(module, attribute)
+
+    def __dir__(self):
+        module = self._load()
+        return [] if module is None else dir(module)
+
+    def __str__(self):
+        module = self._load()
+        return repr(self) if module is None else str(module)
+
+    def __repr__(self):
+        if self._error is not None:
+            return f"<lazy module {self._name!r} from {self._path!r} (failed to import)>"
+        if self._module is None:
+            return f"<lazy module {self._name!r} from {self._path!r}>"
+        return repr(self._module)
+
+def import_package(package_name, lazy=True):
     """
     Import a Juno package.
-    
+
     Args:
         package_name (str): The name of the package to import
-        
+        lazy (bool): Return LazyModules that run each module body on first
+            use, rather than running every module body now
+
     Returns:
         dict: A dictionary of modules in the package
     """
-    # Check user packages first
-    user_pkg_dir = os.path.join(USER_PACKAGES_DIR, package_name)
-    pkg_dir = user_pkg_dir if os.path.exists(user_pkg_dir) else os.path.join(PACKAGES_DIR, package_name)
-    
-    if not os.path.exists(pkg_dir):
-        print(f"Error: Package '{package_name}' not found.")
+    pkg_dir, files = resolve_package(package_name)
+    if pkg_dir is None:
+        _report(f"Error: Package '{package_name}' not found.")
         return {}
-    
+
     # Check for Python modules
     modules = {}
-    
+
     # Look for Python modules
-    for file in os.listdir(pkg_dir):
-        if file.endswith('.py'):
-            module_name = file[:-3]
-            module_path = os.path.join(pkg_dir, file)
-            
-            # Import the module
-            try:
-                spec = importlib.util.spec_from_file_location(module_name, module_path)
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
-                modules[module_name] = module
-            except Exception as e:
-                print(f"Error importing module {module_name}: {str(e)}")
-    
+    for file in files:
+        module_name = file[:-3]
+        module_path = os.path.join(pkg_dir, file)
+        if lazy:
+            modules[module_name] = LazyModule(module_name, module_path)
+            continue
+
+        # Import the module
+        try:
+            modules[module_name] = load_module(module_name, module_path)
+        except Exception as e:
+            _report(f"Error importing module {module_name}: {str(e)}")
+
     return modules
\ No newline at end of file
@@ -0,0 +1,61 @@
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from juno_standalone import Interpreter, ENGINES
+from juno_output import Output
+
+
+def run(source, engine, optimize):
+    """Run a program and return the lines it printed."""
+    captured = io.StringIO()
+    interpreter = Interpreter(optimize=optimize, quiet=True, engine=engine,
+                              output=Output(captured, line_buffered=False))
+    interpreter.execute(source)
+    interpreter.output.flush()
+    return captured.getvalue().splitlines()
+
+
+class OverflowTest(unittest.TestCase):
+
+    def check(self, source, expected):
+        for engine in ENGINES:
+            for optimize in (False, True):
+                with self.subTest(engine=engine, optimize=optimize):
+                    self.assertEqual(run(source, engine, optimize), expected)
+
+    def test_int_addition_wraps(self):
+        self.check("int x = 2147483647;\nx = x + 1;\nSystem.out.println(x);", ["-2147483648"])
+
+    def test_int_increment_and_compound_assignment_wrap(self):
+        self.check(
+            "int x = 2147483647;\nx++;\nSystem.out.println(x);\n"
+            "int y = -2147483648;\ny -= 1;\nSystem.out.println(y);\n"
+            "int[] a = {2147483647};\na[0]++;\nSystem.out.println(a[0]);",
+            ["-2147483648", "2147483647", "-2147483648"])
+
+    def test_negating_min_int_wraps(self):
+        self.check("int x = -2147483648;\nSystem.out.println(-x);", ["-2147483648"])
+
+    def test_constant_multiplication_wraps(self):
+        self.check("System.out.println(2147483647 * 2);", ["-2"])
+
+    def test_long_wraps_at_64_bits(self):
+        self.check(
+            "long x = 9223372036854775807L;\nx = x + 1;\nSystem.out.println(x);\n"
+            "long y = 2147483647;\ny = y + 1;\nSystem.out.println(y);",
+            ["-9223372036854775808", "2147483648"])
+
+    def test_counting_loop_wraps_past_max_int(self):
+        self.check(
+            "int n = 0;\n"
+            "for (int i = 2147483646; i <= 2147483647; i++) { n++; if (n > 5) break; }\n"
+            "System.out.println(n);",
+            ["6"])
+
+
+if __name__ == "__main__":
+    unittest.main()
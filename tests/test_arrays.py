@@ -0,0 +1,102 @@
+import io
+import os
+import sys
+import unittest
+import contextlib
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from juno_errors import JunoSyntaxError
+from juno_parser import parse
+from juno_resolver import resolve
+from juno_runtime import new_array, make_array
+from juno_standalone import Interpreter, ENGINES
+from juno_output import Output
+
+
+def run(source, engine, optimize):
+    """Run a program; returns the lines it printed, then any error reported."""
+    captured = io.StringIO()
+    interpreter = Interpreter(optimize=optimize, quiet=True, engine=engine,
+                              output=Output(captured, line_buffered=False))
+    errors = io.StringIO()
+    with contextlib.redirect_stdout(errors):
+        interpreter.execute(source)
+    interpreter.output.flush()
+    return captured.getvalue().splitlines() + errors.getvalue().splitlines()
+
+
+class ArrayTest(unittest.TestCase):
+
+    def check(self, source, expected):
+        for engine in ENGINES:
+            for optimize in (False, True):
+                with self.subTest(engine=engine, optimize=optimize):
+                    self.assertEqual(run(source, engine, optimize), expected)
+
+    def test_defaults_and_literals(self):
+        self.check(
+            "int[] a = new int[3];\ndouble[] d = {1, 2.5};\n"
+            "String[] s = new String[2];\nboolean[] b = new boolean[1];\n"
+            "System.out.println(a);\nSystem.out.println(d);\n"
+            "System.out.println(s);\nSystem.out.println(b);\n"
+            "System.out.println(a.length + d.length);",
+            ["[0, 0, 0]", "[1.0, 2.5]", "[null, null]", "[false]", "5"])
+
+    def test_indexing_and_for_each(self):
+        self.check(
+            "int[] squares = new int[5];\n"
+            "for (int i = 0; i < squares.length; i++) { squares[i] = i * i; }\n"
+            "squares[1] += 10;\nsquares[2]++;\n"
+            "long total = 0;\nfor (int v : squares) { total += v; }\n"
+            'String[] words = {"a", "b"};\nString joined = "";\n'
+            "for (String w : words) { joined = joined + w; }\n"
+            "System.out.println(squares);\nSystem.out.println(total);\nSystem.out.println(joined);",
+            ["[0, 11, 5, 9, 16]", "41", "ab"])
+
+    def test_elements_wrap_like_their_type(self):
+        self.check(
+            "int[] a = {2147483647};\na[0]++;\n"
+            "long[] l = {9223372036854775807L};\nl[0] += 1;\n"
+            "System.out.println(a[0]);\nSystem.out.println(l[0]);",
+            ["-2147483648", "-9223372036854775808"])
+
+    def test_runtime_errors(self):
+        self.check("int[] a = new int[2];\nSystem.out.println(a[-1]);",
+                   ["Error: <input>:2: Index -1 out of bounds for length 2"])
+        self.check("int[] a = new int[-1];", ["Error: <input>:1: Negative array size: -1"])
+        self.check("int[] a = null;\nSystem.out.println(a.length);",
+                   ["Error: <input>:2: Cannot read the length of a null array"])
+        self.check("int[] a = null;\nfor (int v : a) { }",
+                   ["Error: <input>:2: Cannot iterate over a null array"])
+
+    def test_resolver_checks_array_use(self):
+        for source, message in [
+            ("int x = 1;\nSystem.out.println(x[0]);", "array required, but int found"),
+            ("int x = 1;\nfor (int v : x) { }", "for-each not applicable to expression type int"),
+        ]:
+            with self.subTest(source=source):
+                with self.assertRaises(JunoSyntaxError) as caught:
+                    resolve(parse(source))
+                self.assertEqual(caught.exception.message, message)
+
+
+class ArrayStorageTest(unittest.TestCase):
+    """Numeric arrays are packed into array.array; others are lists."""
+
+    def test_numeric_arrays_are_packed(self):
+        ints = new_array("int", 1000)
+        self.assertIsInstance(ints, array)
+        self.assertEqual((ints.typecode, ints.itemsize, len(ints)), ("q", 8, 1000))
+        doubles = make_array("double", [1, 2.5])
+        self.assertEqual((doubles.typecode, list(doubles)), ("d", [1.0, 2.5]))
+
+    def test_other_arrays_are_lists(self):
+        self.assertEqual(new_array("String", 2), [None, None])
+        self.assertEqual(new_array("boolean", 2), [False, False])
+        self.assertEqual(make_array("String", ("a", "b")), ["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
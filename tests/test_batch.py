@@ -0,0 +1,100 @@
+import os
+import sys
+import time
+import tempfile
+import unittest
+import unittest.mock
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import juno_batch
+from juno_batch import find_scripts, run_batch, MISSING_ERROR, WORKER_DIED_ERROR
+
+OPTIONS = {
+    "optimize": False,
+    "engine": "tree",
+    "max_loop_iterations": None,
+    "max_call_depth": 100,
+    "cache_dir": None,
+    "no_cache": True,
+    "output_dir": None,
+}
+
+
+def wait_for(path, timeout=30):
+    """Wait until another worker creates the file `path`."""
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"{path} was never created")
+        time.sleep(0.01)
+
+
+def touch(path):
+    open(path, "w").close()
+
+
+def run_or_crash(path, options):
+    """
+    Stands in for run_script: a script named crash.juno kills its worker
+    while slow.juno is running in another, which only finishes after.
+    """
+    directory, name = os.path.split(path)
+    if name == "crash.juno":
+        wait_for(os.path.join(directory, "slow.started"))
+        touch(os.path.join(directory, "crash.exiting"))
+        os._exit(1)
+    if name == "slow.juno":
+        touch(os.path.join(directory, "slow.started"))
+        wait_for(os.path.join(directory, "crash.exiting"))
+    return original_run_script(path, options)
+
+
+original_run_script = juno_batch.run_script
+
+
+class BatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def script(self, name, source='System.out.println("hi");'):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(source)
+        return path
+
+    def test_missing_paths_are_reported(self):
+        found = self.script("a.juno")
+        missing = os.path.join(self.directory.name, "missing.juno")
+        pattern = os.path.join(self.directory.name, "*.none")
+        self.assertEqual(find_scripts([found, missing, pattern]), ([found], [missing]))
+
+    def test_missing_paths_fail_the_batch(self):
+        self.script("a.juno")
+        missing = os.path.join(self.directory.name, "missing.juno")
+        with unittest.mock.patch("builtins.print") as printed:
+            status = juno_batch.main([missing, os.path.join(self.directory.name, "*.juno"), "-j", "1"])
+        self.assertEqual(status, 1)
+        lines = [call.args[0] for call in printed.call_args_list]
+        self.assertIn(f"FAIL {missing} (0 ms): {MISSING_ERROR}", lines)
+
+    @unittest.skipUnless(multiprocessing.get_start_method() == "fork",
+                         "workers must inherit the patched run_script")
+    def test_dead_worker_fails_only_its_chunk(self):
+        scripts = [self.script("slow.juno"), self.script("crash.juno"),
+                   self.script("c.juno"), self.script("d.juno")]
+        reported = []
+        with unittest.mock.patch.object(juno_batch, "run_script", run_or_crash):
+            results = run_batch(scripts, OPTIONS, 2, report=reported.append)
+        self.assertEqual(reported, results)
+        self.assertEqual([result.path for result in results], scripts)
+        # The script running beside the crash, and those after it, still run
+        self.assertEqual([result.status for result in results], [0, 1, 0, 0])
+        self.assertEqual([result.last_line for result in results], ["hi", WORKER_DIED_ERROR, "hi", "hi"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from juno_errors import JunoSyntaxError
+from juno_parser import parse
+from juno_resolver import resolve
+from juno_standalone import Interpreter, ENGINES
+from juno_output import Output
+
+
+def run(source, engine, optimize):
+    """Run a program and return the lines it printed."""
+    captured = io.StringIO()
+    interpreter = Interpreter(optimize=optimize, quiet=True, engine=engine,
+                              output=Output(captured, line_buffered=False))
+    interpreter.execute(source)
+    interpreter.output.flush()
+    return captured.getvalue().splitlines()
+
+
+class NestedBlockTest(unittest.TestCase):
+
+    def check(self, source, expected):
+        for engine in ENGINES:
+            for optimize in (False, True):
+                with self.subTest(engine=engine, optimize=optimize):
+                    self.assertEqual(run(source, engine, optimize), expected)
+
+    def test_nested_statements_in_bodies(self):
+        self.check(
+            "int twice(int n) { return n * 2; }\n"
+            "for (int i = 0; i < 3; i++) {\n"
+            "    if (i == 1) {\n"
+            '        System.out.println("one");\n'
+            "    } else {\n"
+            "        int j = 0;\n"
+            "        while (j < 2) {\n"
+            "            if (j > 0) { System.out.println(twice(i) + j); } else { j = j; }\n"
+            "            j++;\n"
+            "        }\n"
+            "    }\n"
+            "}",
+            ["1", "one", "5"])
+
+    def test_else_if_chain(self):
+        self.check(
+            "for (int i = 0; i < 4; i++) {\n"
+            '    if (i == 0) { System.out.println("zero"); }\n'
+            '    else if (i < 2) { System.out.println("small"); }\n'
+            '    else if (i < 3) { System.out.println("two"); }\n'
+            '    else { System.out.println("big"); }\n'
+            "}",
+            ["zero", "small", "two", "big"])
+
+    def test_sibling_blocks_reuse_names(self):
+        self.check(
+            "int outer = 7;\n"
+            "{ int x = 1; System.out.println(x); }\n"
+            '{ String x = "two"; System.out.println(x); }\n'
+            "for (int i = 0; i < 2; i++) { int y = i * 10; System.out.println(y); }\n"
+            "for (int i = 5; i < 6; i++) { int z; System.out.println(z + outer); }",
+            ["1", "two", "0", "10", "7"])
+
+    def test_block_variables_start_fresh_each_iteration(self):
+        self.check(
+            "for (int i = 0; i < 3; i++) {\n"
+            "    int count = 0;\n"
+            "    count++;\n"
+            "    System.out.println(count);\n"
+            "}",
+            ["1", "1", "1"])
+
+
+class BlockScopeTest(unittest.TestCase):
+    """The resolver applies Java's block scoping rules."""
+
+    def assertRejected(self, source, message):
+        with self.assertRaises(JunoSyntaxError) as caught:
+            resolve(parse(source))
+        self.assertEqual(caught.exception.message, message)
+
+    def test_variable_is_gone_after_its_block(self):
+        self.assertRejected("if (true) { int x = 1; }\nSystem.out.println(x);", "Undefined variable 'x'")
+        self.assertRejected("for (int i = 0; i < 2; i++) { }\nSystem.out.println(i);",
+                            "Undefined variable 'i'")
+
+    def test_inner_block_cannot_shadow(self):
+        self.assertRejected("int x = 1;\nif (true) { int x = 2; }", "Variable 'x' is already defined")
+        self.assertRejected("void f(int n) { while (true) { int n = 0; } }",
+                            "Variable 'n' is already defined")
+
+    def test_jump_outside_a_loop(self):
+        self.assertRejected("if (true) { break; }", "'break' outside of a loop")
+        self.assertRejected("continue;", "'continue' outside of a loop")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import io
+import os
+import sys
+import tempfile
+import unittest
+import unittest.mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import juno_cache
+from juno_cache import CodeCache, file_hash, source_hash, CACHE_DIR_NAME
+from juno_standalone import Interpreter, ENGINES
+from juno_output import Output
+
+
+class CodeCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.source = os.path.join(self.directory, "prog.juno")
+        self.digest = source_hash(b"int x = 1;")
+
+    def test_round_trip(self):
+        cache = CodeCache()
+        cache.store(self.source, self.digest, "tag", {"payload": [1, 2]})
+        self.assertEqual(cache.load(self.source, self.digest, "tag"), {"payload": [1, 2]})
+        self.assertTrue(os.path.isdir(os.path.join(self.directory, CACHE_DIR_NAME)))
+
+    def test_changed_source_or_tag_misses(self):
+        cache = CodeCache()
+        cache.store(self.source, self.digest, "tag", "payload")
+        self.assertIsNone(cache.load(self.source, source_hash(b"int x = 2;"), "tag"))
+        self.assertIsNone(cache.load(self.source, self.digest, "other"))
+
+    def test_other_format_version_misses(self):
+        cache = CodeCache()
+        cache.store(self.source, self.digest, "tag", "payload")
+        with unittest.mock.patch.object(juno_cache, "FORMAT_VERSION", juno_cache.FORMAT_VERSION + 1):
+            self.assertIsNone(cache.load(self.source, self.digest, "tag"))
+
+    def test_damaged_entry_misses(self):
+        cache = CodeCache()
+        cache.store(self.source, self.digest, "tag", "payload")
+        path = cache.path_for(self.source, self.digest, "tag")
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) - 3)
+        self.assertIsNone(cache.load(self.source, self.digest, "tag"))
+        with open(path, "wb"):
+            pass
+        self.assertIsNone(cache.load(self.source, self.digest, "tag"))
+
+    def test_shared_directory_is_keyed_by_content(self):
+        shared = os.path.join(self.directory, "shared")
+        cache = CodeCache(shared)
+        cache.store(self.source, self.digest, "tag", "payload")
+        copy = os.path.join(self.directory, "elsewhere", "copy.juno")
+        self.assertEqual(cache.load(copy, self.digest, "tag"), "payload")
+        self.assertEqual(os.listdir(shared), [os.path.basename(cache.path_for(copy, self.digest, "tag"))])
+
+
+class CachedRunTest(unittest.TestCase):
+    """Runs a script file through the cache the way juno_standalone.py does."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "prog.juno")
+
+    def write(self, source):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(source)
+
+    def run_file(self, engine):
+        captured = io.StringIO()
+        interpreter = Interpreter(quiet=True, engine=engine, cache=CodeCache(),
+                                  output=Output(captured, line_buffered=False))
+        with open(self.path, encoding="utf-8", newline="") as source:
+            self.assertTrue(interpreter.execute(source, self.path, file_hash(self.path)))
+        return captured.getvalue().splitlines()
+
+    def test_unchanged_source_skips_parsing(self):
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                self.write('for (int i = 0; i < 2; i++) { System.out.println("run " + i); }')
+                self.assertEqual(self.run_file(engine), ["run 0", "run 1"])
+                with unittest.mock.patch.object(Interpreter, "parse", side_effect=AssertionError("parsed")):
+                    self.assertEqual(self.run_file(engine), ["run 0", "run 1"])
+
+    def test_changed_source_is_rebuilt(self):
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                self.write('System.out.println("old");')
+                self.assertEqual(self.run_file(engine), ["old"])
+                self.write('System.out.println("new");')
+                self.assertEqual(self.run_file(engine), ["new"])
+
+
+if __name__ == "__main__":
+    unittest.main()
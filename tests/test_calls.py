@@ -0,0 +1,82 @@
+import io
+import os
+import sys
+import unittest
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from juno_standalone import Interpreter, ENGINES
+from juno_executor import DEFAULT_MAX_CALL_DEPTH
+from juno_output import Output
+
+
+def run(source, engine, optimize, max_call_depth=DEFAULT_MAX_CALL_DEPTH):
+    """Run a program; returns the lines it printed, then any error reported."""
+    captured = io.StringIO()
+    interpreter = Interpreter(optimize=optimize, quiet=True, engine=engine, max_call_depth=max_call_depth,
+                              output=Output(captured, line_buffered=False))
+    errors = io.StringIO()
+    with contextlib.redirect_stdout(errors):
+        interpreter.execute(source)
+    interpreter.output.flush()
+    return captured.getvalue().splitlines() + errors.getvalue().splitlines()
+
+
+class CallTest(unittest.TestCase):
+
+    def check(self, source, expected, max_call_depth=DEFAULT_MAX_CALL_DEPTH):
+        for engine in ENGINES:
+            for optimize in (False, True):
+                with self.subTest(engine=engine, optimize=optimize):
+                    self.assertEqual(run(source, engine, optimize, max_call_depth), expected)
+
+    def test_recursion(self):
+        self.check(
+            "long factorial(int n) { if (n <= 1) { return 1; } return n * factorial(n - 1); }\n"
+            "boolean isEven(int n) { if (n == 0) { return true; } return isOdd(n - 1); }\n"
+            "boolean isOdd(int n) { if (n == 0) { return false; } return isEven(n - 1); }\n"
+            "System.out.println(factorial(20));\nSystem.out.println(isEven(7));",
+            ["2432902008176640000", "false"])
+
+    def test_each_call_has_its_own_locals(self):
+        self.check(
+            "int depth(int n) {\n"
+            "    int mine = n;\n"
+            "    if (n > 0) { depth(n - 1); }\n"
+            "    return mine;\n"
+            "}\n"
+            "void bump(int n, int[] a) { n++; a[0]++; }\n"
+            "int x = 1;\nint[] arr = {1};\nbump(x, arr);\n"
+            "System.out.println(depth(5));\nSystem.out.println(x + \" \" + arr[0]);",
+            ["5", "1 2"])
+
+    def test_return_from_inside_a_loop(self):
+        self.check(
+            "int firstOver(int limit) {\n"
+            "    for (int i = 0; i < 100; i++) { if (i * i > limit) { return i; } }\n"
+            "    return -1;\n"
+            "}\n"
+            'void greet() { System.out.println("hi"); return; }\n'
+            "greet();\nSystem.out.println(firstOver(50));\nSystem.out.println(firstOver(20000));",
+            ["hi", "8", "-1"])
+
+    def test_deep_recursion_within_the_limit(self):
+        self.check("int down(int n) { if (n == 0) { return 0; } return 1 + down(n - 1); }\n"
+                   "System.out.println(down(2000));",
+                   ["2000"])
+
+    def test_call_depth_limit(self):
+        self.check('int down(int n) { return down(n + 1); }\nSystem.out.println("x");\ndown(0);',
+                   ["x", "Error: <input>:1: Stack overflow: more than 50 nested calls"],
+                   max_call_depth=50)
+
+    def test_bad_calls_fail_when_they_run(self):
+        self.check('System.out.println("before");\nmissing(1);',
+                   ["before", "Error: <input>:2: Undefined method 'missing'"])
+        self.check("int one(int n) { return n; }\nSystem.out.println(one(1, 2));",
+                   ["Error: <input>:2: Method 'one' expects 1 argument(s) but got 2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import io
+import os
+import sys
+import unittest
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import juno_ast as ast
+from juno_parser import parse
+from juno_resolver import resolve
+from juno_optimizer import optimize
+from juno_standalone import Interpreter, ENGINES
+from juno_output import Output
+
+
+def run(source, engine, optimize):
+    """Run a program; returns the lines it printed, then any error reported."""
+    captured = io.StringIO()
+    interpreter = Interpreter(optimize=optimize, quiet=True, engine=engine,
+                              output=Output(captured, line_buffered=False))
+    errors = io.StringIO()
+    with contextlib.redirect_stdout(errors):
+        interpreter.execute(source)
+    interpreter.output.flush()
+    return captured.getvalue().splitlines() + errors.getvalue().splitlines()
+
+
+class ExpressionTest(unittest.TestCase):
+
+    def check(self, source, expected):
+        for engine in ENGINES:
+            for optimize in (False, True):
+                with self.subTest(engine=engine, optimize=optimize):
+                    self.assertEqual(run(source, engine, optimize), expected)
+
+    def test_precedence_and_parentheses(self):
+        self.check(
+            "int x = 4;\n"
+            "System.out.println(1 + 2 * 3 - 8 / 2);\n"
+            "System.out.println((1 + 2) * (3 - x) % 2);\n"
+            "System.out.println(-x * -2 + 10 % 3);\n"
+            "System.out.println(x > 1 && x < 3 || x == 4);\n"
+            "System.out.println(!(x >= 4) || false && true);",
+            ["3", "-1", "9", "true", "false"])
+
+    def test_string_concatenation_order(self):
+        self.check(
+            'int a = 1;\nint b = 2;\ndouble d = 0.5;\n'
+            'System.out.println("sum " + a + b);\n'
+            'System.out.println(a + b + " sum");\n'
+            'System.out.println("" + (a + b) + d + true + null);',
+            ["sum 12", "3 sum", "30.5truenull"])
+
+    def test_logical_operators_short_circuit(self):
+        self.check(
+            'boolean noisy(boolean v) { System.out.println("ran " + v); return v; }\n'
+            "boolean r = noisy(false) && noisy(true);\n"
+            "r = noisy(true) || noisy(false);\n"
+            "System.out.println(r);",
+            ["ran false", "ran true", "true"])
+
+    def test_nested_conditionals(self):
+        self.check(
+            "for (int n = 0; n < 3; n++) {\n"
+            '    System.out.println(n == 0 ? "zero" : n == 1 ? "one" : "many");\n'
+            "}",
+            ["zero", "one", "many"])
+
+    def test_errors_in_constants_are_raised_when_run(self):
+        self.check('if (false) { System.out.println(1 / 0); }\nSystem.out.println("ok");\n'
+                   "System.out.println(5 % 0);",
+                   ["ok", "Error: <input>:3: / by zero"])
+
+
+class ConstantFoldingTest(unittest.TestCase):
+
+    def folded(self, source, index=0):
+        """Return the value expression of a declaration in the program, after -o."""
+        return optimize(resolve(parse(source))).body[index].value
+
+    def test_literal_operands_are_folded(self):
+        value = self.folded("int x = (2 + 3) * 4 - -1;")
+        self.assertIsInstance(value, ast.Literal)
+        self.assertEqual(value.value, 21)
+        self.assertEqual(self.folded("boolean b = 1 < 2 && !false;").value, True)
+        self.assertEqual(self.folded("int x = 2147483647 + 1;").value, -2147483648)
+
+    def test_variables_and_errors_are_not_folded(self):
+        self.assertIsInstance(self.folded("int y = 1;\nint x = y + 1;", 1), ast.BinaryOp)
+        self.assertIsInstance(self.folded("int x = 1 / 0;"), ast.BinaryOp)
+
+
+if __name__ == "__main__":
+    unittest.main()
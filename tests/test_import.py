@@ -0,0 +1,125 @@
+import os
+import sys
+import json
+import tempfile
+import unittest
+import unittest.mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import simple_juno_import
+from simple_juno_import import import_package
+
+
+class LazyImportTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        package = os.path.join(directory.name, "packages", "demo")
+        os.makedirs(package)
+        with open(os.path.join(package, "good.py"), "w", encoding="utf-8") as f:
+            f.write("VALUE = 42\n")
+        with open(os.path.join(package, "broken.py"), "w", encoding="utf-8") as f:
+            f.write("raise RuntimeError('boom')\n")
+
+        self.reported = []
+        for name, value in [
+            ("PACKAGES_DIR", os.path.join(directory.name, "packages")),
+            ("USER_PACKAGES_DIR", os.path.join(directory.name, "user")),
+            ("IMPORT_INDEX_PATH", os.path.join(directory.name, "index.json")),
+            ("_index", None),
+            ("_report", self.reported.append),
+        ]:
+            patcher = unittest.mock.patch.object(simple_juno_import, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_modules_load_on_first_use(self):
+        modules = import_package("demo")
+        self.assertEqual(modules["good"].VALUE, 42)
+        self.assertEqual(self.reported, [])
+
+    def test_failed_module_is_reported_once(self):
+        broken = import_package("demo")["broken"]
+        self.assertFalse(hasattr(broken, "anything"))
+        self.assertFalse(hasattr(broken, "anything_else"))
+        with self.assertRaises(AttributeError):
+            broken.anything
+        self.assertIn("failed to import", str(broken))
+        self.assertEqual(dir(broken), [])
+        self.assertEqual(self.reported, ["Error importing module broken: boom"])
+
+
+class ImportCacheTest(unittest.TestCase):
+    """Modules are cached by mtime, and package contents are indexed on disk."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.package = os.path.join(directory.name, "packages", "demo")
+        os.makedirs(self.package)
+        self.index_path = os.path.join(directory.name, "index.json")
+        self.write("good.py", "VALUE = 42\n")
+
+        for name, value in [
+            ("PACKAGES_DIR", os.path.join(directory.name, "packages")),
+            ("USER_PACKAGES_DIR", os.path.join(directory.name, "user")),
+            ("IMPORT_INDEX_PATH", self.index_path),
+            ("_index", None),
+            ("_module_cache", {}),
+        ]:
+            patcher = unittest.mock.patch.object(simple_juno_import, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def write(self, name, source, mtime=None):
+        path = os.path.join(self.package, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(source)
+        if mtime is not None:
+            os.utime(path, ns=(mtime, mtime))
+
+    def new_run(self):
+        """Forget the in-memory index, as a new process would."""
+        simple_juno_import._index = None
+
+    def test_unchanged_module_is_not_run_again(self):
+        first = import_package("demo")["good"]._load()
+        self.assertIs(import_package("demo")["good"]._load(), first)
+
+    def test_changed_module_is_run_again(self):
+        first = import_package("demo")["good"]
+        self.assertEqual(first.VALUE, 42)
+        mtime = os.stat(os.path.join(self.package, "good.py")).st_mtime_ns
+        self.write("good.py", "VALUE = 43\n", mtime + 10 ** 9)
+        self.assertEqual(import_package("demo")["good"].VALUE, 43)
+
+    def test_index_is_written_and_reused(self):
+        self.assertEqual(list(import_package("demo")), ["good"])
+        with open(self.index_path, encoding="utf-8") as f:
+            entry = json.load(f)["packages"]["demo"]
+        self.assertEqual((entry["dir"], entry["modules"]), (self.package, ["good.py"]))
+
+        self.new_run()
+        with unittest.mock.patch("os.listdir", side_effect=AssertionError("scanned")):
+            self.assertEqual(import_package("demo")["good"].VALUE, 42)
+
+    def test_package_change_is_rescanned(self):
+        import_package("demo")
+        self.write("extra.py", "NAME = 'extra'\n")
+        mtime = os.stat(self.package).st_mtime_ns + 10 ** 9
+        os.utime(self.package, ns=(mtime, mtime))
+        self.new_run()
+        self.assertEqual(sorted(import_package("demo")), ["extra", "good"])
+
+    def test_damaged_index_is_ignored(self):
+        with open(self.index_path, "w", encoding="utf-8") as f:
+            f.write("{not json")
+        self.assertEqual(list(import_package("demo")), ["good"])
+        with open(self.index_path, encoding="utf-8") as f:
+            self.assertIn("demo", json.load(f)["packages"])
+
+
+if __name__ == "__main__":
+    unittest.main()
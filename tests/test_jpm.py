@@ -0,0 +1,210 @@
+import io
+import os
+import sys
+import json
+import hashlib
+import threading
+import tempfile
+import unittest
+import unittest.mock
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jpm
+
+
+class JpmTestCase(unittest.TestCase):
+    """Runs each test against its own registry, install directory, store and project."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        for name in ("packages", "user", "store", "project"):
+            os.makedirs(os.path.join(self.root, name))
+        for name, value in [
+            ("PACKAGES_DIR", os.path.join(self.root, "packages")),
+            ("USER_PACKAGES_DIR", os.path.join(self.root, "user")),
+            ("STORE_DIR", os.path.join(self.root, "store")),
+        ]:
+            patcher = unittest.mock.patch.object(jpm, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(os.path.join(self.root, "project"))
+
+    def make_package(self, name, version, directory=None, source="// v{version}\n", dependencies=None):
+        """Write a package with one source file; returns its directory."""
+        pkg_dir = directory or os.path.join(jpm.PACKAGES_DIR, name)
+        os.makedirs(pkg_dir, exist_ok=True)
+        info = {"name": name, "version": version}
+        if dependencies:
+            info["dependencies"] = dependencies
+        with open(os.path.join(pkg_dir, "package.json"), "w") as f:
+            json.dump(info, f)
+        with open(os.path.join(pkg_dir, "main.juno"), "w") as f:
+            f.write(source.format(version=version))
+        return pkg_dir
+
+    def run_quietly(self, function, *args, **kwargs):
+        """Call a jpm function; returns (its result, what it printed)."""
+        printed = io.StringIO()
+        with contextlib.redirect_stdout(printed):
+            result = function(*args, **kwargs)
+        return result, printed.getvalue()
+
+
+class UpdateTest(JpmTestCase):
+
+    def test_update_picks_newer_version_over_lock(self):
+        old = self.make_package("demo", "1.0.0")
+        self.assertTrue(self.run_quietly(jpm.install_package, "demo")[0])
+        self.assertEqual(jpm.installed_version("demo"), "1.0.0")
+
+        # Both versions are available; the lock still prefers 1.0.0
+        new = self.make_package("demo", "1.1.0", os.path.join(self.root, "demo-1.1.0"))
+        versions = [("1.1.0", new, jpm.read_package_info(new)), ("1.0.0", old, jpm.read_package_info(old))]
+        with unittest.mock.patch.object(jpm, "available_versions", lambda name: versions):
+            self.assertTrue(self.run_quietly(jpm.install_package)[0])
+            self.assertEqual(jpm.installed_version("demo"), "1.0.0")
+            updated, printed = self.run_quietly(jpm.update_package, "demo")
+
+        self.assertTrue(updated)
+        self.assertEqual(jpm.installed_version("demo"), "1.1.0")
+        self.assertEqual(jpm.read_lock()["packages"]["demo"]["version"], "1.1.0")
+        self.assertIn("Package 'demo' updated from 1.0.0 to 1.1.0.", printed)
+
+    def test_update_reports_up_to_date(self):
+        self.make_package("demo", "1.0.0")
+        self.run_quietly(jpm.install_package, "demo")
+        updated, printed = self.run_quietly(jpm.update_package, "demo")
+        self.assertTrue(updated)
+        self.assertIn("Package 'demo' is already up to date (1.0.0).", printed)
+
+    def test_failed_update_is_reported(self):
+        updated, printed = self.run_quietly(jpm.update_package, "missing")
+        self.assertFalse(updated)
+        self.assertIn("Package 'missing' was not updated.", printed)
+        self.assertNotIn("updated from", printed)
+
+
+class HardLinkTest(JpmTestCase):
+
+    def installed_file(self, name):
+        return os.path.join(jpm.USER_PACKAGES_DIR, name, "main.juno")
+
+    def store_file(self, path):
+        """Return the store object an installed file was linked from."""
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        return jpm.store_object_path(digest)
+
+    def test_install_links_files_from_store(self):
+        self.make_package("demo", "1.0.0")
+        self.assertTrue(self.run_quietly(jpm.install_package, "demo", link_mode="hardlink")[0])
+        installed = self.installed_file("demo")
+        stored = self.store_file(installed)
+        self.assertTrue(os.path.samefile(installed, stored))
+        self.assertEqual(os.stat(stored).st_nlink, 2)
+
+    def test_uninstall_keeps_store_file(self):
+        self.make_package("demo", "1.0.0")
+        self.run_quietly(jpm.install_package, "demo", link_mode="hardlink")
+        stored = self.store_file(self.installed_file("demo"))
+
+        self.run_quietly(jpm.uninstall_package, "demo")
+        self.assertFalse(os.path.exists(os.path.join(jpm.USER_PACKAGES_DIR, "demo")))
+        self.assertTrue(os.path.exists(stored))
+        self.assertEqual(os.stat(stored).st_nlink, 1)
+
+    def test_update_replaces_linked_files(self):
+        self.make_package("demo", "1.0.0")
+        self.run_quietly(jpm.install_package, "demo", link_mode="hardlink")
+        old_stored = self.store_file(self.installed_file("demo"))
+
+        self.make_package("demo", "1.1.0")
+        updated, _ = self.run_quietly(jpm.update_package, "demo")
+        self.assertTrue(updated)
+        installed = self.installed_file("demo")
+        with open(installed) as f:
+            self.assertEqual(f.read(), "// v1.1.0\n")
+        # The old version's store file is untouched, just no longer linked
+        with open(old_stored) as f:
+            self.assertEqual(f.read(), "// v1.0.0\n")
+        self.assertEqual(os.stat(old_stored).st_nlink, 1)
+
+    def test_prune_keeps_files_linked_from_installed_packages(self):
+        self.make_package("demo", "1.0.0")
+        self.run_quietly(jpm.install_package, "demo", link_mode="hardlink")
+        installed = self.installed_file("demo")
+        stored = self.store_file(installed)
+        # A package in the store that nothing links to
+        unused_tree, _ = jpm.add_to_store(self.make_package("unused", "2.0.0", source="// unused\n"))
+
+        removed, _ = jpm.prune_store()
+        self.assertEqual(removed, 2)
+        self.assertTrue(os.path.exists(stored))
+        self.assertTrue(os.path.samefile(installed, stored))
+        self.assertIsNotNone(jpm.load_store_manifest(jpm.read_lock()["packages"]["demo"]["integrity"]))
+        self.assertIsNone(jpm.load_store_manifest(unused_tree))
+
+        # Once uninstalled, its files go too
+        self.run_quietly(jpm.uninstall_package, "demo")
+        self.assertEqual(jpm.prune_store()[0], 2)
+        self.assertFalse(os.path.exists(stored))
+
+
+class ParallelInstallTest(JpmTestCase):
+
+    LIBRARIES = ("alpha", "beta", "gamma", "delta")
+
+    def setUp(self):
+        super().setUp()
+        for name in self.LIBRARIES:
+            self.make_package(name, "1.0.0")
+        self.make_package("app", "1.0.0", dependencies={name: "^1.0.0" for name in self.LIBRARIES})
+
+    def test_packages_install_concurrently(self):
+        # Every library's install waits here until all of them have started
+        barrier = threading.Barrier(len(self.LIBRARIES), timeout=30)
+        install = jpm.install_locked_package
+
+        def install_together(name, *args):
+            if name in self.LIBRARIES:
+                barrier.wait()
+            return install(name, *args)
+
+        with unittest.mock.patch.object(jpm, "install_locked_package", install_together):
+            installed, printed = self.run_quietly(jpm.install_package, "app", jobs=len(self.LIBRARIES))
+        self.assertTrue(installed)
+        for name in self.LIBRARIES + ("app",):
+            self.assertIn(f"Package '{name}' 1.0.0 installed successfully.", printed)
+            self.assertEqual(jpm.installed_version(name), "1.0.0")
+
+    def test_summary_reports_throughput(self):
+        installed, printed = self.run_quietly(jpm.install_package, "app", jobs=2)
+        self.assertTrue(installed)
+        self.assertRegex(printed.splitlines()[-1],
+                         r"^5 package\(s\) installed \(10 files, \d+ linked from the store, "
+                         r"\d+\.\d\d MB in \d+\.\d\ds, \d+\.\d MB/s\), 0 already up to date\.$")
+
+        installed, printed = self.run_quietly(jpm.install_package, jobs=1)
+        self.assertTrue(installed)
+        self.assertRegex(printed.splitlines()[-1],
+                         r"^0 package\(s\) installed \(0 files, 0 linked from the store, 0\.00 MB in \d+\.\d\ds\), "
+                         r"5 already up to date\.$")
+
+    def test_failed_package_does_not_stop_the_others(self):
+        lock = {"packages": {"alpha": {"version": "1.0.0"}, "missing": {"version": "2.0.0"},
+                             "beta": {"version": "1.0.0"}}}
+        installed, printed = self.run_quietly(jpm.install_from_lock, lock, 2)
+        self.assertFalse(installed)
+        self.assertIn("Error: Could not install 'missing':", printed)
+        self.assertEqual([jpm.installed_version(name) for name in ("alpha", "beta", "missing")],
+                         ["1.0.0", "1.0.0", None])
+        self.assertTrue(printed.splitlines()[-1].startswith("2 package(s) installed"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import io
+import os
+import sys
+import unittest
+import unittest.mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import juno_lexer
+from juno_errors import JunoSyntaxError
+from juno_lexer import Lexer, tokenize
+from juno_parser import parse, Parser
+
+
+class BlockCommentTest(unittest.TestCase):
+
+    def test_closed_comment_is_skipped(self):
+        values = [token.value for token in tokenize("a /* x\n y */ / b")]
+        self.assertEqual(values, ["a", "/", "b", None])
+
+    def test_unterminated_comment_is_reported(self):
+        with self.assertRaises(JunoSyntaxError) as caught:
+            tokenize("int x = 1;\n\n/* open\n")
+        self.assertEqual(caught.exception.message, "Unterminated block comment")
+        self.assertEqual((caught.exception.line, caught.exception.column), (3, 1))
+        self.assertTrue(caught.exception.incomplete)
+
+    def test_unterminated_comment_ends_parse(self):
+        with self.assertRaises(JunoSyntaxError) as caught:
+            parse("int x = 1;\nSystem.out.println(x);\n/* open")
+        self.assertEqual(caught.exception.message, "Unterminated block comment")
+
+    def test_streamed_comment_spanning_chunks(self):
+        source = "int a = 1 / 2; /* a comment\n longer than a chunk */ int b;\n"
+        chunk_size = juno_lexer.CHUNK_SIZE
+        juno_lexer.CHUNK_SIZE = 4
+        try:
+            values = [token.value for token in Lexer(io.StringIO(source)).tokens()]
+            with self.assertRaises(JunoSyntaxError) as caught:
+                list(Lexer(io.StringIO("x;\n/* never closed")).tokens())
+        finally:
+            juno_lexer.CHUNK_SIZE = chunk_size
+        self.assertEqual(values, ["int", "a", "=", 1, "/", 2, ";", "int", "b", ";", None])
+        self.assertEqual(caught.exception.message, "Unterminated block comment")
+
+
+class CountingStream(io.StringIO):
+    """A text stream that counts how much has been read from it."""
+
+    def __init__(self, text):
+        super().__init__(text)
+        self.chars_read = 0
+
+    def read(self, size=-1):
+        text = super().read(size)
+        self.chars_read += len(text)
+        return text
+
+
+class StreamingTest(unittest.TestCase):
+    """A source stream is lexed chunk by chunk, with the same result as a string."""
+
+    SOURCE = ('int total = 0; // a comment\n'
+              'for (int i = 0; i < 3; i++) {\n'
+              '    total += i * 2; /* spans\n   lines */ String s = "text";\n'
+              '}\n'
+              'System.out.println(total >= 6 && !false);\n')
+
+    def setUp(self):
+        patcher = unittest.mock.patch.object(juno_lexer, "CHUNK_SIZE", 5)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def describe(self, tokens):
+        return [(token.kind, token.value, token.line, token.column) for token in tokens]
+
+    def test_stream_matches_string(self):
+        streamed = Lexer(io.StringIO(self.SOURCE)).tokens()
+        self.assertEqual(self.describe(streamed), self.describe(tokenize(self.SOURCE)))
+
+    def test_stream_is_read_lazily(self):
+        stream = CountingStream(self.SOURCE * 100)
+        tokens = Lexer(stream).tokens()
+        for _ in range(10):
+            next(tokens)
+        self.assertLess(stream.chars_read, 100)
+        for _ in tokens:
+            pass
+        self.assertEqual(stream.chars_read, len(self.SOURCE) * 100)
+
+    def test_parser_drops_consumed_tokens(self):
+        source = "int x = 0;\n" + "x = x + 1;\n" * 5000
+        parser = Parser(Lexer(io.StringIO(source)).tokens())
+        program = parser.parse_program()
+        self.assertEqual(len(program.body), 5001)
+        self.assertLess(len(parser.tokens), 5000)
+
+    def test_errors_have_the_same_position(self):
+        source = "int x = 1;\nint y = 2 # 3;\n"
+        for reader in (source, io.StringIO(source)):
+            with self.assertRaises(JunoSyntaxError) as caught:
+                list(Lexer(reader).tokens())
+            self.assertEqual((caught.exception.line, caught.exception.column), (2, 11))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import io
+import os
+import sys
+import unittest
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from juno_standalone import Interpreter, ENGINES
+from juno_output import Output
+
+
+def run(source, engine, optimize, max_loop_iterations=None):
+    """Run a program; returns the lines it printed, then any error reported."""
+    captured = io.StringIO()
+    interpreter = Interpreter(optimize=optimize, quiet=True, engine=engine,
+                              max_loop_iterations=max_loop_iterations,
+                              output=Output(captured, line_buffered=False))
+    errors = io.StringIO()
+    with contextlib.redirect_stdout(errors):
+        interpreter.execute(source)
+    interpreter.output.flush()
+    return captured.getvalue().splitlines() + errors.getvalue().splitlines()
+
+
+class LoopTest(unittest.TestCase):
+
+    def check(self, source, expected, max_loop_iterations=None):
+        for engine in ENGINES:
+            for optimize in (False, True):
+                with self.subTest(engine=engine, optimize=optimize):
+                    self.assertEqual(run(source, engine, optimize, max_loop_iterations), expected)
+
+    def test_long_loops_run_to_completion(self):
+        self.check(
+            "long total = 0;\n"
+            "for (int i = 0; i < 100000; i++) { total += i; }\n"
+            "int n = 0;\n"
+            "while (n < 1000) { n++; }\n"
+            "System.out.println(total);\nSystem.out.println(n);",
+            ["4999950000", "1000"])
+
+    def test_loop_variable_after_the_loop(self):
+        self.check(
+            "int i = 0;\nfor (i = 0; i < 5; i++) { }\nSystem.out.println(i);\n"
+            "for (i = 10; i >= 0; i -= 4) { }\nSystem.out.println(i);\n"
+            "for (i = 0; i < 10; i++) { if (i == 3) break; }\nSystem.out.println(i);",
+            ["5", "-2", "3"])
+
+    def test_body_that_changes_the_loop(self):
+        self.check(
+            "int limit = 10;\nint runs = 0;\n"
+            "for (int i = 0; i < limit; i++) { limit--; runs++; }\n"
+            "for (int j = 0; j < 10; j++) { j++; runs++; }\n"
+            "System.out.println(runs);",
+            ["10"])
+
+    def test_method_that_changes_the_bound(self):
+        self.check(
+            "int limit = 10;\nvoid shrink() { limit = 3; }\nint runs = 0;\n"
+            "for (int i = 0; i < limit; i++) { shrink(); runs++; }\n"
+            "System.out.println(runs);",
+            ["3"])
+
+    def test_iteration_limit(self):
+        self.check(
+            'System.out.println("start");\nfor (int i = 0; i < 100; i++) { }',
+            ["start", "Error: <input>:2: Loop exceeded the limit of 10 iterations"],
+            max_loop_iterations=10)
+        self.check("int n = 0;\nwhile (true) { n++; }",
+                   ["Error: <input>:2: Loop exceeded the limit of 10 iterations"],
+                   max_loop_iterations=10)
+
+    def test_loop_within_the_limit(self):
+        self.check("int n = 0;\nfor (int i = 0; i < 10; i++) { n++; }\nSystem.out.println(n);",
+                   ["10"], max_loop_iterations=10)
+
+
+if __name__ == "__main__":
+    unittest.main()
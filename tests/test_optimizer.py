@@ -0,0 +1,109 @@
+import io
+import os
+import re
+import sys
+import unittest
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from juno_standalone import Interpreter, ENGINES
+from juno_output import Output
+
+
+def run(source, engine, optimize):
+    """Run a program and return the lines it printed."""
+    captured = io.StringIO()
+    interpreter = Interpreter(optimize=optimize, quiet=True, engine=engine,
+                              output=Output(captured, line_buffered=False))
+    interpreter.execute(source)
+    interpreter.output.flush()
+    return captured.getvalue().splitlines()
+
+
+class OptimizedOutputTest(unittest.TestCase):
+    """Optimizing a program must not change what it prints."""
+
+    def check(self, source, expected):
+        for engine in ENGINES:
+            for optimize in (False, True):
+                with self.subTest(engine=engine, optimize=optimize):
+                    self.assertEqual(run(source, engine, optimize), expected)
+
+    def test_array_changed_in_loop_is_not_hoisted(self):
+        self.check(
+            "int[] arr = new int[2];\n"
+            "for (int i = 0; i < 2; i++) {\n"
+            "    arr[0] = i;\n"
+            '    System.out.println("arr " + "= " + arr);\n'
+            "}",
+            ["arr = [0, 0]", "arr = [1, 0]"])
+
+    def test_array_incremented_in_loop_is_not_hoisted(self):
+        self.check(
+            "int[] arr = {5};\n"
+            "int n = 0;\n"
+            "while (n < 2) {\n"
+            "    arr[0]++;\n"
+            '    System.out.println("x" + arr + n);\n'
+            "    n++;\n"
+            "}",
+            ["x[6]0", "x[7]1"])
+
+    def test_invariant_string_prefix_is_kept(self):
+        self.check(
+            'String name = "juno";\n'
+            "for (int i = 0; i < 2; i++) {\n"
+            '    System.out.println("hi " + name + " " + i);\n'
+            "}",
+            ["hi juno 0", "hi juno 1"])
+
+    def test_folded_and_dead_code(self):
+        self.check(
+            "int x = 2 * 3 + 1;\n"
+            "if (false) { System.out.println(\"never\"); }\n"
+            "while (false) { x = 0; }\n"
+            "System.out.println(x > 5 ? \"big\" : \"small\");\n"
+            "System.out.println(x);",
+            ["big", "7"])
+
+
+class ReportTest(unittest.TestCase):
+    """--optimize-report lists how often each pass fired."""
+
+    SOURCE = ("int x = 2 * 3;\n"
+              "if (false) { x = 1; }\n"
+              'String s = "a";\n'
+              "for (int i = 0; i < 2; i++) {\n"
+              '    System.out.println("v " + s + i);\n'
+              "}")
+
+    def fired(self, engine, source):
+        """Run a program with a report; returns {pass name: times fired}."""
+        interpreter = Interpreter(optimize=True, optimize_report=True, quiet=True, engine=engine,
+                                  output=Output(io.StringIO(), line_buffered=False))
+        report = io.StringIO()
+        with contextlib.redirect_stderr(report):
+            self.assertTrue(interpreter.execute(source))
+        lines = report.getvalue().splitlines()
+        self.assertEqual(lines[0], "Optimization report:")
+        self.assertTrue(lines[-1].startswith("  total "))
+        return {match[1]: int(match[2]) for match in
+                (re.match(r"  (\S+) +fired +(\d+) time", line) for line in lines[1:-1])}
+
+    def test_passes_that_fired(self):
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                fired = self.fired(engine, self.SOURCE)
+                for name in ("constant-folding", "dead-branches", "string-concat", "hoist-strings"):
+                    self.assertEqual(fired[name], 1, name)
+        fired = self.fired("vm", self.SOURCE)
+        self.assertEqual((fired["print-fusion"], fired["compare-jump"], fired["increment"]), (1, 1, 1))
+
+    def test_nothing_to_optimize(self):
+        fired = self.fired("tree", "int x = 1;\nSystem.out.println(x);")
+        self.assertEqual(set(fired.values()), {0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import io
+import os
+import sys
+import unittest
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from juno_output import Output
+from juno_standalone import Interpreter, ENGINES
+
+
+class RecordingStream(io.StringIO):
+    """A text stream that records each write and whether it is a terminal."""
+
+    def __init__(self, tty=False):
+        super().__init__()
+        self.writes = []
+        self.tty = tty
+
+    def write(self, text):
+        self.writes.append(text)
+        return super().write(text)
+
+    def isatty(self):
+        return self.tty
+
+
+class OutputTest(unittest.TestCase):
+
+    def test_block_buffering_waits_for_a_full_buffer(self):
+        stream = RecordingStream()
+        output = Output(stream, buffer_size=10)
+        output.write("abc\n")
+        output.write("def\n")
+        self.assertEqual(stream.writes, [])
+        output.write("ghi\n")
+        self.assertEqual(stream.writes, ["abc\ndef\nghi\n"])
+        output.write("x")
+        output.flush()
+        self.assertEqual(stream.getvalue(), "abc\ndef\nghi\nx")
+
+    def test_terminal_is_line_buffered(self):
+        stream = RecordingStream(tty=True)
+        output = Output(stream)
+        self.assertTrue(output.line_buffered)
+        output.write("no newline")
+        self.assertEqual(stream.writes, [])
+        output.write(" yet\n")
+        self.assertEqual(stream.writes, ["no newline yet\n"])
+        self.assertFalse(Output(RecordingStream()).line_buffered)
+
+    def test_zero_buffer_writes_through(self):
+        stream = RecordingStream()
+        output = Output(stream, buffer_size=0)
+        output.write("a")
+        output.write("b")
+        self.assertEqual(stream.writes, ["a", "b"])
+
+    def test_error_follows_the_output_before_it(self):
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                stdout = io.StringIO()
+                with contextlib.redirect_stdout(stdout):
+                    interpreter = Interpreter(quiet=True, engine=engine, output=Output(line_buffered=False))
+                    interpreter.execute('System.out.println("first");\nSystem.out.print("second");\n'
+                                        "int z = 0;\nz = 1 / z;")
+                self.assertEqual(stdout.getvalue(), "first\nsecondError: <input>:4: / by zero\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import sys
+import unittest
+import unittest.mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from juno_parser import check
+from juno_standalone import Interpreter
+
+
+def errors(source):
+    """Return (message, line, column) for each error check() reports."""
+    return [(e.message, e.line, e.column) for e in check(source)[1]]
+
+
+class CheckTest(unittest.TestCase):
+
+    def test_every_broken_method_is_reported(self):
+        source = ("void a() { int x = ; }\n"
+                  "void b() { return 1 +; }\n"
+                  "int c() { return 2; }\n"
+                  "System.out.println(c());")
+        program, found = check(source)
+        self.assertEqual([(e.message, e.line) for e in found], [("Unexpected ';'", 1), ("Unexpected ';'", 2)])
+        self.assertEqual(list(program.methods), ["c"])
+
+    def test_unbalanced_brackets_are_reported_at_the_bracket(self):
+        self.assertEqual(errors("void a() {\n  if (true) {\n}\n"), [("Missing '}' to close '{'", 1, 10)])
+        self.assertEqual(errors("int x = (1 + 2));"), [("Unexpected ')'", 1, 16)])
+        self.assertEqual(errors("int[] a = {1, 2);"),
+                         [("Expected '}' to close '{' from line 1 but found ')'", 1, 16)])
+
+    def test_lexical_and_bracket_errors_come_first(self):
+        self.assertEqual(errors("void a() { int x = ; }\nint y = 1 # 2;"), [("Unexpected character '#'", 2, 11)])
+        self.assertEqual(errors("void a() { int x = ; }\nint y = (;"), [("Missing ')' to close '('", 2, 9)])
+
+    def test_valid_program_has_no_errors(self):
+        program, found = check("int twice(int n) { return n * 2; }\nvoid f() { }\nf();")
+        self.assertEqual(found, [])
+        self.assertEqual(list(program.methods), ["twice", "f"])
+
+
+class CheckSyntaxTest(unittest.TestCase):
+
+    def test_prints_every_error(self):
+        interpreter = Interpreter(quiet=True)
+        with unittest.mock.patch("builtins.print") as printed:
+            self.assertFalse(interpreter.check_syntax("void a() { x = ; }\nvoid b() { ) }"))
+        self.assertEqual([call.args[0] for call in printed.call_args_list],
+                         ["Syntax error: <input>:2:12: Expected '}' to close '{' from line 2 but found ')'"])
+        with unittest.mock.patch("builtins.print") as printed:
+            self.assertFalse(interpreter.check_syntax("void a() { int x = ; }\nvoid b() { return +; }"))
+        self.assertEqual(len(printed.call_args_list), 2)
+
+    def test_resolver_errors_are_syntax_errors(self):
+        interpreter = Interpreter(quiet=True)
+        with unittest.mock.patch("builtins.print") as printed:
+            self.assertFalse(interpreter.check_syntax("int x = y;"))
+        self.assertEqual([call.args[0] for call in printed.call_args_list],
+                         ["Syntax error: <input>:1: Undefined variable 'y'"])
+        with unittest.mock.patch("builtins.print"):
+            self.assertTrue(interpreter.check_syntax("int x = 1;"))
+
+
+if __name__ == "__main__":
+    unittest.main()
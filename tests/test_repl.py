@@ -0,0 +1,113 @@
+import io
+import os
+import sys
+import unittest
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from juno_standalone import Interpreter, Session, ENGINES, needs_more_input
+from juno_output import Output
+
+
+class NeedsMoreInputTest(unittest.TestCase):
+
+    def test_open_block_waits_for_more(self):
+        self.assertTrue(needs_more_input("if (x > 0) {\n    x = 1;"))
+
+    def test_open_comment_waits_for_more(self):
+        self.assertTrue(needs_more_input("/* open"))
+        self.assertTrue(needs_more_input("int x = 1; /* a comment\n on two lines"))
+
+    def test_complete_input_runs(self):
+        self.assertFalse(needs_more_input("/* closed */ int x = 1;"))
+        self.assertFalse(needs_more_input("if (x > 0) { x = 1; }"))
+
+    def test_other_errors_are_left_for_the_parser(self):
+        self.assertFalse(needs_more_input("}"))
+        self.assertFalse(needs_more_input("int x = 1 # 2;"))
+
+
+class SessionTestCase(unittest.TestCase):
+    """Each test runs the same inputs in a session on every engine."""
+
+    def run_inputs(self, engine, inputs):
+        """Run inputs in one session; returns (their results, output, errors)."""
+        captured = io.StringIO()
+        interpreter = Interpreter(quiet=True, engine=engine, output=Output(captured, line_buffered=False))
+        session = Session(interpreter)
+        errors = io.StringIO()
+        with contextlib.redirect_stdout(errors):
+            results = [session.execute(source) for source in inputs]
+        return results, captured.getvalue().splitlines(), errors.getvalue().splitlines()
+
+    def check(self, inputs, results, output, errors):
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                self.assertEqual(self.run_inputs(engine, inputs), (results, output, errors))
+
+
+class SessionTest(SessionTestCase):
+
+    def test_globals_carry_over(self):
+        self.check(["int x = 2;", "void show() { System.out.println(x); }", "x++;\nshow();"],
+                   [True, True, True], ["3"], [])
+
+    def test_global_is_declared_once(self):
+        self.check(["int x = 1;", "int x = 2;", "System.out.println(x);"],
+                   [True, False, True], ["1"], ["Error: <repl>:1: Variable 'x' is already defined"])
+
+    def test_failed_declaration_can_be_redeclared(self):
+        self.check(["int a = 1 / 0;\nint b = 2;", "int a = 3;\nint b = 4;", "System.out.println(a + b);"],
+                   [False, True, True], ["7"], ["Error: <repl>:1: / by zero"])
+
+    def test_store_to_unset_global_fails(self):
+        unset = "Error: <repl>:1: Variable 'a' used before its declaration ran"
+        self.check(["int a = 1 / 0;", "a = 5;", "void set() { a = 6; }\nset();"],
+                   [False, False, False], [], ["Error: <repl>:1: / by zero", unset, unset])
+
+    def test_earlier_inputs_do_not_run_again(self):
+        self.check(['System.out.println("once");', "int x = 1;", "System.out.println(x);"],
+                   [True, True, True], ["once", "1"], [])
+
+    def test_input_with_an_error_declares_nothing(self):
+        self.check(["int y = 1;\nint z = q;", "void f() { }\nint w = ;", "int y = 2;\nint z = y;\nint w = z;",
+                    "void f() { System.out.println(w); }\nf();"],
+                   [False, False, True, True], ["2"],
+                   ["Error: <repl>:2: Undefined variable 'q'", "Error: <repl>:2:9: Unexpected ';'"])
+
+    def test_methods_from_earlier_inputs_are_callable(self):
+        self.check(["int square(int n) { return n * n; }", "int cube(int n) { return n * square(n); }",
+                    "int total = 0;\nfor (int i = 1; i <= 3; i++) { total += cube(i); }",
+                    "System.out.println(total + square(2));"],
+                   [True] * 4, ["40"], [])
+
+
+class CallSiteTest(SessionTestCase):
+    """Call sites compiled in earlier inputs follow later method definitions."""
+
+    def test_redefined_method_switches_existing_call_sites(self):
+        self.check(["int f() { return 1; }", "int g() { return f(); }", "System.out.println(g());",
+                    "int f() { return 2; }", "System.out.println(g());"],
+                   [True] * 5, ["1", "2"], [])
+
+    def test_call_site_in_a_loop(self):
+        self.check(["int f(int n) { return n; }",
+                    "int sum() { int total = 0; for (int i = 0; i < 4; i++) { total += f(i); } return total; }",
+                    "System.out.println(sum());", "int f(int n) { return n * 10; }", "System.out.println(sum());"],
+                   [True] * 5, ["6", "60"], [])
+
+    def test_method_defined_after_its_caller(self):
+        self.check(["void later() { soon(); }", "later();", 'void soon() { System.out.println("soon"); }',
+                    "later();"],
+                   [True, False, True, True], ["soon"], ["Error: <repl>:1: Undefined method 'soon'"])
+
+    def test_redefinition_with_other_parameters(self):
+        self.check(["int f() { return 1; }", "int g() { return f(); }", "int f(int n) { return n; }",
+                    "System.out.println(g());"],
+                   [True, True, True, False], [],
+                   ["Error: <repl>:1: Method 'f' expects 1 argument(s) but got 0"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from juno_errors import JunoSyntaxError
+from juno_parser import parse
+from juno_resolver import resolve
+
+
+def check(source):
+    """Parse and resolve a program, raising JunoSyntaxError if it is invalid."""
+    return resolve(parse(source))
+
+
+class OperandTypeTest(unittest.TestCase):
+
+    def assertRejected(self, source, message):
+        with self.assertRaises(JunoSyntaxError) as caught:
+            check(source)
+        self.assertEqual(caught.exception.message, message)
+
+    def test_increment_needs_a_number(self):
+        self.assertRejected('String s = "abc";\ns++;', "bad operand type String for unary operator '++'")
+        self.assertRejected("boolean b = true;\n--b;", "bad operand type boolean for unary operator '--'")
+
+    def test_unary_operators_check_their_operand(self):
+        self.assertRejected("boolean b = !5;", "bad operand type int for unary operator '!'")
+        self.assertRejected('String s = "a";\nSystem.out.println(-s);',
+                            "bad operand type String for unary operator '-'")
+
+    def test_arithmetic_needs_numbers(self):
+        self.assertRejected("boolean b = true;\nint x = 1;\nSystem.out.println(b + x);",
+                            "bad operand types for binary operator '+': boolean and int")
+        self.assertRejected("int[] p = {1};\nint[] q = {2};\nSystem.out.println(p + q);",
+                            "bad operand types for binary operator '+': int[] and int[]")
+        self.assertRejected("boolean b = true;\nb += 1;",
+                            "bad operand types for binary operator '+': boolean and int")
+
+    def test_comparison_needs_numbers(self):
+        self.assertRejected('String a = "a";\nString b = "b";\nSystem.out.println(a < b);',
+                            "bad operand types for binary operator '<': String and String")
+        self.assertRejected('int x = 1;\nSystem.out.println(x == "a");',
+                            "bad operand types for binary operator '==': int and String")
+
+    def test_logical_operators_need_booleans(self):
+        self.assertRejected("int x = 1;\nSystem.out.println(x && true);",
+                            "bad operand types for binary operator '&&': int and boolean")
+
+    def test_valid_operands_are_accepted(self):
+        check('String s = "a";\ns += 1;\nSystem.out.println(s + true + null);\n'
+              "double d = 1;\nd++;\nboolean b = !(d > 1 || s == null);\n"
+              "int[] a = {1};\nSystem.out.println(a == null);")
+
+
+class IntLiteralTest(unittest.TestCase):
+
+    def test_int_range_boundaries(self):
+        check("int i = 2147483647;\nint j = -2147483648;")
+
+    def test_literal_beyond_int_is_long(self):
+        for source in ("int i = 2147483648;", "int i = -2147483649;"):
+            with self.subTest(source=source):
+                with self.assertRaises(JunoSyntaxError) as caught:
+                    check(source)
+                self.assertEqual(caught.exception.message,
+                                 "incompatible types: possible lossy conversion from long to int")
+        check("long l = 2147483648;\nlong m = -2147483649;")
+
+
+class SlotTest(unittest.TestCase):
+    """Variables resolve to numbered slots instead of being looked up by name."""
+
+    SOURCE = ('int a = 1;\nString b = "x";\n'
+              "int f(int x, int y) {\n"
+              "    int s = x;\n"
+              "    { int t = 1; }\n"
+              "    { int u = 2; int v = 3; }\n"
+              "    return s;\n"
+              "}\n"
+              "{ int local = a; }")
+
+    def test_globals_are_numbered_in_order(self):
+        program = check(self.SOURCE)
+        self.assertEqual(program.global_names, ["a", "b"])
+        block = program.body[3]
+        declaration = block.statements[0]
+        self.assertEqual((declaration.slot, declaration.is_global), (0, False))
+        self.assertEqual((declaration.value.slot, declaration.value.is_global), (0, True))
+        self.assertEqual(program.frame_size, 1)
+
+    def test_method_slots_follow_the_parameters(self):
+        method = check(self.SOURCE).methods["f"]
+        first, inner, sibling, result = method.body.statements
+        self.assertEqual(first.slot, 2)
+        self.assertEqual(first.value.slot, 0)
+        # Sibling blocks reuse the slots a closed block freed
+        self.assertEqual(inner.statements[0].slot, 3)
+        self.assertEqual([declaration.slot for declaration in sibling.statements], [3, 4])
+        self.assertEqual((result.value.slot, result.value.is_global), (2, False))
+        self.assertEqual(method.frame_size, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
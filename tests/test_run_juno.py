@@ -0,0 +1,57 @@
+import os
+import sys
+import tempfile
+import unittest
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUN_JUNO = os.path.join(ROOT, "run_juno.py")
+STANDALONE = os.path.join(ROOT, "juno_standalone.py")
+
+
+class RunJunoTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, source):
+        path = os.path.join(self.directory.name, "program.juno")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(source)
+        return path
+
+    def run_juno(self, *args):
+        """Run run_juno.py; returns (exit status, stdout)."""
+        result = subprocess.run([sys.executable, RUN_JUNO, *args], capture_output=True, text=True, timeout=60)
+        return result.returncode, result.stdout
+
+    def test_prints_only_program_output(self):
+        path = self.write('System.out.println("Juno says hi");\nSystem.out.print(1 + 2);\n')
+        self.assertEqual(self.run_juno(path), (0, "Juno says hi\n3"))
+
+    def test_error_sets_exit_status(self):
+        path = self.write('System.out.println("before");\nint z = 0;\nz = 1 / z;\n')
+        self.assertEqual(self.run_juno(path), (1, f"before\nError: {path}:3: / by zero\n"))
+
+    def test_output_matches_juno_standalone(self):
+        path = self.write("for (int i = 0; i < 20000; i++) { System.out.println(i * i); }\n")
+        standalone = subprocess.run([sys.executable, STANDALONE, "--quiet", "--no-cache", path],
+                                    capture_output=True, text=True, timeout=60)
+        self.assertEqual(self.run_juno(path), (0, standalone.stdout))
+        self.assertEqual(len(standalone.stdout.splitlines()), 20000)
+
+    def test_caches_compiled_code(self):
+        path = self.write("System.out.println(42);\n")
+        self.assertEqual(self.run_juno(path), (0, "42\n"))
+        self.assertTrue(os.listdir(os.path.join(self.directory.name, "__junocache__")))
+        self.assertEqual(self.run_juno(path), (0, "42\n"))
+
+    def test_usage_errors(self):
+        self.assertEqual(self.run_juno(), (1, "Usage: python run_juno.py <juno_file>\n"))
+        missing = os.path.join(self.directory.name, "missing.juno")
+        self.assertEqual(self.run_juno(missing), (1, f"Error: File '{missing}' not found.\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
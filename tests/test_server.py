@@ -0,0 +1,85 @@
+import os
+import sys
+import tempfile
+import unittest
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import juno_server
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STANDALONE = os.path.join(ROOT, "juno_standalone.py")
+CLIENT = os.path.join(ROOT, "juno_server.py")
+
+PROGRAM = ("int total = 0;\n"
+           "for (int i = 1; i <= 4; i++) { total += i; }\n"
+           'System.out.println("total " + total);\n')
+
+
+@unittest.skipUnless(juno_server.supported(), "server mode needs Unix sockets and fork")
+class ServerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.socket = os.path.join(self.directory.name, "server.sock")
+        self.script = self.write("program.juno", PROGRAM)
+
+    def write(self, name, source):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(source)
+        return path
+
+    def start_server(self):
+        server = subprocess.Popen([sys.executable, STANDALONE, "--server", "--socket", self.socket],
+                                  stdout=subprocess.PIPE, text=True)
+        self.addCleanup(server.wait, timeout=30)
+        self.addCleanup(server.terminate)
+        self.assertEqual(server.stdout.readline(), f"Juno server listening on {self.socket}\n")
+        server.stdout.close()
+        return server
+
+    def client(self, *args, **env):
+        """Run the client; returns (exit status, stdout)."""
+        result = subprocess.run([sys.executable, CLIENT, "--quiet", *args], capture_output=True, text=True,
+                                cwd=self.directory.name, env={**os.environ, "JUNO_SOCKET": self.socket, **env},
+                                timeout=30)
+        return result.returncode, result.stdout
+
+    def test_server_output_matches_a_direct_run(self):
+        direct = subprocess.run([sys.executable, STANDALONE, "--quiet", "--no-cache", self.script],
+                                capture_output=True, text=True, timeout=30)
+        self.start_server()
+        for _ in range(3):
+            self.assertEqual(self.client("--no-cache", self.script), (0, direct.stdout))
+        self.assertEqual(direct.stdout, "total 10\n")
+
+    def test_exit_status_of_a_failing_program(self):
+        failing = self.write("failing.juno", 'System.out.println("before");\nint z = 0;\nz = 1 / z;\n')
+        self.start_server()
+        self.assertEqual(self.client("--no-cache", failing),
+                         (1, f"before\nError: {failing}:3: / by zero\n"))
+
+    def test_run_uses_the_clients_directory_and_environment(self):
+        cache_dir = os.path.join(self.directory.name, "cache")
+        os.mkdir(cache_dir)
+        self.start_server()
+        self.assertEqual(self.client("program.juno", JUNO_CACHE_DIR=cache_dir), (0, "total 10\n"))
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+    def test_client_runs_in_process_without_a_server(self):
+        self.assertFalse(os.path.exists(self.socket))
+        self.assertEqual(self.client("--no-cache", self.script), (0, "total 10\n"))
+
+    def test_second_server_on_the_same_socket_refuses_to_start(self):
+        self.start_server()
+        second = subprocess.run([sys.executable, STANDALONE, "--server", "--socket", self.socket],
+                                capture_output=True, text=True, timeout=30)
+        self.assertEqual(second.returncode, 1)
+        self.assertIn("already listening", second.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
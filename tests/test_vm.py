@@ -0,0 +1,90 @@
+import io
+import os
+import sys
+import unittest
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from juno_standalone import Interpreter, ENGINES
+from juno_output import Output
+
+
+def run(source, engine, optimize):
+    """Run a program; returns the lines it printed, then any error reported."""
+    captured = io.StringIO()
+    interpreter = Interpreter(optimize=optimize, quiet=True, engine=engine,
+                              output=Output(captured, line_buffered=False))
+    errors = io.StringIO()
+    with contextlib.redirect_stdout(errors):
+        interpreter.execute(source)
+    interpreter.output.flush()
+    return captured.getvalue().splitlines() + errors.getvalue().splitlines()
+
+
+class EngineParityTest(unittest.TestCase):
+    """The VM must print what the tree-walking engine prints, optimized or not."""
+
+    def check(self, source, expected):
+        for engine in ENGINES:
+            for optimize in (False, True):
+                with self.subTest(engine=engine, optimize=optimize):
+                    self.assertEqual(run(source, engine, optimize), expected)
+
+    def test_arithmetic_follows_java(self):
+        self.check(
+            "int a = -7;\nint b = 2;\n"
+            "System.out.println(a / b);\nSystem.out.println(a % b);\n"
+            "System.out.println(7 / b);\nSystem.out.println(7 % -2);\n"
+            "System.out.println(a - b * 3);\n"
+            "double d = 7;\nSystem.out.println(d / 2);\nSystem.out.println(-2147483648 / -1);",
+            ["-3", "-1", "3", "1", "-13", "3.5", "-2147483648"])
+
+    def test_comparisons(self):
+        self.check(
+            "int x = 3;\ndouble nan = 0.0 / 0.0;\n"
+            "System.out.println(x < 3);\nSystem.out.println(x <= 3);\n"
+            "System.out.println(x > 2);\nSystem.out.println(x >= 4);\n"
+            "System.out.println(x == 3);\nSystem.out.println(x != 3);\n"
+            'if (nan < 1) { System.out.println("lt"); }\n'
+            'if (nan >= 1) { System.out.println("ge"); }\n'
+            'System.out.println(nan > 0 ? "gt" : "not gt");',
+            ["false", "true", "true", "false", "true", "false", "not gt"])
+
+    def test_loops_and_increments(self):
+        self.check(
+            "int total = 0;\n"
+            "for (int i = 0; i < 10; i++) { if (i % 3 == 0) continue; total += i; }\n"
+            "int j = 10;\n"
+            "while (j >= 0) { j = j - 3; if (j < 2) break; }\n"
+            "long big = 9223372036854775807L;\nbig++;\n"
+            "double d = 0.5;\nd++;\n"
+            "int[] a = {1, 2, 3};\nfor (int v : a) { total = total + v; }\n"
+            "System.out.println(total);\nSystem.out.println(j);\n"
+            "System.out.println(big);\nSystem.out.println(d);",
+            ["33", "1", "-9223372036854775808", "1.5"])
+
+    def test_methods_and_recursion(self):
+        self.check(
+            "int fib(int n) {\n    if (n < 2) { return n; }\n    return fib(n - 1) + fib(n - 2);\n}\n"
+            'String describe(int n) { return n <= 10 ? "small " + n : "big " + n; }\n'
+            "System.out.println(fib(15));\nSystem.out.println(describe(fib(6)));",
+            ["610", "small 8"])
+
+    def test_strings_and_logic(self):
+        self.check(
+            'String s = "a";\nint n = 2;\n'
+            "s += n;\ns = s + true + null;\n"
+            "boolean b = n > 1 && !(n == 3) || false;\n"
+            'System.out.println(s);\nSystem.out.println(b);\nSystem.out.println("" + 1.0 + (long) 2.9);',
+            ["a2truenull", "true", "1.02"])
+
+    def test_runtime_errors_match(self):
+        self.check('System.out.println("before");\nint z = 0;\nSystem.out.println(1 / z);',
+                   ["before", "Error: <input>:3: / by zero"])
+        self.check("int[] a = new int[2];\nfor (int i = 0; i <= 2; i++) { a[i] = i; }",
+                   ["Error: <input>:2: Index 2 out of bounds for length 2"])
+
+
+if __name__ == "__main__":
+    unittest.main()